@@ -0,0 +1,274 @@
+#!/usr/bin/env python
+
+# standard library imports
+import threading
+
+# third party related imports
+
+# local library imports
+from Thor.pdf import poppler
+from Thor.pdf.fonts import parse_font_xml, pdftohtml_command
+from Thor.pdf.info import PDFInfo
+from Thor.utils.PdfXmlParser import iter_pages
+
+
+__all__ = ['Backend', 'BackendException', 'PopplerBackend',
+           'get_backend', 'register_backend',
+           'set_default_backend', 'split_raw_pages']
+
+
+class BackendException(Exception): pass
+
+
+class Backend(object):
+    """The interface of text extraction backends.
+
+    A backend knows how to get word boxes, page boxes and raw content
+    stream texts out of a pdf document. PDFPage routes every extraction
+    through the selected backend.
+
+    Attributes:
+        name: The name the backend is registered with.
+
+    """
+
+    name = None
+
+    def extract_word_bboxes(self, filename, first=None, last=None,
+                            layout=False):
+        """Extract words with their bounding boxes.
+
+        Args:
+            filename: The absolute path of the specified pdf document.
+            first: The first page number to extract. Should be 1-based.
+                If omitted, all pages are extracted.
+            last: The last page number to extract.
+            layout: Whether words should carry the indices of the block
+                and line they belong to, under 'block' and 'line'. It
+                is only passed when set, so backends without layout can
+                leave it out.
+
+        Yields:
+            Page dicts in the format of PDFXMLParser.run(), in page
+            order, with coordinates in media box space.
+
+        """
+
+        raise NotImplementedError
+
+    def extract_fonts(self, filename, first=None, last=None):
+        """Extract textual objects with their font specs.
+
+        Args:
+            filename: The absolute path of the specified pdf document.
+            first: The first page number to extract. Should be 1-based.
+                If omitted, all pages are extracted.
+            last: The last page number to extract.
+
+        Returns:
+            A list of page dicts in the format of parse_font_xml(), in
+            page order, with coordinates in media box space.
+
+        """
+
+        raise NotImplementedError
+
+    def get_page_bboxes(self, filename):
+        """Get the page boxes of every page.
+
+        Args:
+            filename: The absolute path of the specified pdf document.
+
+        Returns:
+            A PDFInfo instance.
+
+        """
+
+        raise NotImplementedError
+
+    def extract_raw_texts(self, filename, page_num):
+        """Extract texts of a page in content stream order.
+
+        Args:
+            filename: The absolute path of the specified pdf document.
+            page_num: The number of page to extract. Should be 1-based.
+
+        Returns:
+            A list of lines.
+
+        """
+
+        raise NotImplementedError
+
+    def extract_raw_texts_of_pages(self, filename, first=None, last=None):
+        """Extract texts of consecutive pages in content stream order.
+
+        Backends without a batched extraction fall back to extracting
+        the pages one by one.
+
+        Args:
+            filename: The absolute path of the specified pdf document.
+            first: The first page number to extract. Should be 1-based.
+                If omitted, all pages are extracted.
+            last: The last page number to extract.
+
+        Returns:
+            A list of line lists in page order, each one equal to what
+            extract_raw_texts() returns for the page.
+
+        """
+
+        if first is None:
+            first, last = 1, self.get_page_bboxes(filename).num_pages
+
+        return map(lambda p: self.extract_raw_texts(filename, p),
+                   xrange(first, last + 1))
+
+
+class PopplerBackend(Backend):
+    """The backend running poppler command line utilities."""
+
+    name = 'poppler'
+
+    def extract_word_bboxes(self, filename, first=None, last=None,
+                            layout=False):
+
+        cmd = self.word_bbox_command(filename, first, last, layout)
+        with poppler.open_output(cmd) as stream:
+            for page_data in iter_pages(stream):
+                yield page_data
+
+    def extract_fonts(self, filename, first=None, last=None):
+
+        output = poppler.check_output(
+            pdftohtml_command(filename, first, last)
+        )
+
+        return parse_font_xml(output.decode('utf8'))[1]
+
+    def get_page_bboxes(self, filename):
+
+        return PDFInfo.load(filename)
+
+    def extract_raw_texts(self, filename, page_num):
+
+        output = poppler.check_output(
+            self.raw_text_command(filename, page_num)
+        )
+
+        return output.decode('utf8').splitlines()
+
+    def extract_raw_texts_of_pages(self, filename, first=None, last=None):
+
+        output = poppler.check_output(
+            self.raw_text_command(filename, first, last)
+        )
+
+        return split_raw_pages(output.decode('utf8'))
+
+    @classmethod
+    def word_bbox_command(cls, filename, first=None, last=None, layout=False):
+        """The `pdftotext -bbox` command writing to standard output.
+
+        With layout, `-bbox-layout` groups the words into blocks and
+        lines.
+
+        """
+
+        option = '-bbox-layout' if layout else '-bbox'
+        if first is None:
+            return ('pdftotext', option, filename, '-')
+
+        return ('pdftotext', option, '-f', str(first), '-l', str(last),
+                filename, '-')
+
+    @classmethod
+    def raw_text_command(cls, filename, first=None, last=None):
+        """The `pdftotext -raw` command writing to standard output.
+
+        If last is omitted, only the first page is extracted. If both
+        are omitted, all pages are extracted.
+
+        """
+
+        if first is None:
+            return ('pdftotext', '-raw', filename, '-')
+
+        last = first if last is None else last
+
+        return ('pdftotext', '-f', str(first), '-l', str(last),
+                '-raw', filename, '-')
+
+
+def split_raw_pages(text):
+    """Split `pdftotext -raw` output of many pages page by page.
+
+    Every page is terminated by a form feed. A page is split into lines
+    exactly like the output of a single page run, whose trailing form
+    feed yields an empty last line.
+
+    Args:
+        text: A unicode string.
+
+    Returns:
+        A list of line lists in page order.
+
+    """
+
+    chunks = text.split(u'\f')
+
+    ret = map(lambda chunk: (chunk + u'\f').splitlines(), chunks[:-1])
+    if chunks[-1] != u'':
+        ret.append(chunks[-1].splitlines())
+
+    return ret
+
+
+_backends = {}
+_backends_lock = threading.Lock()
+_default_backend = PopplerBackend.name
+
+def register_backend(backend):
+    """Register a backend instance under its name."""
+
+    if backend.name is None:
+        raise BackendException('A backend should have a name')
+
+    with _backends_lock:
+        _backends[backend.name] = backend
+
+def set_default_backend(name):
+    """Select the backend used when none is given explicitly."""
+
+    global _default_backend
+
+    with _backends_lock:
+        if name not in _backends:
+            raise BackendException('Unknown backend: %s' % name)
+
+        _default_backend = name
+
+def get_backend(backend=None):
+    """Get a backend.
+
+    Args:
+        backend: A Backend instance, the name of a registered backend,
+            or None for the default backend.
+
+    Returns:
+        A Backend instance.
+
+    """
+
+    if isinstance(backend, Backend):
+        return backend
+
+    with _backends_lock:
+        name = _default_backend if backend is None else backend
+        if name not in _backends:
+            raise BackendException('Unknown backend: %s' % name)
+
+        return _backends[name]
+
+
+register_backend(PopplerBackend())
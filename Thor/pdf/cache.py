@@ -0,0 +1,279 @@
+#!/usr/bin/env python
+
+# standard library imports
+from collections import OrderedDict
+from contextlib import closing
+from tempfile import NamedTemporaryFile
+import errno
+import hashlib
+import os
+import subprocess
+import threading
+
+# third party related imports
+
+# local library imports
+from Thor import __version__
+from Thor.pdf import poppler
+
+
+__all__ = ['PageCache', 'get_poppler_version']
+
+
+_poppler_version = None
+_poppler_version_lock = threading.Lock()
+
+def get_poppler_version():
+    """Get the version string printed by `pdftotext -v`.
+
+    It runs like any other poppler utility, so it is recorded and
+    replayed by a poppler session.
+
+    """
+
+    global _poppler_version
+
+    with _poppler_version_lock:
+        if _poppler_version is None:
+            try:
+                output = poppler.check_output(('pdftotext', '-v'),
+                                              stderr=subprocess.STDOUT)
+            except subprocess.CalledProcessError, e:
+                # xpdf derived versions exit with 99 after printing it
+                output = e.output
+            _poppler_version = output.splitlines()[0].strip() \
+                               if output else ''
+
+    return _poppler_version
+
+
+class PageCache(object):
+    """A content-addressed on-disk cache of extracted pages.
+
+    Pages are stored as PDFPage.dumps() output under a key derived from
+    the SHA-1 of the document content, the page number, the poppler
+    version and the Thor version, so a cached page is never served for
+    a changed document or a different toolchain. When the stored pages
+    exceed max_bytes, the least recently used ones are removed until
+    they fit in low_water of it. The directory is only scanned once,
+    the pages are then tracked in memory in the order of their use. A
+    cache can be shared by threads; its index, counters and size are
+    kept under a lock.
+
+    Attributes:
+        directory: The directory containing cached pages.
+        max_bytes: The maximum total size of cached pages.
+        poppler_version: The poppler version string used in keys.
+        hits: The number of pages served from the cache.
+        misses: The number of pages not found in the cache.
+        evictions: The number of pages removed to respect max_bytes.
+
+    """
+
+    SUFFIX = '.json'
+
+    # the number of documents whose content hash is remembered
+    digest_cache_size = 64
+
+    # the fraction of max_bytes an eviction frees the cache down to
+    low_water = 0.9
+
+    def __init__(self, directory, max_bytes=1024 ** 3, poppler_version=None):
+
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.poppler_version = poppler_version or get_poppler_version()
+        self.hits = self.misses = self.evictions = 0
+
+        self._digests = OrderedDict()
+        self._lock = threading.Lock()
+
+        try:
+            os.makedirs(directory)
+        except OSError, e:
+            if e.errno != errno.EEXIST:
+                raise
+
+        # sizes of the cached pages by path, least recently used first
+        self._index = OrderedDict(
+            (path, stat.st_size) for path, stat
+            in sorted(self._entries(), key=lambda (p, s): s.st_mtime)
+        )
+        self._size = sum(self._index.itervalues())
+
+    @property
+    def size(self):
+        """The total bytes of cached pages."""
+
+        return self._size
+
+    @property
+    def stats(self):
+        """A dict of hit/miss counters and the current size."""
+
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'bytes': self._size,
+            }
+
+    def key(self, filename, page_num, variant=''):
+        """Get the cache key of a page.
+
+        Args:
+            filename: The absolute path of the pdf document.
+            page_num: The number of page. Should be 1-based.
+            variant: A string telling apart pages extracted with
+                different options, e.g. 'fonts'.
+
+        Returns:
+            A hex string.
+
+        """
+
+        material = '\0'.join((self._digest(filename), str(page_num),
+                              self.poppler_version, __version__))
+        if variant:
+            material += '\0' + variant
+
+        return hashlib.sha1(material).hexdigest()
+
+    def get(self, filename, page_num, variant=''):
+        """Get the serialized page, or None if it is not cached.
+
+        Args:
+            filename: The absolute path of the pdf document.
+            page_num: The number of page. Should be 1-based.
+            variant: See key().
+
+        Returns:
+            A JSON string serialized by PDFPage.dumps(), or None.
+
+        """
+
+        path = self._path(self.key(filename, page_num, variant))
+
+        try:
+            with closing(open(path, 'rb')) as f:
+                serialized = f.read().decode('utf8')
+        except IOError, e:
+            if e.errno != errno.ENOENT:
+                raise
+
+            with self._lock:
+                self.misses += 1
+            return None
+
+        # mark as recently used for the eviction
+        try:
+            os.utime(path, None)
+        except OSError:
+            # evicted by another thread meanwhile
+            pass
+
+        with self._lock:
+            self.hits += 1
+            # a page may have been stored by another process
+            size = self._index.pop(path, None)
+            if size is None:
+                size = len(serialized.encode('utf8'))
+                self._size += size
+            self._index[path] = size
+
+        return serialized
+
+    def put(self, filename, page_num, serialized, variant=''):
+        """Store a serialized page.
+
+        Args:
+            filename: The absolute path of the pdf document.
+            page_num: The number of page. Should be 1-based.
+            serialized: A JSON string serialized by PDFPage.dumps().
+            variant: See key().
+
+        """
+
+        path = self._path(self.key(filename, page_num, variant))
+        # ujson gives UTF-8 encoded str
+        data = serialized.encode('utf8') \
+               if isinstance(serialized, unicode) else serialized
+
+        try:
+            os.makedirs(os.path.dirname(path))
+        except OSError, e:
+            if e.errno != errno.EEXIST:
+                raise
+
+        with NamedTemporaryFile(dir=os.path.dirname(path),
+                                suffix='.tmp', delete=False) as f:
+            f.write(data)
+
+        with self._lock:
+            self._size -= self._index.pop(path, 0)
+
+            os.rename(f.name, path)
+            self._index[path] = len(data)
+            self._size += len(data)
+
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+
+        # called with the lock held
+        target = self.max_bytes * self.low_water
+        while self._size > target and self._index:
+            path, size = self._index.popitem(last=False)
+            self._size -= size
+
+            try:
+                os.remove(path)
+            except OSError:
+                # removed by another process meanwhile
+                continue
+
+            self.evictions += 1
+
+    def _entries(self):
+
+        ret = []
+        for dirpath, dirnames, filenames in os.walk(self.directory):
+            for name in filenames:
+                if not name.endswith(self.SUFFIX):
+                    continue
+
+                path = os.path.join(dirpath, name)
+                try:
+                    ret.append((path, os.stat(path)))
+                except OSError:
+                    pass
+
+        return ret
+
+    def _path(self, key):
+
+        return os.path.join(self.directory, key[:2], key + self.SUFFIX)
+
+    def _digest(self, filename):
+
+        stat = os.stat(filename)
+        digest_key = (os.path.abspath(filename), stat.st_mtime, stat.st_size)
+
+        with self._lock:
+            digest = self._digests.pop(digest_key, None)
+
+        if digest is None:
+            sha1 = hashlib.sha1()
+            with closing(open(filename, 'rb')) as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), ''):
+                    sha1.update(chunk)
+            digest = sha1.hexdigest()
+
+        with self._lock:
+            self._digests[digest_key] = digest
+            while len(self._digests) > self.digest_cache_size:
+                self._digests.popitem(last=False)
+
+        return digest
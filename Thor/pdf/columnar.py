@@ -0,0 +1,292 @@
+#!/usr/bin/env python
+
+# standard library imports
+
+# third party related imports
+import numpy as np
+
+# local library imports
+from Thor.pdf.page import PDFPage
+from Thor.pdf.text import PDFText
+
+
+__all__ = ['ColumnarPage']
+
+
+class ColumnarPage(object):
+    """A page with its words stored in columns.
+
+    The geometry of the words is kept in NumPy arrays, so cropping,
+    filtering and statistics run over all words of a page at once
+    instead of word by word through PDFText. PDFText instances are only
+    built when words are asked for, e.g.
+
+        columns = ColumnarPage.from_page(page)
+        columns = columns.crop(0, 0, page.width, page.height / 2)
+        page = columns.to_page()
+
+    Coordinates are stored as doubles along with a mask of the ones
+    that were integers, so words come back with the types they had.
+
+    Attributes:
+        page_num: The page number.
+        width: The width of the page.
+        height: The height of the page.
+        x: An array of the x-coordinate of every word.
+        y: An array of the y-coordinate of every word.
+        w: An array of the width of every word.
+        h: An array of the height of every word.
+        font_ixs: An array of the index of the font of every word in
+            font_table, -1 for a word without font.
+        texts: An object array of the text of every word.
+        font_table: A list of FontSpec instances, the fonts of the page
+            first.
+        num_page_fonts: The number of fonts of the page.
+        tier: The name of the preprocessing tier, or None.
+        blocks: An array of the block index of every word, -1 for none,
+            or None if the page has no layout.
+        lines: An array of the line index of every word, -1 for none,
+            or None if the page has no layout.
+        ints: An array of the integer flags of every word, a bit per
+            coordinate in the order x, y, w and h.
+
+    """
+
+    def __init__(self, page_num, width, height, x, y, w, h, font_ixs, texts,
+                 font_table=None, num_page_fonts=0, tier=None, blocks=None,
+                 lines=None, ints=None):
+
+        self.page_num = page_num
+        self.width = width
+        self.height = height
+        self.x = x
+        self.y = y
+        self.w = w
+        self.h = h
+        self.font_ixs = font_ixs
+        self.texts = texts
+        self.font_table = font_table or []
+        self.num_page_fonts = num_page_fonts
+        self.tier = tier
+        self.blocks = blocks
+        self.lines = lines
+        self.ints = ints if ints is not None else \
+                    np.zeros(len(texts), dtype=np.uint8)
+
+    @classmethod
+    def from_page(cls, page):
+        """Store the words of a PDFPage in columns.
+
+        Args:
+            page: A PDFPage instance.
+
+        Returns:
+            A ColumnarPage instance.
+
+        """
+
+        words = page.words
+
+        # the page fonts come first, fonts only used by words follow
+        font_table = list(page.fonts)
+        font_ixs = dict((font, ix) for ix, font in enumerate(font_table))
+        for word in words:
+            if word.font is not None and word.font not in font_ixs:
+                font_ixs[word.font] = len(font_table)
+                font_table.append(word.font)
+
+        blocks = lines = None
+        if page.layout is not None:
+            pairs = map(lambda p: p or (None, None), page.layout)
+            blocks, lines = map(
+                lambda ix: np.array([-1 if p[ix] is None else p[ix]
+                                     for p in pairs], dtype=np.int32),
+                (0, 1)
+            )
+
+        return cls(page.page_num, page.width, page.height,
+                   _column(words, 'x'), _column(words, 'y'),
+                   _column(words, 'w'), _column(words, 'h'),
+                   np.array([-1 if w.font is None else font_ixs[w.font]
+                             for w in words], dtype=np.int32),
+                   _objects([w.t for w in words]),
+                   font_table, len(page.fonts), page.tier, blocks, lines,
+                   np.array(map(_int_flags, words), dtype=np.uint8))
+
+    def to_page(self):
+        """Build the PDFPage the columns hold."""
+
+        return PDFPage(page_num=self.page_num, width=self.width,
+                       height=self.height, words=self.words,
+                       fonts=self.fonts, tier=self.tier, layout=self.layout)
+
+    def __len__(self):
+
+        return len(self.texts)
+
+    def __getitem__(self, ix):
+        """Build the PDFText instance of a word."""
+
+        font_ix, flags = self.font_ixs[ix], int(self.ints[ix])
+        x, y, w, h = map(lambda (attr, bit): (int if flags & bit else float)(
+            getattr(self, attr)[ix]
+        ), _INT_BITS)
+
+        return PDFText(x, y, w, h, self.texts[ix],
+                       self.font_table[font_ix] if font_ix >= 0 else None)
+
+    def __repr__(self):
+
+        return 'ColumnarPage<page_num=%s, num_words=%s>' % \
+               (self.page_num, len(self))
+
+    @property
+    def fonts(self):
+        """A list of FontSpec instances of the page."""
+
+        return self.font_table[:self.num_page_fonts]
+
+    @property
+    def words(self):
+        """A list of PDFText instances of every word."""
+
+        fonts = [self.font_table[ix] if ix >= 0 else None
+                 for ix in self.font_ixs.tolist()]
+
+        x, y, w, h = map(lambda (attr, bit): _restore_ints(
+            getattr(self, attr), self.ints & bit
+        ), _INT_BITS)
+
+        return map(PDFText, x, y, w, h, list(self.texts), fonts)
+
+    @property
+    def layout(self):
+        """The layout of the page, see PDFPage.layout."""
+
+        if self.lines is None:
+            return None
+
+        return map(lambda b, l: None if l < 0 else
+                                (None if b < 0 else b, l),
+                   self.blocks.tolist(), self.lines.tolist())
+
+    def take(self, selector):
+        """Keep some words of the page.
+
+        Args:
+            selector: A boolean array with an entry per word, or an
+                array of word indices.
+
+        Returns:
+            A ColumnarPage instance.
+
+        """
+
+        return ColumnarPage(
+            self.page_num, self.width, self.height, self.x[selector],
+            self.y[selector], self.w[selector], self.h[selector],
+            self.font_ixs[selector], self.texts[selector], self.font_table,
+            self.num_page_fonts, self.tier,
+            self.blocks[selector] if self.blocks is not None else None,
+            self.lines[selector] if self.lines is not None else None,
+            self.ints[selector]
+        )
+
+    def intersects(self, x, y, w, h):
+        """Get a boolean array of the words overlapping a rectangle.
+
+        The test is the same as `Rectangle.intersect() is not None`, so
+        words only touching the rectangle do not overlap it.
+
+        """
+
+        return _overlaps(self.x, self.w, x, x + w) & \
+               _overlaps(self.y, self.h, y, y + h)
+
+    def crop(self, x, y, w, h):
+        """Keep the words overlapping a rectangle."""
+
+        return self.take(self.intersects(x, y, w, h))
+
+    def to_crop_box_space(self, crop_box):
+        """Move the page into the space of its crop box.
+
+        Does what PDFPage does to the words of `pdftotext`: the page
+        gets the size of the crop box and the words are moved by its
+        origin.
+
+        Args:
+            crop_box: A list of [x0, y0, x1, y1].
+
+        Returns:
+            A ColumnarPage instance.
+
+        """
+
+        ret = self.take(slice(None))
+        ret.width = crop_box[2] - crop_box[0]
+        ret.height = crop_box[3] - crop_box[1]
+        ret.x = self.x - crop_box[0]
+        ret.y = self.y - crop_box[1]
+
+        # a coordinate moved by a float origin becomes a float
+        for (attr, bit), origin in zip(_INT_BITS, crop_box[:2]):
+            if not isinstance(origin, (int, long)):
+                ret.ints = ret.ints & ~np.uint8(bit)
+
+        return ret
+
+    def filter_invisible(self):
+        """Drop spaces and words outside the page, like PDFPage does."""
+
+        is_space = (self.texts == u' ') | (self.texts == u'\u2003')
+
+        return self.take(~is_space &
+                         self.intersects(0, 0, self.width, self.height))
+
+    def bounds(self):
+        """Get the (x0, y0, x1, y1) bounding all words, or None."""
+
+        if len(self) == 0:
+            return None
+
+        return (float(self.x.min()), float(self.y.min()),
+                float((self.x + self.w).max()),
+                float((self.y + self.h).max()))
+
+
+# bits of the integer flags of a word, one per coordinate
+_INT_BITS = [('x', 1), ('y', 2), ('w', 4), ('h', 8)]
+
+def _int_flags(word):
+
+    ret = 0
+    for attr, bit in _INT_BITS:
+        if isinstance(getattr(word, attr), (int, long)):
+            ret |= bit
+
+    return ret
+
+def _restore_ints(values, is_int):
+
+    ret = values.tolist()
+    for ix in np.flatnonzero(is_int).tolist():
+        ret[ix] = int(ret[ix])
+
+    return ret
+
+def _column(words, attr):
+
+    return np.array([getattr(w, attr) for w in words], dtype=np.float64)
+
+def _objects(values):
+
+    ret = np.empty(len(values), dtype=object)
+    ret[:] = values
+
+    return ret
+
+def _overlaps(begins, lengths, begin, end):
+
+    # Interval.intersect() of [begin, end) with every [b, b + l)
+    return np.where(begin < begins, end > begins, begins + lengths > begin)
@@ -0,0 +1,227 @@
+#!/usr/bin/env python
+
+# standard library imports
+from collections import OrderedDict
+import threading
+
+# third party related imports
+
+# local library imports
+from Thor.pdf.backend import get_backend
+
+
+__all__ = ['PDFDocument']
+
+
+class PDFDocument(object):
+    """A pdf document whose metadata and pages are loaded on demand.
+
+    The page count and the page boxes are fetched once, when they are
+    first needed. Pages are extracted when they are indexed and the
+    most recently used ones are kept, so a pipeline handing the same
+    document to every stage never inspects it twice.
+
+    Every function taking the filename of a document, e.g.
+    PDFPage.extract_texts() or the preprocessors, accepts a PDFDocument
+    as well. A document may be shared by threads, e.g. the ones of a
+    PagePipeline.
+
+    Attributes:
+        filename: The absolute path of the pdf document.
+        backend: The Backend instance the document is extracted by.
+        page_cache_size: The maximum number of pages kept in memory.
+
+    """
+
+    page_cache_size = 16
+
+    def __init__(self, filename, backend=None, page_cache_size=None):
+
+        self.filename = filename
+        self.backend = get_backend(backend)
+        if page_cache_size is not None:
+            self.page_cache_size = page_cache_size
+
+        self._info = None
+        self._pages = OrderedDict()
+        self._raw_texts = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def open(cls, filename, backend=None):
+        """Get a document of a filename.
+
+        Args:
+            filename: The absolute path of the pdf document, or a
+                PDFDocument instance which is returned as is.
+            backend: A Backend instance or the name of a registered
+                backend. If omitted, the default backend is used.
+
+        Returns:
+            A PDFDocument instance.
+
+        """
+
+        if isinstance(filename, cls):
+            return filename
+
+        return cls(filename, backend)
+
+    @property
+    def info(self):
+        """The PDFInfo instance of the document."""
+
+        if self._info is None:
+            self._info = self.backend.get_page_bboxes(self.filename)
+
+        return self._info
+
+    @property
+    def num_pages(self):
+        """The number of pages."""
+
+        return self.info.num_pages
+
+    def __len__(self):
+
+        return self.num_pages
+
+    def __getitem__(self, index):
+        """Get a PDFPage by a 0-based index, or a list of them by a slice."""
+
+        if isinstance(index, slice):
+            return self.get_pages(
+                map(lambda ix: ix + 1, xrange(*index.indices(len(self))))
+            )
+
+        if index < 0:
+            index += len(self)
+
+        if not 0 <= index < len(self):
+            raise IndexError('page index out of range')
+
+        return self.get_page(index + 1)
+
+    def __iter__(self):
+        """Generate every page while the extraction backend runs."""
+
+        # PDFPage accepts documents, so it is imported on demand
+        from Thor.pdf.page import PDFPage
+
+        for page in PDFPage.iter_texts(self):
+            self._remember(self._pages, page.page_num, page)
+            yield page
+
+    def __repr__(self):
+
+        return 'PDFDocument<filename=%s>' % self.filename
+
+    def get_page(self, page_num):
+        """Get a PDFPage.
+
+        Args:
+            page_num: The number of page. Should be 1-based.
+
+        Returns:
+            A PDFPage instance. The same instance is returned as long as
+            it is kept in the page cache.
+
+        """
+
+        return self.get_pages([page_num])[0]
+
+    def get_pages(self, page_nums):
+        """Get PDFPages, extracting the missing ones at once.
+
+        Args:
+            page_nums: A list of page numbers. Should be 1-based.
+
+        Returns:
+            A list of PDFPage instances in the order of page_nums.
+
+        """
+
+        # PDFPage accepts documents, so it is imported on demand
+        from Thor.pdf.page import PDFPage
+
+        found = {}
+        for p in page_nums:
+            page = self._touch(self._pages, p)
+            if page is not _MISSING:
+                found[p] = page
+
+        missing = sorted(set(page_nums) - set(found))
+        if len(missing) != 0:
+            for page in PDFPage.extract_texts(self, missing):
+                found[page.page_num] = page
+                self._remember(self._pages, page.page_num, page)
+
+        return map(lambda p: found[p], page_nums)
+
+    def get_page_bboxes(self, page_num):
+        """Get page boxes of a page, see PDFPage.get_page_bboxes()."""
+
+        return self.info.get_page_bboxes(page_num)
+
+    def extract_raw_texts(self, page_num):
+        """Get texts of a page in content stream order.
+
+        Args:
+            page_num: The number of page. Should be 1-based.
+
+        Returns:
+            A list of lines.
+
+        """
+
+        raw_texts = self._touch(self._raw_texts, page_num)
+        if raw_texts is not _MISSING:
+            return raw_texts
+
+        raw_texts = self.backend.extract_raw_texts(self.filename, page_num)
+        self._remember(self._raw_texts, page_num, raw_texts)
+
+        return raw_texts
+
+    def extract_raw_texts_of_pages(self, first=None, last=None):
+        """Get texts of consecutive pages in content stream order.
+
+        The pages are extracted at once, see
+        PDFPage.extract_raw_texts_of_pages(), and kept for
+        extract_raw_texts().
+
+        Args:
+            first: The first page number. Should be 1-based. If omitted,
+                all pages are extracted.
+            last: The last page number.
+
+        Returns:
+            A list of line lists in page order.
+
+        """
+
+        ret = self.backend.extract_raw_texts_of_pages(self.filename,
+                                                      first, last)
+        for ix, raw_texts in enumerate(ret):
+            self._remember(self._raw_texts, (first or 1) + ix, raw_texts)
+
+        return ret
+
+    def _touch(self, cache, key):
+
+        with self._lock:
+            value = cache.pop(key, _MISSING)
+            if value is not _MISSING:
+                cache[key] = value
+            return value
+
+    def _remember(self, cache, key, value):
+
+        with self._lock:
+            cache.pop(key, None)
+            cache[key] = value
+            while len(cache) > self.page_cache_size:
+                cache.popitem(last=False)
+
+
+_MISSING = object()
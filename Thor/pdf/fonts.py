@@ -0,0 +1,213 @@
+#!/usr/bin/env python
+
+# standard library imports
+from collections import Counter, OrderedDict, defaultdict
+
+# third party related imports
+from pyquery import PyQuery
+
+# local library imports
+from Thor.utils.FontSpec import FontSpec
+
+
+__all__ = ['assign_fonts', 'crop_texts', 'dominant_font', 'match_word',
+           'parse_font_xml', 'pdftohtml_command']
+
+
+def pdftohtml_command(filename, first=None, last=None):
+    """The `pdftohtml -xml` command writing to standard output.
+
+    Args:
+        filename: The absolute path of the specified pdf document.
+        first: The first page number to convert. Should be 1-based. If
+            omitted, all pages are converted.
+        last: The last page number to convert.
+
+    """
+
+    cmd = ['pdftohtml', '-i', '-xml', '-zoom', '1']
+    if first is not None:
+        cmd.extend(('-f', str(first), '-l', str(last)))
+    cmd.extend(('-stdout', '-nodrm', filename))
+
+    return tuple(cmd)
+
+def parse_font_xml(xml_stream):
+    """Parse the output of `pdftohtml -xml`.
+
+    Font ids are shared by the whole output, while a font spec is only
+    declared in the first page using it.
+
+    Args:
+        xml_stream: An XML string.
+
+    Returns:
+        A tuple of an OrderedDict mapping font ids to FontSpec instances
+        and a list of page dicts, e.g.
+
+        {
+            'page': 1,
+            'width': 595.0, 'height': 842.0,
+            'fonts': [FontSpec, ...],  # used by texts of the page
+            'texts': [
+                {
+                    'top': 772.0, 'left': 28.0,
+                    'width': 4.0, 'height': 9.0,
+                    'text': u'9', 'font': FontSpec,
+                },
+                ...
+            ],
+        }
+
+    """
+
+    start = xml_stream.find('<pdf2xml')
+    end = xml_stream.find('</pdf2xml>') + 10
+    jq = PyQuery(xml_stream[start:end])
+
+    fontspecs = OrderedDict()
+    for fs in jq('fontspec'):
+        attr = fs.attrib
+        fid, fsize, fcolor = attr['id'], attr['size'], attr['color']
+        fontspecs[fid] = FontSpec(size=int(fsize), color=fcolor[1:])
+
+    pages = []
+    for page_element in jq('page'):
+        texts, font_ids = [], OrderedDict()
+        for text in page_element.iter('text'):
+            attr = text.attrib
+            width, height = float(attr['width']), float(attr['height'])
+            font_ids[attr['font']] = True
+
+            texts.append({
+                'top': float(attr['top']), 'left': float(attr['left']),
+                # it is pdftohtml bug
+                'width': height if width == 0 else width,
+                'height': height,
+                'text': text.text,
+                'font': fontspecs[attr['font']],
+            })
+
+        pages.append({
+            'page': int(page_element.attrib.get('number', len(pages) + 1)),
+            'width': float(page_element.attrib['width']),
+            'height': float(page_element.attrib['height']),
+            'fonts': map(lambda fid: fontspecs[fid], font_ids),
+            'texts': texts,
+        })
+
+    return fontspecs, pages
+
+def crop_texts(font_page, crop_box):
+    """Drop texts outside the page and move the rest to crop box space.
+
+    Args:
+        font_page: A page dict of parse_font_xml().
+        crop_box: The crop box of the page.
+
+    Returns:
+        A list of text dicts.
+
+    """
+
+    ret = []
+    page_width, page_height = font_page['width'], font_page['height']
+
+    for text in font_page['texts']:
+        top, left = text['top'], text['left']
+        width, height = text['width'], text['height']
+
+        if  (top >= page_height or top + height <= 0) or \
+            (left + width <= 0 or left > page_width):
+            continue
+
+        ret.append({
+            'top': top - crop_box[1], 'left': left - crop_box[0],
+            'width': width, 'height': height,
+            'text': text['text'],
+            'font': text['font'],
+        })
+
+    return ret
+
+def match_word(words, text):
+    """Match a textual object of pdftohtml to a word of a PDFPage.
+
+    Currently, the matching process only uses geometry information.
+    No textual information is used.
+
+    Args:
+        words: A list of PDFText instances.
+        text: A text dict of crop_texts().
+
+    Returns:
+        A PDFText instance or None.
+
+    """
+
+    x, y = text['left'], text['top']
+    w, h = text['width'], text['height']
+    center_x, center_y = x + w / 2., y + h / 2.
+
+    for word in words:
+        if  (word.x <= center_x <= word.x + word.w) and \
+            (word.y <= center_y <= word.y + word.h):
+            return word
+
+    return None
+
+def assign_fonts(page, texts, font_specs):
+    """Give every word of a page the font spec most of its texts use.
+
+    Args:
+        page: A PDFPage instance, modified in place.
+        texts: A list of text dicts of crop_texts().
+        font_specs: A list of FontSpec instances used by the page.
+
+    """
+
+    page.fonts = font_specs
+
+    votes = defaultdict(Counter)
+    for text in texts:
+        match = match_word(page.words, text)
+        if match is not None:
+            votes[id(match)][text['font']] += 1
+
+    for match_word_id in votes:
+        for word in page.words:
+            if id(word) == match_word_id:
+                counter = votes[match_word_id]
+                most_fontspec = counter.most_common(1)[0]
+
+                fontspec_found = False
+                for fontspec in page.fonts:
+                    if fontspec == most_fontspec[0]:
+                        word._font = fontspec
+                        fontspec_found = True
+                        break
+
+                if fontspec_found:
+                    break
+
+def dominant_font(word_objs):
+    """The serialized font spec covering most characters of words.
+
+    Args:
+        word_objs: A list of word dicts, e.g. PDFText.__json__().
+
+    Returns:
+        A serialized FontSpec, or None if no word has a font spec.
+
+    """
+
+    counter = Counter()
+    for word_obj in word_objs:
+        font = FontSpec.deserialize(word_obj.get('font'))
+        if font is not None:
+            counter[font] += len(word_obj['t'] or '')
+
+    if len(counter) == 0:
+        return None
+
+    return counter.most_common(1)[0][0].__json__()
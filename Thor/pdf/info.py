@@ -0,0 +1,175 @@
+#!/usr/bin/env python
+
+# standard library imports
+from collections import OrderedDict
+import os
+import re
+import threading
+
+# third party related imports
+
+# local library imports
+from Thor.pdf import poppler
+from Thor.pdf.reactor import Future
+
+
+__all__ = ['PDFInfo', 'PDFInfoException']
+
+
+class PDFInfoException(Exception): pass
+
+
+class PDFInfo(object):
+    """Document-level information reported by `pdfinfo`.
+
+    The page count and the page boxes of every page are parsed from one
+    `pdfinfo -box` run over the whole document. Loaded instances are
+    memoized per file, so the document is only inspected again when it
+    changes on disk.
+
+    Attributes:
+        filename: The absolute path of the pdf document.
+        num_pages: An integer that is the number of pages.
+        boxes: A dict mapping 1-based page numbers to box dicts, see
+            get_page_bboxes().
+
+    """
+
+    # pdfinfo clamps the last page to the page count of the document
+    LAST_PAGE = 2 ** 31 - 1
+
+    BOX_NAMES = {
+        'MediaBox:': 'media',
+        'CropBox:': 'crop',
+        'BleedBox:': 'bleed',
+        'TrimBox:': 'trim',
+        'ArtBox:': 'art',
+    }
+
+    RE_PAGES = re.compile(r'^Pages:\s*(\d+)', re.MULTILINE)
+
+    cache_size = 32
+    _cache = OrderedDict()
+    _cache_lock = threading.Lock()
+
+    def __init__(self, filename, num_pages=0, boxes=None):
+
+        self.filename = filename
+        self.num_pages = num_pages
+        self.boxes = boxes or {}
+
+    @classmethod
+    def load(cls, filename):
+        """Get the information of a pdf document.
+
+        Args:
+            filename: The absolute path of the specified pdf document.
+
+        Returns:
+            A PDFInfo instance.
+
+        """
+
+        key = cls._cache_key(filename)
+        with cls._cache_lock:
+            info = cls._cache.get(key)
+        if info is None:
+            info = cls.parse(filename,
+                             poppler.check_output(cls._command(filename)))
+
+        return cls._remember(key, info)
+
+    @classmethod
+    def load_async(cls, reactor, filename):
+        """Get the information of a pdf document without blocking.
+
+        Args:
+            reactor: A Reactor instance to run `pdfinfo` on.
+            filename: The absolute path of the specified pdf document.
+
+        Returns:
+            A Future of a PDFInfo instance.
+
+        """
+
+        key = cls._cache_key(filename)
+        with cls._cache_lock:
+            info = cls._cache.get(key)
+        if info is not None:
+            return Future.completed(cls._remember(key, info))
+
+        return reactor.spawn(cls._command(filename)).then(
+            lambda pdf_info: cls._remember(key, cls.parse(filename, pdf_info))
+        )
+
+    @classmethod
+    def parse(cls, filename, pdf_info):
+        """Parse the output of `pdfinfo -box -f first -l last`.
+
+        Args:
+            filename: The absolute path of the pdf document.
+            pdf_info: The output string of pdfinfo.
+
+        Returns:
+            A PDFInfo instance.
+
+        """
+
+        match_obj = cls.RE_PAGES.search(pdf_info)
+        if match_obj is None:
+            raise PDFInfoException('Do not find the number of pages')
+
+        boxes = {}
+        for line in pdf_info.splitlines():
+            line = filter(lambda x: x != '', line.split(' '))
+
+            # e.g. Page    1 MediaBox:     0.00     0.00   683.15   853.23
+            if len(line) < 7 or line[0] != 'Page' or \
+               line[2] not in cls.BOX_NAMES:
+                continue
+
+            page_boxes = boxes.setdefault(int(line[1]), {})
+            page_boxes[cls.BOX_NAMES[line[2]]] = map(float, line[3:7])
+
+        return cls(filename, int(match_obj.group(1)), boxes)
+
+    @classmethod
+    def _command(cls, filename):
+
+        return ('pdfinfo', '-box', '-f', '1', '-l', str(cls.LAST_PAGE),
+                filename)
+
+    @classmethod
+    def _cache_key(cls, filename):
+
+        stat = os.stat(filename)
+        return (os.path.abspath(filename), stat.st_mtime, stat.st_size)
+
+    @classmethod
+    def _remember(cls, key, info):
+
+        with cls._cache_lock:
+            cls._cache.pop(key, None)
+            cls._cache[key] = info
+            while len(cls._cache) > cls.cache_size:
+                cls._cache.popitem(last=False)
+
+        return info
+
+    def get_page_bboxes(self, page_num):
+        """
+        Get media box, crop box, bleed box, trim box, art box
+        information of the specified PDF page.
+
+        Args:
+            page_num: The number of page. Should be 1-based.
+
+        Returns:
+            A dict like PDFPage.get_page_bboxes().
+
+        """
+
+        if page_num not in self.boxes:
+            raise PDFInfoException('No such page: %s' % page_num)
+
+        return {name: box[:] for name, box in self.boxes[page_num].items()}
@@ -0,0 +1,156 @@
+#!/usr/bin/env python
+
+# standard library imports
+from collections import Counter, OrderedDict
+import copy
+import hashlib
+import threading
+
+# third party related imports
+
+# local library imports
+from Thor.pdf.page import PDFPage
+
+
+__all__ = ['PageMemo']
+
+
+class PageMemo(object):
+    """Reuse the stage outputs of duplicate pages within a job.
+
+    Catalogues and forms repeat the same pages over and over. A page is
+    fingerprinted from its size, its word texts, its rounded word boxes,
+    its fonts and its layout. When a stage meets a fingerprint it has
+    seen before, the output is copied instead of computed.
+
+    A stage reading more than the page, e.g. the raw texts or the fonts
+    of poppler, gets those inputs as key material, so pages with the
+    same words but other inputs are not mixed up, e.g.
+
+        memo = PageMemo()
+        for inputs in PagePipeline(document).run(page_nums):
+            page = memo.run('raw', inputs.page,
+                            lambda p: RawTextPreprocessor(
+                                document, p, inputs.raw_texts).run(),
+                            inputs.raw_texts)
+            blocks = memo.run('xycut', page, XYCut().run)
+
+    A stage producing a PDFPage gets a copy renumbered to the input
+    page. One memo should only be shared by pages of the same document
+    and the same stage settings. A memo can be shared by threads; its
+    outputs and counters are kept under a lock, while the stages run
+    outside of it.
+
+    Attributes:
+        precision: The number of decimals boxes are rounded to.
+        max_entries: The maximum number of outputs kept.
+        hits: A Counter of reused outputs per stage.
+        misses: A Counter of computed outputs per stage.
+
+    """
+
+    def __init__(self, precision=1, max_entries=256):
+
+        self.precision = precision
+        self.max_entries = max_entries
+        self.hits = Counter()
+        self.misses = Counter()
+
+        self._outputs = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def stats(self):
+        """A dict mapping stage names to hit/miss counters."""
+
+        with self._lock:
+            stages = set(self.hits) | set(self.misses)
+
+            return dict((stage, {'hits': self.hits[stage],
+                                 'misses': self.misses[stage]})
+                        for stage in stages)
+
+    def fingerprint(self, page, material=None):
+        """Get the fingerprint of a PDFPage.
+
+        Args:
+            page: A PDFPage instance.
+            material: Further inputs of the stage, e.g. a list of raw
+                texts, or None. Anything with a stable repr() will do.
+
+        Returns:
+            A hex string.
+
+        """
+
+        ndigits = self.precision
+        sha1 = hashlib.sha1()
+        sha1.update(repr((round(page.width, ndigits),
+                          round(page.height, ndigits))))
+
+        for word in page.words:
+            sha1.update(repr((
+                word.t,
+                round(word.x, ndigits), round(word.y, ndigits),
+                round(word.w, ndigits), round(word.h, ndigits),
+                _font_key(word.font),
+            )))
+
+        sha1.update(repr(map(_font_key, page.fonts)))
+        sha1.update(repr(page.layout))
+
+        if material is not None:
+            sha1.update(repr(material))
+
+        return sha1.hexdigest()
+
+    def run(self, stage, page, fn, material=None):
+        """Get the output of a stage for a page.
+
+        Args:
+            stage: The name of the stage, e.g. 'raw'.
+            page: A PDFPage instance.
+            fn: A function computing the output from the page.
+            material: Further inputs fn reads besides the page, see
+                fingerprint().
+
+        Returns:
+            The output of fn(page), or a copy of the output computed for
+            a duplicate page.
+
+        """
+
+        key = (stage, self.fingerprint(page, material))
+
+        with self._lock:
+            stored = self._outputs.pop(key, _MISSING)
+            if stored is _MISSING:
+                self.misses[stage] += 1
+            else:
+                self.hits[stage] += 1
+                self._outputs[key] = stored
+
+        # stored outputs are never changed, so they are copied unlocked
+        if stored is not _MISSING:
+            output = copy.deepcopy(stored)
+            if isinstance(output, PDFPage):
+                output.page_num = page.page_num
+
+            return output
+
+        output = fn(page)
+        stored = copy.deepcopy(output)
+
+        with self._lock:
+            self._outputs[key] = stored
+            while len(self._outputs) > self.max_entries:
+                self._outputs.popitem(last=False)
+
+        return output
+
+
+_MISSING = object()
+
+def _font_key(font):
+
+    return None if font is None else (font.size, font.color)
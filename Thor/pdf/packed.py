@@ -0,0 +1,573 @@
+#!/usr/bin/env python
+
+# standard library imports
+from array import array
+from contextlib import closing
+import mmap
+import multiprocessing
+import os
+import os.path
+import shutil
+import struct
+import sys
+import tempfile
+
+# third party related imports
+import ujson
+
+# local library imports
+from Thor.pdf.page import PDFPage
+from Thor.pdf.text import PDFText
+from Thor.utils.FontSpec import FontSpec
+
+
+__all__ = ['LazyPage', 'PackedPage', 'PackedPageException', 'SharedPages',
+           'dump_pages', 'load_pages', 'map_pages', 'pack_page']
+
+
+class PackedPageException(Exception): pass
+
+
+# the directory shared memory files are created in
+SHM_DIR = '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir()
+
+# magic, version, page number, width, height, number of words, number of
+# fonts, number of page fonts, bytes of the tier, bytes of the fonts,
+# bytes of the texts, whether the layout is packed and which of width and
+# height are integers
+_HEADER = struct.Struct('<4sHiddIIIiIIBB')
+_MAGIC = 'TPAG'
+_VERSION = 3
+
+_SHARED_HEADER = struct.Struct('<4sI')
+_SHARED_MAGIC = 'TSHM'
+
+_DOUBLE = struct.Struct('<d')
+_INT = struct.Struct('<i')
+_UINT = struct.Struct('<I')
+_BYTE = struct.Struct('<B')
+
+# the geometry columns, in the order they are packed
+COLUMNS = ('x', 'y', 'w', 'h')
+
+# bits of the integer flags of a word, one per column
+_INT_BITS = dict((attr, 1 << ix) for ix, attr in enumerate(COLUMNS))
+
+def pack_page(page):
+    """Pack a PDFPage into a compact binary string.
+
+    A packed page holds the page attributes in a fixed header, then one
+    column of doubles per coordinate, the font index of every word, a
+    byte per word flagging its integer coordinates, the block and line
+    indices of every word if the page has a layout, the offsets of every
+    text in a UTF-8 blob, the font table and the blob. A packed page is
+    read through a PackedPage without building any PDFText instance.
+
+    Coordinates are stored as doubles; integer ones are flagged, so they
+    come back as integers.
+
+    Args:
+        page: A PDFPage instance.
+
+    Returns:
+        A string.
+
+    """
+
+    words = page.words
+    num_words = len(words)
+
+    # the page fonts come first, fonts only used by words follow
+    fonts = list(page.fonts)
+    font_ixs = dict((font, ix) for ix, font in enumerate(fonts))
+    for word in words:
+        if word.font is not None and word.font not in font_ixs:
+            font_ixs[word.font] = len(fonts)
+            fonts.append(word.font)
+
+    texts = map(lambda w: w.t.encode('utf8'), words)
+    offsets = array('I', [0] * (num_words + 1))
+    for ix, text in enumerate(texts):
+        offsets[ix + 1] = offsets[ix] + len(text)
+
+    tier = '' if page.tier is None else page.tier.encode('utf8')
+    font_blob = ujson.dumps(map(lambda f: f.__json__(), fonts))
+    text_blob = ''.join(texts)
+
+    parts = [_HEADER.pack(_MAGIC, _VERSION, page.page_num, page.width,
+                          page.height, num_words, len(fonts),
+                          len(page.fonts),
+                          -1 if page.tier is None else len(tier),
+                          len(font_blob), len(text_blob),
+                          page.layout is not None,
+                          _int_flags(page, ('width', 'height'))),
+             tier]
+    for attr in COLUMNS:
+        parts.append(_to_bytes(array('d', map(lambda w: getattr(w, attr),
+                                              words))))
+    parts.append(_to_bytes(array('i', map(
+        lambda w: -1 if w.font is None else font_ixs[w.font], words
+    ))))
+    parts.append(_to_bytes(array('B', map(
+        lambda w: _int_flags(w, COLUMNS), words
+    ))))
+    if page.layout is not None:
+        pairs = map(lambda p: p or (None, None), page.layout)
+        for ix in (0, 1):
+            parts.append(_to_bytes(array('i', map(
+                lambda p: -1 if p[ix] is None else p[ix], pairs
+            ))))
+    parts.append(_to_bytes(offsets))
+    parts.append(font_blob)
+    parts.append(text_blob)
+
+    return ''.join(parts)
+
+
+class PackedPage(object):
+    """A read-only view of a packed page inside a buffer.
+
+    The buffer may be a string or an mmap, e.g. of SharedPages. Only the
+    header is read up front; words are read from the buffer when they
+    are asked for.
+
+    Attributes:
+        page_num: The page number.
+        width: The width of the page.
+        height: The height of the page.
+        tier: The preprocessing tier of the page, or None.
+        num_words: The number of words.
+        size: The number of bytes of the packed page.
+
+    """
+
+    def __init__(self, buf, offset=0):
+
+        (magic, version, self.page_num, self.width, self.height,
+         self.num_words, num_fonts, self._num_page_fonts, tier_size,
+         font_size, text_size, has_layout,
+         int_flags) = _HEADER.unpack_from(buf, offset)
+
+        if magic != _MAGIC or version != _VERSION:
+            raise PackedPageException('Not a packed page at %d' % offset)
+
+        if int_flags & 1:
+            self.width = int(self.width)
+        if int_flags & 2:
+            self.height = int(self.height)
+
+        self._buf = buf
+        pos = offset + _HEADER.size
+
+        self.tier = None
+        if tier_size >= 0:
+            self.tier = buf[pos:pos + tier_size].decode('utf8')
+            pos += tier_size
+
+        n = self.num_words
+        self._columns = {}
+        for attr in COLUMNS:
+            self._columns[attr] = pos
+            pos += _DOUBLE.size * n
+
+        self._font_ixs = pos
+        pos += _INT.size * n
+        self._int_flags = pos
+        pos += _BYTE.size * n
+        self._layout = None
+        if has_layout:
+            self._layout = pos
+            pos += _INT.size * n * 2
+        self._offsets = pos
+        pos += _UINT.size * (n + 1)
+
+        self._fonts = map(FontSpec.deserialize,
+                          ujson.loads(buf[pos:pos + font_size]))
+        pos += font_size
+
+        self._texts = pos
+        self.size = pos + text_size - offset
+
+    def __len__(self):
+
+        return self.num_words
+
+    def __repr__(self):
+
+        return 'PackedPage<page_num=%s, num_words=%s>' % \
+               (self.page_num, self.num_words)
+
+    @property
+    def fonts(self):
+        """A list of FontSpec instances of the page."""
+
+        return self._fonts[:self._num_page_fonts]
+
+    def get(self, attr, ix):
+        """Get a coordinate of a word, e.g. get('x', 0)."""
+
+        value = _DOUBLE.unpack_from(self._buf, self._columns[attr] +
+                                               _DOUBLE.size * ix)[0]
+        flags = _BYTE.unpack_from(self._buf, self._int_flags + ix)[0]
+
+        return int(value) if flags & _INT_BITS[attr] else value
+
+    def column(self, attr):
+        """Get a coordinate of every word as an array of doubles.
+
+        Integer coordinates are doubles here as well; get() and words()
+        give them back as integers.
+
+        """
+
+        start = self._columns[attr]
+        return _from_bytes('d', self._buf[start:start + _DOUBLE.size *
+                                                     self.num_words])
+
+    def text(self, ix):
+        """Get the text of a word."""
+
+        start, end = struct.unpack_from(
+            '<2I', self._buf, self._offsets + _UINT.size * ix
+        )
+        return self._buf[self._texts + start:self._texts + end].decode('utf8')
+
+    def font(self, ix):
+        """Get the FontSpec instance of a word, or None."""
+
+        font_ix = _INT.unpack_from(self._buf,
+                                   self._font_ixs + _INT.size * ix)[0]
+        return None if font_ix < 0 else self._fonts[font_ix]
+
+    @property
+    def layout(self):
+        """The layout of the page, see PDFPage.layout."""
+
+        if self._layout is None:
+            return None
+
+        start, size = self._layout, _INT.size * self.num_words
+        blocks = _from_bytes('i', self._buf[start:start + size])
+        lines = _from_bytes('i', self._buf[start + size:start + 2 * size])
+
+        return map(lambda b, l: None if l < 0 else
+                                (None if b < 0 else b, l), blocks, lines)
+
+    def words(self):
+        """Build the PDFText instances of every word."""
+
+        n = self.num_words
+        columns = map(self.column, COLUMNS)
+        font_ixs = _from_bytes('i', self._buf[self._font_ixs:
+                                              self._font_ixs + _INT.size * n])
+        int_flags = _from_bytes('B', self._buf[self._int_flags:
+                                               self._int_flags + n])
+        offsets = _from_bytes('I', self._buf[self._offsets:
+                                             self._offsets +
+                                             _UINT.size * (n + 1)])
+        blob = self._buf[self._texts:self._texts + offsets[-1]]
+
+        words = []
+        for ix in xrange(n):
+            font_ix, flags = font_ixs[ix], int_flags[ix]
+            coords = [int(column[ix]) if flags & (1 << k) else column[ix]
+                      for k, column in enumerate(columns)]
+            text = blob[offsets[ix]:offsets[ix + 1]].decode('utf8')
+            words.append(PDFText(
+                coords[0], coords[1], coords[2], coords[3], text,
+                None if font_ix < 0 else self._fonts[font_ix]
+            ))
+
+        return words
+
+    def to_page(self):
+        """Build the PDFPage instance the page was packed from."""
+
+        return PDFPage(page_num=self.page_num, width=self.width,
+                       height=self.height, words=self.words(),
+                       fonts=self.fonts, tier=self.tier, layout=self.layout)
+
+
+class LazyPage(PDFPage):
+    """A PDFPage whose words are built from a PackedPage on first use.
+
+    The page attributes come from the header right away, so pages only
+    passed along, e.g. counted or filtered by page number, never build
+    their PDFText instances. Pickling or copying a LazyPage gives a
+    plain PDFPage.
+
+    Attributes:
+        packed: The PackedPage instance, or None once every word and the
+            layout are built.
+
+    """
+
+    def __init__(self, packed):
+
+        self.page_num = packed.page_num
+        self.width = packed.width
+        self.height = packed.height
+        self.fonts = packed.fonts
+        self.tier = packed.tier
+        self.packed = packed
+
+        self._words = self._layout = _MISSING
+
+    @property
+    def words(self):
+        """A list of PDFText instances."""
+
+        if self._words is _MISSING:
+            self._words = self.packed.words()
+            self._release()
+
+        return self._words
+
+    @words.setter
+    def words(self, words):
+
+        self._words = words
+        self._release()
+
+    @property
+    def layout(self):
+        """The layout of the page, see PDFPage.layout."""
+
+        if self._layout is _MISSING:
+            self._layout = self.packed.layout
+            self._release()
+
+        return self._layout
+
+    @layout.setter
+    def layout(self, layout):
+
+        self._layout = layout
+        self._release()
+
+    def __reduce__(self):
+
+        return (PDFPage, (self.page_num, self.width, self.height, self.words,
+                          self.fonts, self.tier, self.layout))
+
+    def _release(self):
+
+        # the buffer, e.g. an mmap, is freed along with the last view
+        if self._words is not _MISSING and self._layout is not _MISSING:
+            self.packed = None
+
+
+class SharedPages(object):
+    """Packed pages in a memory-mapped file, e.g. under /dev/shm.
+
+    A process creates the file and hands its name to other processes,
+    which attach to it and read pages without copying them through a
+    pipe. The file is removed by unlink(), or by whoever removes the
+    directory it is created in.
+
+    Attributes:
+        name: The path of the file.
+
+    """
+
+    def __init__(self, name, buf):
+
+        self.name = name
+        self._buf = buf
+
+        magic, count = _SHARED_HEADER.unpack_from(buf, 0)
+        if magic != _SHARED_MAGIC:
+            raise PackedPageException('Not shared pages: %s' % name)
+
+        self._offsets = struct.unpack_from('<%dQ' % count, buf,
+                                           _SHARED_HEADER.size)
+
+    @classmethod
+    def create(cls, pages, directory=None):
+        """Pack pages into a new shared memory file.
+
+        Args:
+            pages: A list of PDFPage instances.
+            directory: The directory of the file. If omitted, SHM_DIR is
+                used.
+
+        Returns:
+            A SharedPages instance attached to the file.
+
+        """
+
+        packed = map(pack_page, pages)
+
+        offsets, pos = [], _SHARED_HEADER.size + 8 * len(packed)
+        for data in packed:
+            offsets.append(pos)
+            pos += len(data)
+
+        fd, name = tempfile.mkstemp(prefix='thor-', suffix='.pages',
+                                    dir=directory or SHM_DIR)
+        with closing(os.fdopen(fd, 'wb')) as f:
+            f.write(_SHARED_HEADER.pack(_SHARED_MAGIC, len(packed)))
+            f.write(struct.pack('<%dQ' % len(offsets), *offsets))
+            for data in packed:
+                f.write(data)
+
+        return cls.attach(name)
+
+    @classmethod
+    def attach(cls, name):
+        """Map an existing shared memory file read-only."""
+
+        with closing(open(name, 'rb')) as f:
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        return cls(name, buf)
+
+    def __len__(self):
+
+        return len(self._offsets)
+
+    def __getitem__(self, ix):
+        """Get a PackedPage view of a page."""
+
+        return PackedPage(self._buf, self._offsets[ix])
+
+    def __enter__(self):
+
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+
+        self.close()
+
+    def __repr__(self):
+
+        return 'SharedPages<name=%s, count=%s>' % (self.name, len(self))
+
+    def pages(self):
+        """Build every PDFPage instance."""
+
+        return map(lambda ix: self[ix].to_page(), xrange(len(self)))
+
+    def close(self):
+        """Detach from the file."""
+
+        self._buf.close()
+
+    def unlink(self):
+        """Remove the file. Attached processes can still read it."""
+
+        try:
+            os.unlink(self.name)
+        except OSError:
+            pass
+
+
+def map_pages(fn, pages, workers=None, chunks=None):
+    """Run a function on pages in worker processes.
+
+    Pages go to the workers and come back through shared memory files
+    instead of being pickled, e.g.
+
+        pages = map_pages(run_naive, pages, workers=4)
+
+    Args:
+        fn: A picklable function taking a PDFPage and returning one,
+            e.g. a module-level function.
+        pages: A list of PDFPage instances.
+        workers: The number of processes. If omitted, the number of
+            CPUs is used.
+        chunks: The number of chunks pages are split into. If omitted,
+            four chunks per worker are used.
+
+    Returns:
+        A list of the returned PDFPage instances in page order.
+
+    """
+
+    if len(pages) == 0:
+        return []
+
+    workers = workers or multiprocessing.cpu_count()
+    chunks = min(len(pages), chunks or workers * 4)
+    size, remainder = divmod(len(pages), chunks)
+
+    directory = tempfile.mkdtemp(prefix='thor-', dir=SHM_DIR)
+    try:
+        with SharedPages.create(pages, directory) as shared:
+            tasks, start = [], 0
+            for ix in xrange(chunks):
+                end = start + size + (1 if ix < remainder else 0)
+                tasks.append((fn, shared.name, start, end, directory))
+                start = end
+
+            pool = multiprocessing.Pool(min(workers, chunks))
+            try:
+                names = pool.map(_map_chunk, tasks)
+                pool.close()
+            except:
+                pool.terminate()
+                raise
+            finally:
+                pool.join()
+
+        return [page for name in names for page in load_pages(name)]
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+def dump_pages(pages, directory=None):
+    """Pack pages into a shared memory file and get its name."""
+
+    with SharedPages.create(pages, directory) as shared:
+        return shared.name
+
+def load_pages(name):
+    """Get the pages of a shared memory file and remove it.
+
+    The file is removed right away, but stays mapped until the words
+    of every page are built, see LazyPage.
+
+    Returns:
+        A list of LazyPage instances.
+
+    """
+
+    shared = SharedPages.attach(name)
+    shared.unlink()
+
+    return map(lambda ix: LazyPage(shared[ix]), xrange(len(shared)))
+
+
+_MISSING = object()
+
+def _int_flags(obj, attrs):
+
+    ret = 0
+    for ix, attr in enumerate(attrs):
+        if isinstance(getattr(obj, attr), (int, long)):
+            ret |= 1 << ix
+
+    return ret
+
+def _map_chunk(args):
+
+    fn, name, start, end, directory = args
+    with SharedPages.attach(name) as shared:
+        outputs = map(lambda ix: fn(shared[ix].to_page()), xrange(start, end))
+
+    return dump_pages(outputs, directory)
+
+def _to_bytes(values):
+
+    if sys.byteorder != 'little':
+        values.byteswap()
+
+    return values.tostring()
+
+def _from_bytes(typecode, data):
+
+    ret = array(typecode)
+    ret.fromstring(data)
+    if sys.byteorder != 'little':
+        ret.byteswap()
+
+    return ret
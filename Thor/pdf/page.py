@@ -1,24 +1,35 @@
 #!/usr/bin/env python
 
 # standard library imports
-from contextlib import closing
-from tempfile import NamedTemporaryFile
-import subprocess
+from cStringIO import StringIO
+import multiprocessing
+import shutil
+import tempfile
 
 # third party related imports
-from pyquery import PyQuery
 import ujson
 
 # local library imports
+from Thor.pdf.backend import PopplerBackend, split_raw_pages
+from Thor.pdf.document import PDFDocument
+from Thor.pdf.fonts import assign_fonts, crop_texts
+from Thor.pdf.info import PDFInfo
+from Thor.pdf.poppler import PopplerTimeoutException
+from Thor.pdf.reactor import Future
 from Thor.pdf.text import PDFText
 from Thor.utils.FontSpec import FontSpec
-from Thor.utils.PdfXmlParser import PDFXMLParser
+from Thor.utils.PdfXmlParser import iter_pages
 from Thor.utils.Rectangle import Rectangle
 
 
 __all__ = ['PDFPage']
 
 
+# the number of page chunks handed to each worker process, more chunks
+# balance uneven pages better but launch more `pdftotext` processes
+WORKER_CHUNKS = 4
+
+
 class PDFPage(object):
     """PDF page
 
@@ -28,16 +39,25 @@ class PDFPage(object):
         height: The height of the page
         words: A list of PDFText instances.
         fonts: A list of FontSpec instances.
+        tier: The name of the preprocessing tier the page went through,
+            or None if it is not preprocessed.
+        layout: A list of (block, line) index pairs, one per word, as
+            grouped by `pdftotext -bbox-layout`, or None if the page is
+            extracted without layout. A pair is None for a word in no
+            line.
 
     """
 
-    def __init__(self, page_num=0, width=0, height=0, words=None, fonts=None):
+    def __init__(self, page_num=0, width=0, height=0, words=None, fonts=None,
+                 tier=None, layout=None):
 
         self.page_num = page_num
         self.width = width
         self.height = height
         self.words = words or []
         self.fonts = fonts or []
+        self.tier = tier
+        self.layout = layout
 
         if not all((isinstance(w, PDFText) for w in self.words)):
             raise ValueError(unicode(self.words))
@@ -45,9 +65,12 @@ class PDFPage(object):
         if not all((isinstance(f, FontSpec) for f in self.fonts)):
             raise ValueError('fonts should be instances of FontSpec')
 
+        if layout is not None and len(layout) != len(self.words):
+            raise ValueError('layout should have a pair for every word')
+
     def __json__(self):
 
-        return {
+        ret = {
             'page': self.page_num,
             'width': self.width,
             'height': self.height,
@@ -55,6 +78,15 @@ class PDFPage(object):
             'fonts': map(lambda f: f.__json__(), self.fonts),
         }
 
+        if self.tier is not None:
+            ret['tier'] = self.tier
+
+        if self.layout is not None:
+            ret['layout'] = map(lambda p: list(p) if p is not None else None,
+                                self.layout)
+
+        return ret
+
     def serialize(self):
         """Serialize to JSON"""
 
@@ -74,13 +106,20 @@ class PDFPage(object):
 
         deserialized = ujson.loads(serialized)
 
+        layout = deserialized.get('layout')
+        if layout is not None:
+            layout = map(lambda p: tuple(p) if p is not None else None,
+                         layout)
+
         return PDFPage(page_num=deserialized.get('page', 0),
                        width=deserialized.get('width', 0),
                        height=deserialized.get('height', 0),
                        words=map(PDFText.create_from_dict,
                                  deserialized.get('data')),
                        fonts=map(FontSpec.deserialize,
-                                 deserialized.get('fonts', [])))
+                                 deserialized.get('fonts', [])),
+                       tier=deserialized.get('tier'),
+                       layout=layout)
 
     @classmethod
     def dumps(cls, page):
@@ -97,52 +136,191 @@ class PDFPage(object):
         return ujson.dumps(page.__json__(), ensure_ascii=False)
 
     @classmethod
-    def extract_texts(cls, filename, pages=None):
-        """Create a bunch of PDFPages by xpdf utility program `pdftotext`.
+    def extract_texts(cls, filename, pages=None, workers=None, cache=None,
+                      backend=None, fonts=False, preflight=None,
+                      layout=False):
+        """Create a bunch of PDFPages by the selected extraction backend.
 
         Args:
-            filename: The absolute path of the specified pdf document.
+            filename: The absolute path of the specified pdf document,
+                or a PDFDocument instance.
             pages: A list of page numbers to extract. If omitted, all
-                pages are extracted.
+                pages are extracted. Consecutive page numbers are
+                extracted by a single `pdftotext` run.
+            workers: The number of processes to extract with. If omitted,
+                pages are extracted in the current process.
+            cache: A PageCache instance. If given, cached pages are
+                returned without running poppler and extracted pages
+                are stored into it.
+            backend: A Backend instance or the name of a registered
+                backend. If omitted, the default backend is used. It is
+                ignored for a PDFDocument, which has its own backend.
+            fonts: Whether to give words their font specs. Fonts of
+                consecutive pages are extracted by a single `pdftohtml`
+                run, so FontSpecPreprocessor is not needed afterwards.
+            preflight: A Preflight instance of the document. If given,
+                empty pages are returned right away without running
+                poppler.
+            layout: Whether to keep the blocks and lines words are
+                grouped into by `pdftotext -bbox-layout`, see
+                PDFPage.layout.
 
         Returns:
             A list of PDFPage instances.
 
+        Raises:
+            PopplerTimeoutException: A deadline of Thor.pdf.poppler
+                passed. The pages finished before it, in the requested
+                order, are kept in its pages attribute.
+
         """
 
-        ret = []
+        document = PDFDocument.open(filename, backend)
+
+        if preflight is not None:
+            return _extract_texts_with_preflight(document, pages, workers,
+                                                 cache, fonts, preflight,
+                                                 layout)
+
+        if cache is not None:
+            return _extract_texts_with_cache(document, pages, workers, cache,
+                                             fonts, layout)
 
+        if workers is None or workers <= 1:
+            return _collect_pages(cls.iter_texts(document, pages,
+                                                 fonts=fonts, layout=layout))
+
+        # load the page boxes before forking so workers inherit them
+        info = document.info
         if pages is None:
-            with closing(NamedTemporaryFile()) as f:
-                cmd = ('pdftotext', '-bbox', filename, f.name)
-                subprocess.check_call(cmd)
-                parsed_pages = _parse_word_bboxes(f.name)
+            pages = range(1, info.num_pages + 1)
+
+        # pages come back through shared memory instead of pickles
+        from Thor.pdf import packed
+
+        chunks = _split_pages(pages, workers * WORKER_CHUNKS)
+        directory = tempfile.mkdtemp(prefix='thor-', dir=packed.SHM_DIR)
+        pool = multiprocessing.Pool(min(workers, len(chunks)))
+        results = []
+        try:
+            for name in pool.imap(_extract_texts_of_chunk,
+                                  [(document.filename, chunk,
+                                    document.backend, fonts, layout,
+                                    directory)
+                                   for chunk in chunks]):
+                results.append(packed.load_pages(name))
+            pool.close()
+        except PopplerTimeoutException, e:
+            pool.terminate()
+            e.pages = [page for result in results for page in result] + \
+                      e.pages
+            raise
+        except:
+            pool.terminate()
+            raise
+        finally:
+            pool.join()
+            shutil.rmtree(directory, ignore_errors=True)
+
+        return [page for result in results for page in result]
+
+    @classmethod
+    def iter_texts(cls, filename, pages=None, backend=None, fonts=False,
+                   layout=False):
+        """Generate PDFPages while the extraction backend runs.
+
+        With the poppler backend, the output of `pdftotext` is read
+        through a pipe and every page is yielded as soon as its markup
+        is complete, so only one page is kept in memory at a time.
 
+        Args:
+            filename: The absolute path of the specified pdf document,
+                or a PDFDocument instance.
+            pages: A list of page numbers to extract. If omitted, all
+                pages are extracted.
+            backend: A Backend instance or the name of a registered
+                backend. If omitted, the default backend is used.
+            fonts: Whether to give words their font specs.
+            layout: Whether to keep the blocks and lines of words, see
+                extract_texts().
+
+        Yields:
+            PDFPage instances in the same order as extract_texts().
+
+        """
+
+        document = PDFDocument.open(filename, backend)
+        filename, backend = document.filename, document.backend
+        info = document.info
+        runs = [(None, None)] if pages is None else _plan_page_runs(pages)
+        # only backends supporting layout are asked for it
+        options = {'layout': True} if layout else {}
+
+        for first, last in runs:
+            font_pages = backend.extract_fonts(filename, first, last) \
+                         if fonts else []
+            parsed_pages = backend.extract_word_bboxes(filename, first, last,
+                                                       **options)
             for ix, page_data in enumerate(parsed_pages):
-                ret.append(_create_page(filename, ix + 1, page_data))
+                font_page = font_pages[ix] if ix < len(font_pages) else None
+                yield _create_page(info, (first or 1) + ix, page_data,
+                                   font_page, layout)
 
-            return ret
+    @classmethod
+    def extract_texts_async(cls, reactor, filename, pages=None):
+        """Create a bunch of PDFPages without blocking on `pdftotext`.
 
-        for p in pages:
-            with closing(NamedTemporaryFile()) as f:
-                cmd = ('pdftotext', '-bbox', '-f', str(p), '-l', str(p),
-                       filename, f.name)
-                subprocess.check_call(cmd)
-                parsed_page = _parse_word_bboxes(f.name)[0]
+        The reactor always runs the poppler utilities, whatever backend
+        is selected.
 
-            ret.append(_create_page(filename, p, parsed_page))
+        Args:
+            reactor: A Reactor instance to run poppler utilities on.
+            filename: The absolute path of the specified pdf document,
+                or a PDFDocument instance.
+            pages: A list of page numbers to extract. If omitted, all
+                pages are extracted.
 
-        return ret
+        Returns:
+            A Future of the list extract_texts() would return.
+
+        """
+
+        filename = PDFDocument.open(filename).filename
+        runs = [(None, None)] if pages is None else _plan_page_runs(pages)
+        outputs = map(lambda (first, last): reactor.spawn(
+            PopplerBackend.word_bbox_command(filename, first, last)
+        ), runs)
+
+        def create_pages((info, outputs)):
+            ret = []
+            for (first, last), output in zip(runs, outputs):
+                parsed_pages = iter_pages(StringIO(output))
+                for ix, page_data in enumerate(parsed_pages):
+                    ret.append(_create_page(info, (first or 1) + ix,
+                                            page_data))
+
+            return ret
+
+        return Future.gather((
+            PDFInfo.load_async(reactor, filename),
+            Future.gather(outputs),
+        )).then(create_pages)
 
     @classmethod
-    def get_page_bboxes(cls, filename, page_num):
+    def get_page_bboxes(cls, filename, page_num, backend=None):
         """
         Get media box, crop box, bleed box, trim box, art box
         information of the specified PDF page.
 
+        The boxes are looked up in the document-wide table of PDFInfo,
+        so the document is only inspected once for all of its pages.
+
         Args:
-            filename: The absolute path of the specified pdf document.
+            filename: The absolute path of the specified pdf document,
+                or a PDFDocument instance.
             page_num: The number of page. Should be 1-based.
+            backend: A Backend instance or the name of a registered
+                backend. If omitted, the default backend is used.
 
         Returns:
             {
@@ -155,70 +333,276 @@ class PDFPage(object):
 
         """
 
-        pdf_info = subprocess.check_output((
-            'pdfinfo', '-box',
-            '-f', str(page_num),
-            '-l', str(page_num),
-            filename
-        ))
-
-        ret = {}
-        for line in pdf_info.splitlines():
-            line = filter(lambda x: x != '', line.split(' '))
-
-            if 'MediaBox:' in line:
-                ret['media'] = map(float, line[3:7])
-            if 'CropBox:' in line:
-                ret['crop'] = map(float, line[3:7])
-            if 'BleedBox:' in line:
-                ret['bleed'] = map(float, line[3:7])
-            if 'TrimBox:' in line:
-                ret['trim'] = map(float, line[3:7])
-            if 'ArtBox:' in line:
-                ret['art'] = map(float, line[3:7])
+        return PDFDocument.open(filename, backend).get_page_bboxes(page_num)
 
-        return ret
+    @classmethod
+    def get_page_bboxes_async(cls, reactor, filename, page_num):
+        """Get page boxes like get_page_bboxes() without blocking.
+
+        Args:
+            reactor: A Reactor instance to run `pdfinfo` on.
+            filename: The absolute path of the specified pdf document.
+            page_num: The number of page. Should be 1-based.
+
+        Returns:
+            A Future of the dict get_page_bboxes() would return.
+
+        """
+
+        return PDFInfo.load_async(reactor, filename).then(
+            lambda info: info.get_page_bboxes(page_num)
+        )
 
     @classmethod
-    def extract_raw_texts(cls, filename, page_num):
+    def extract_raw_texts(cls, filename, page_num, backend=None):
         """Extract texts from pdf and keep in content stream order.
 
         Args:
-            filename: The absolute path of the specified pdf document.
+            filename: The absolute path of the specified pdf document,
+                or a PDFDocument instance.
             page_num: The number of page to extract. Should be 1-based.
+            backend: A Backend instance or the name of a registered
+                backend. If omitted, the default backend is used.
 
         Returns:
             A list.
 
         """
 
-        with closing(NamedTemporaryFile()) as f:
-            subprocess.check_call((
-                'pdftotext', '-f', str(page_num), '-l', str(page_num),
-                '-raw', filename, f.name
-            ))
-            ret = f.read()
+        return PDFDocument.open(filename, backend).extract_raw_texts(page_num)
 
-        return ret.decode('utf8').splitlines()
+    @classmethod
+    def extract_raw_texts_of_pages(cls, filename, first=None, last=None,
+                                   backend=None):
+        """Extract texts of consecutive pages in content stream order.
+
+        With the poppler backend, the pages are extracted by a single
+        `pdftotext -raw` run and split on the form feeds between pages.
+
+        Args:
+            filename: The absolute path of the specified pdf document,
+                or a PDFDocument instance.
+            first: The first page number to extract. Should be 1-based.
+                If omitted, all pages are extracted.
+            last: The last page number to extract.
+            backend: A Backend instance or the name of a registered
+                backend. If omitted, the default backend is used.
+
+        Returns:
+            A list of the lists extract_raw_texts() would return, one
+            per page in page order.
+
+        """
+
+        return PDFDocument.open(filename, backend)\
+                          .extract_raw_texts_of_pages(first, last)
+
+    @classmethod
+    def extract_raw_texts_async(cls, reactor, filename, page_num):
+        """Extract texts like extract_raw_texts() without blocking.
+
+        Args:
+            reactor: A Reactor instance to run `pdftotext` on.
+            filename: The absolute path of the specified pdf document.
+            page_num: The number of page to extract. Should be 1-based.
 
-def _parse_word_bboxes(html):
+        Returns:
+            A Future of the list extract_raw_texts() would return.
 
-    with closing(open(html, 'rb')) as f:
-        parser = PDFXMLParser(f.read().decode('utf8'))
+        """
 
-    return parser.run()
+        cmd = PopplerBackend.raw_text_command(filename, page_num)
+
+        return reactor.spawn(cmd).then(
+            lambda output: output.decode('utf8').splitlines()
+        )
+
+    @classmethod
+    def extract_raw_texts_of_pages_async(cls, reactor, filename, first=None,
+                                         last=None):
+        """Extract texts like extract_raw_texts_of_pages() without
+        blocking.
 
-def _create_page(filename, page_num, page_data):
+        Args:
+            reactor: A Reactor instance to run `pdftotext` on.
+            filename: The absolute path of the specified pdf document.
+            first: The first page number to extract. Should be 1-based.
+                If omitted, all pages are extracted.
+            last: The last page number to extract.
+
+        Returns:
+            A Future of the list extract_raw_texts_of_pages() would
+            return.
+
+        """
 
-    box_dict = PDFPage.get_page_bboxes(filename, page_num)
+        cmd = PopplerBackend.raw_text_command(filename, first, last)
+
+        return reactor.spawn(cmd).then(
+            lambda output: split_raw_pages(output.decode('utf8'))
+        )
+
+def _plan_page_runs(pages):
+    """Group page numbers into runs of consecutive pages.
+
+    A run is only extended when the next requested page directly
+    follows the previous one, so walking the runs in order yields the
+    pages in exactly the requested order.
+
+    Args:
+        pages: A list of page numbers. Should be 1-based.
+
+    Returns:
+        A list of (first, last) tuples.
+
+    """
+
+    runs = []
+    for p in pages:
+        if len(runs) != 0 and runs[-1][1] + 1 == p:
+            runs[-1] = (runs[-1][0], p)
+        else:
+            runs.append((p, p))
+
+    return runs
+
+def _extract_texts_with_cache(document, pages, workers, cache, fonts,
+                              layout):
+
+    filename = document.filename
+    variant = '-'.join(filter(None, ('fonts' if fonts else '',
+                                     'layout' if layout else '')))
+
+    if pages is None:
+        pages = range(1, document.num_pages + 1)
+
+    extracted = {}
+    for p in pages:
+        if p not in extracted:
+            extracted[p] = cache.get(filename, p, variant)
+
+    def store(page):
+        extracted[page.page_num] = PDFPage.dumps(page)
+        cache.put(filename, page.page_num, extracted[page.page_num], variant)
+
+    def load():
+        return map(lambda p: PDFPage.loads(extracted[p]),
+                   filter(lambda p: extracted[p] is not None, pages))
+
+    missing = sorted(filter(lambda p: extracted[p] is None, extracted))
+    if len(missing) != 0:
+        try:
+            for page in PDFPage.extract_texts(document, missing, workers,
+                                              fonts=fonts, layout=layout):
+                store(page)
+        except PopplerTimeoutException, e:
+            for page in e.pages:
+                store(page)
+            e.pages = load()
+            raise
+
+    return load()
+
+def _extract_texts_with_preflight(document, pages, workers, cache, fonts,
+                                  preflight, layout):
+
+    if pages is None:
+        pages = range(1, document.num_pages + 1)
+
+    extracted = {}
+
+    def assemble():
+        return map(lambda p: extracted[p] if p in extracted
+                             else _create_empty_page(document, p, layout),
+                   filter(lambda p: p in extracted or
+                                    not preflight.has_text(p), pages))
+
+    text_pages = filter(preflight.has_text, pages)
+    if len(text_pages) != 0:
+        try:
+            for page in PDFPage.extract_texts(document, text_pages, workers,
+                                              cache, fonts=fonts,
+                                              layout=layout):
+                extracted[page.page_num] = page
+        except PopplerTimeoutException, e:
+            for page in e.pages:
+                extracted[page.page_num] = page
+            e.pages = assemble()
+            raise
+
+    return assemble()
+
+def _create_empty_page(document, page_num, layout=False):
+
+    crop_box = document.get_page_bboxes(page_num)['crop']
+
+    return PDFPage(page_num=page_num,
+                   width=crop_box[2] - crop_box[0],
+                   height=crop_box[3] - crop_box[1],
+                   layout=[] if layout else None)
+
+def _collect_pages(pages):
+    """Collect generated pages, keeping the finished ones on timeout."""
+
+    ret = []
+    try:
+        for page in pages:
+            ret.append(page)
+    except PopplerTimeoutException, e:
+        e.pages = ret
+        raise
+
+    return ret
+
+def _split_pages(pages, num_chunks):
+    """Split page numbers into at most num_chunks slices in order."""
+
+    pages = list(pages)
+    num_chunks = max(1, min(num_chunks, len(pages)))
+    size, remainder = divmod(len(pages), num_chunks)
+
+    ret, start = [], 0
+    for ix in xrange(num_chunks):
+        end = start + size + (1 if ix < remainder else 0)
+        ret.append(pages[start:end])
+        start = end
+
+    return ret
+
+def _extract_texts_of_chunk(args):
+
+    from Thor.pdf import packed
+
+    filename, pages, backend, fonts, layout, directory = args
+    return packed.dump_pages(
+        PDFPage.extract_texts(filename, pages, backend=backend, fonts=fonts,
+                              layout=layout),
+        directory
+    )
+
+def _create_page(info, page_num, page_data, font_page=None, layout=False):
+
+    box_dict = info.get_page_bboxes(page_num)
     media_box, crop_box = box_dict['media'], box_dict['crop']
     _transform_to_crop_box_space(page_data, media_box, crop_box)
 
     width, height = page_data['width'], page_data['height']
     words = _filter_invisible_words(width, height, page_data['data'])
+
+    if layout:
+        layout = map(lambda w: (w['block'], w['line']) if 'line' in w
+                               else None, words)
+    else:
+        layout = None
+
     words = map(PDFText.create_from_dict, words)
 
-    return PDFPage(page_num=page_num, width=width, height=height, words=words)
+    page = PDFPage(page_num=page_num, width=width, height=height, words=words,
+                   layout=layout)
+    if font_page is not None:
+        assign_fonts(page, crop_texts(font_page, crop_box), font_page['fonts'])
+
+    return page
 
 def _transform_to_crop_box_space(data, media_box, crop_box):
 
@@ -0,0 +1,194 @@
+#!/usr/bin/env python
+
+# standard library imports
+from collections import deque
+from itertools import islice
+from multiprocessing.pool import ThreadPool
+
+# third party related imports
+
+# local library imports
+from Thor.pdf import poppler
+from Thor.pdf.document import PDFDocument
+from Thor.pdf.page import PDFPage
+
+
+__all__ = ['PageInputs', 'PagePipeline']
+
+
+class PageInputs(object):
+    """The poppler outputs of a page, fetched ahead of the Python stages.
+
+    Attributes:
+        page: A PDFPage instance.
+        raw_texts: The lines of `pdftotext -raw` for RawTextPreprocessor,
+            or None if they are not fetched.
+        font_page: The page dict of Backend.extract_fonts() for
+            FontSpecPreprocessor, or None if it is not fetched.
+
+    """
+
+    def __init__(self, page, raw_texts=None, font_page=None):
+
+        self.page = page
+        self.raw_texts = raw_texts
+        self.font_page = font_page
+
+    def __repr__(self):
+
+        return 'PageInputs<page_num=%s>' % self.page.page_num
+
+
+class PagePipeline(object):
+    """Overlap poppler utilities of coming pages with Python stages.
+
+    Pages are fetched in batches of prefetch pages. While the caller
+    works on the pages of a batch, a background thread fetches the
+    poppler outputs of the next batch, so neither the CPU nor poppler
+    sits idle, e.g.
+
+        pipeline = PagePipeline(document, prefetch=2, font_pages=True)
+        for inputs in pipeline.run(page_nums):
+            page = RawTextPreprocessor(document, inputs.page,
+                                       inputs.raw_texts).run()
+            page = NaivePreprocessor(document, page).run()
+            page = FontSpecPreprocessor(document, page,
+                                        font_page=inputs.font_page).run()
+
+    Consecutive pages of a batch are extracted by a single run of every
+    poppler utility, through the backend of the document. Pages without
+    words get no raw texts or font page, as the preprocessors skip them
+    anyway. The processes of the thread are limited by the Scheduler
+    like any other, and bound by the poppler deadline of the thread
+    running the pipeline.
+
+    Attributes:
+        document: The PDFDocument instance of the pdf document.
+        prefetch: The number of pages fetched ahead, and so in a batch.
+            0 fetches every page when it is reached.
+        fonts: Whether pages are extracted with fonts, see
+            PDFPage.extract_texts().
+        raw_texts: Whether raw texts are fetched.
+        font_pages: Whether the texts with font specs of
+            Backend.extract_fonts() are fetched.
+        preflight: A Preflight instance, or None.
+
+    """
+
+    def __init__(self, filename, prefetch=2, fonts=False, raw_texts=True,
+                 font_pages=False, preflight=None, backend=None):
+
+        self.document = PDFDocument.open(filename, backend)
+        self.prefetch = prefetch
+        self.fonts = fonts
+        self.raw_texts = raw_texts
+        self.font_pages = font_pages
+        self.preflight = preflight
+
+    def run(self, page_nums=None):
+        """Generate the inputs of pages in order.
+
+        Args:
+            page_nums: An iterable of page numbers. Should be 1-based.
+                If omitted, every page is generated.
+
+        Yields:
+            PageInputs instances.
+
+        """
+
+        # the thread shares the metadata, so it is loaded up front
+        num_pages = self.document.num_pages
+        if page_nums is None:
+            page_nums = xrange(1, num_pages + 1)
+
+        page_nums = iter(page_nums)
+        size = max(1, self.prefetch)
+        batches = iter(lambda: list(islice(page_nums, size)), [])
+        until = poppler.get_block_deadline()
+
+        if self.prefetch <= 0:
+            for batch in batches:
+                for inputs in self.fetch(batch, until):
+                    yield inputs
+            return
+
+        # the batch being worked on and the next one
+        pool = ThreadPool(1)
+        try:
+            pending = deque(
+                map(lambda b: pool.apply_async(self.fetch, (b, until)),
+                    islice(batches, 2))
+            )
+
+            while len(pending) != 0:
+                fetched = pending.popleft().get()
+                for batch in islice(batches, 1):
+                    pending.append(pool.apply_async(self.fetch,
+                                                    (batch, until)))
+
+                for inputs in fetched:
+                    yield inputs
+        finally:
+            pool.terminate()
+            pool.join()
+
+    def map(self, fn, page_nums=None):
+        """Generate fn(inputs) for the inputs of pages in order."""
+
+        for inputs in self.run(page_nums):
+            yield fn(inputs)
+
+    def fetch(self, page_nums, until=None):
+        """Fetch the inputs of a batch of pages.
+
+        Args:
+            page_nums: A list of page numbers. Should be 1-based.
+            until: The time poppler utilities have to finish by, see
+                poppler.deadline_at().
+
+        Returns:
+            A list of PageInputs instances in the order of page_nums.
+
+        """
+
+        raw_texts, font_pages = {}, {}
+
+        with poppler.deadline_at(until):
+            pages = PDFPage.extract_texts(self.document, page_nums,
+                                          fonts=self.fonts,
+                                          preflight=self.preflight)
+
+            wordy = sorted(set(p.page_num for p in pages
+                               if len(p.words) != 0))
+            for first, last in _runs(wordy):
+                run_nums = xrange(first, last + 1)
+                if self.raw_texts:
+                    raw_texts.update(zip(
+                        run_nums,
+                        self.document.extract_raw_texts_of_pages(first, last)
+                    ))
+
+                if self.font_pages:
+                    font_pages.update(zip(
+                        run_nums,
+                        self.document.backend.extract_fonts(
+                            self.document.filename, first, last)
+                    ))
+
+        return map(lambda p: PageInputs(p, raw_texts.get(p.page_num),
+                                        font_pages.get(p.page_num)),
+                   pages)
+
+
+def _runs(page_nums):
+
+    # sorted page numbers to (first, last) tuples of consecutive pages
+    ret = []
+    for p in page_nums:
+        if len(ret) != 0 and ret[-1][1] + 1 == p:
+            ret[-1] = (ret[-1][0], p)
+        else:
+            ret.append((p, p))
+
+    return ret
@@ -0,0 +1,551 @@
+#!/usr/bin/env python
+
+# standard library imports
+from contextlib import closing, contextmanager
+from cStringIO import StringIO
+from distutils.spawn import find_executable
+import errno
+import os
+import resource
+import signal
+import subprocess
+import threading
+import time
+import zipfile
+
+# third party related imports
+import ujson
+
+# local library imports
+from Thor.pdf import scheduler
+
+
+__all__ = ['PopplerTimeoutException', 'Recorder', 'Replayer',
+           'ReplayException', 'check_output', 'deadline', 'deadline_at',
+           'get_block_deadline', 'get_deadline', 'get_timeout',
+           'is_replaying', 'kill', 'open_output', 'popen', 'record_output',
+           'recording', 'replaying', 'session', 'set_limits']
+
+
+class ReplayException(Exception): pass
+
+
+class PopplerTimeoutException(Exception):
+    """A poppler utility did not finish before its deadline.
+
+    Attributes:
+        cmd: The command that was killed.
+        timeout: The seconds the command was allowed to run.
+        pages: The PDFPage instances finished before the deadline, if
+            the command was extracting pages.
+
+    """
+
+    def __init__(self, cmd, timeout):
+
+        super(PopplerTimeoutException, self).__init__(cmd, timeout)
+
+        self.cmd = cmd
+        self.timeout = timeout
+        self.pages = []
+
+    def __reduce__(self):
+
+        # the pages finished by a worker process go along with the error
+        return self.__class__, (self.cmd, self.timeout), \
+               {'pages': self.pages}
+
+    def __str__(self):
+
+        return 'Command %s timed out after %.3f seconds' % \
+               (' '.join(self.cmd), self.timeout)
+
+
+class Recorder(object):
+    """Capture poppler outputs of a document into an archive file.
+
+    The archive is a zip file holding one entry per distinct command and
+    a manifest mapping commands to entries. The document path in every
+    command is replaced by a placeholder, so the archive can be replayed
+    wherever the document is.
+
+    Attributes:
+        archive: The filename of the archive.
+        filename: The path of the recorded pdf document.
+
+    """
+
+    PLACEHOLDER = '<pdf>'
+    MANIFEST = 'manifest.json'
+
+    def __init__(self, archive, filename):
+
+        self.archive = archive
+        self.filename = filename
+        self._outputs = {}
+        self._lock = threading.Lock()
+
+    def key(self, cmd):
+        """The command with the document path replaced."""
+
+        return tuple(map(lambda arg: self.PLACEHOLDER
+                                     if arg == self.filename else arg, cmd))
+
+    def record(self, cmd, output):
+
+        with self._lock:
+            self._outputs.setdefault(self.key(cmd), output)
+
+    def close(self):
+        """Write every recorded output to the archive."""
+
+        with self._lock:
+            outputs = dict(self._outputs)
+
+        manifest = []
+        with closing(zipfile.ZipFile(self.archive, 'w',
+                                     zipfile.ZIP_DEFLATED)) as z:
+            for ix, key in enumerate(sorted(outputs)):
+                entry = '%04d.out' % ix
+                z.writestr(entry, outputs[key])
+                manifest.append({'cmd': list(key), 'entry': entry})
+
+            z.writestr(self.MANIFEST, ujson.dumps(manifest))
+
+
+class Replayer(Recorder):
+    """Serve poppler outputs recorded by a Recorder."""
+
+    def __init__(self, archive, filename):
+
+        super(Replayer, self).__init__(archive, filename)
+
+        with closing(zipfile.ZipFile(archive, 'r')) as z:
+            for item in ujson.loads(z.read(self.MANIFEST)):
+                self._outputs[tuple(item['cmd'])] = z.read(item['entry'])
+
+    def replay(self, cmd):
+        """Get the recorded output of a command."""
+
+        key = self.key(cmd)
+        if key not in self._outputs:
+            raise ReplayException('Not recorded: %s' % ' '.join(key))
+
+        return self._outputs[key]
+
+    def close(self):
+
+        pass
+
+
+# the session and the limits are shared by every thread
+_lock = threading.Lock()
+_recorder = None
+_replayer = None
+
+_call_timeout = None
+_memory_limit = None
+
+# deadlines are per thread
+_local = threading.local()
+
+# util-linux wrappers which set up the child and exec the command in place
+_SETSID = find_executable('setsid')
+_PRLIMIT = find_executable('prlimit')
+
+# the programs already found on PATH, by name
+_programs = {}
+
+def set_limits(call_timeout=None, memory_limit=None):
+    """Limit every poppler utility started afterwards.
+
+    Args:
+        call_timeout: The maximum seconds a single command may run, or
+            None for no limit.
+        memory_limit: The maximum bytes of address space a command may
+            use, or None for no limit. A command exceeding it fails
+            with subprocess.CalledProcessError.
+
+    """
+
+    global _call_timeout, _memory_limit
+
+    with _lock:
+        _call_timeout = call_timeout
+        _memory_limit = memory_limit
+
+@contextmanager
+def deadline(seconds):
+    """Finish every poppler utility within the block in time.
+
+    It is meant to bound the whole processing of a document. Nested
+    deadlines never extend an outer one. A deadline only applies to the
+    thread entering the block, see deadline_at() to hand it on to other
+    threads.
+
+    Args:
+        seconds: The seconds from now, or None for no deadline.
+
+    """
+
+    with deadline_at(None if seconds is None else time.time() + seconds):
+        yield
+
+@contextmanager
+def deadline_at(until):
+    """Finish every poppler utility within the block by a time.
+
+    Args:
+        until: The time in seconds since the epoch, e.g. the one of
+            get_block_deadline() in another thread, or None for no
+            deadline.
+
+    """
+
+    if until is None:
+        yield
+        return
+
+    deadlines = _get_deadlines()
+    deadlines.append(until)
+    try:
+        yield
+    finally:
+        deadlines.pop()
+
+def get_block_deadline():
+    """The time the deadline blocks of this thread end, or None."""
+
+    deadlines = _get_deadlines()
+    return min(deadlines) if len(deadlines) != 0 else None
+
+def get_deadline():
+    """The time a command started now has to finish, or None."""
+
+    candidates = list(_get_deadlines())
+    call_timeout = _call_timeout
+    if call_timeout is not None:
+        candidates.append(time.time() + call_timeout)
+
+    return min(candidates) if len(candidates) != 0 else None
+
+def get_timeout():
+    """The seconds a command started now may run, or None."""
+
+    until = get_deadline()
+    if until is None:
+        return None
+
+    return max(0., until - time.time())
+
+def popen(cmd, stderr=None):
+    """Start a poppler utility writing to a pipe.
+
+    The command runs in its own process group, so kill() gets rid of
+    every process it forks, and under the memory limit of set_limits().
+    Both are set up by setsid(1) and prlimit(1) rather than a preexec_fn,
+    which is not safe to run in a forked child of a threaded process.
+    Only where they are missing, the preexec_fn is used instead, and
+    commands should then not be started by several threads at once.
+
+    Args:
+        cmd: A tuple of the program and its arguments.
+        stderr: Where standard error goes, as for subprocess.Popen,
+            e.g. subprocess.STDOUT to read it with the output.
+
+    Returns:
+        A subprocess.Popen instance.
+
+    """
+
+    args, preexec_fn = _child_command(cmd)
+
+    return subprocess.Popen(args, stdout=subprocess.PIPE, stderr=stderr,
+                            preexec_fn=preexec_fn, close_fds=True)
+
+def kill(proc):
+    """Kill the process group of a command started by popen()."""
+
+    try:
+        os.killpg(proc.pid, signal.SIGKILL)
+    except OSError:
+        pass
+
+def check_output(cmd, stderr=None):
+    """Run a poppler utility and get its standard output.
+
+    Args:
+        cmd: A tuple of the program and its arguments.
+        stderr: Where standard error goes, see popen().
+
+    Returns:
+        The output string.
+
+    Raises:
+        PopplerTimeoutException: The command was killed at its deadline.
+        subprocess.CalledProcessError: The command failed.
+
+    """
+
+    recorder, replayer = _recorder, _replayer
+    if replayer is not None:
+        return replayer.replay(cmd)
+
+    watchdog = _Watchdog(cmd)
+    with _scheduled(cmd, watchdog):
+        proc = popen(cmd, stderr)
+        watchdog.start(proc)
+        try:
+            output = proc.communicate()[0]
+        finally:
+            watchdog.cancel()
+
+    watchdog.check()
+    if proc.returncode != 0:
+        raise subprocess.CalledProcessError(proc.returncode, cmd, output)
+
+    if recorder is not None:
+        recorder.record(cmd, output)
+
+    return output
+
+@contextmanager
+def open_output(cmd):
+    """Run a poppler utility and read its standard output as a stream.
+
+    Args:
+        cmd: A tuple of the program and its arguments.
+
+    Yields:
+        A file object of the output. When the command is killed at its
+        deadline, the stream ends early and PopplerTimeoutException is
+        raised as the block exits.
+
+    """
+
+    recorder, replayer = _recorder, _replayer
+    if replayer is not None:
+        yield StringIO(replayer.replay(cmd))
+        return
+
+    watchdog = _Watchdog(cmd)
+    with _scheduled(cmd, watchdog):
+        proc = popen(cmd)
+        watchdog.start(proc)
+        stream = proc.stdout if recorder is None \
+                 else _TeeReader(proc.stdout)
+        try:
+            yield stream
+        finally:
+            proc.stdout.close()
+            retcode = proc.wait()
+            watchdog.cancel()
+
+    watchdog.check()
+    if retcode != 0:
+        raise subprocess.CalledProcessError(retcode, cmd)
+
+    if recorder is not None and stream.eof:
+        recorder.record(cmd, ''.join(stream.chunks))
+
+@contextmanager
+def recording(archive, filename):
+    """Record poppler outputs of a document within the block."""
+
+    global _recorder
+
+    with _lock:
+        if _recorder is not None or _replayer is not None:
+            raise ReplayException('Already recording or replaying')
+
+        recorder = _recorder = Recorder(archive, filename)
+
+    try:
+        yield recorder
+        recorder.close()
+    finally:
+        with _lock:
+            _recorder = None
+
+@contextmanager
+def replaying(archive, filename):
+    """Serve poppler outputs of a document from an archive in the block."""
+
+    global _replayer
+
+    with _lock:
+        if _recorder is not None or _replayer is not None:
+            raise ReplayException('Already recording or replaying')
+
+        replayer = _replayer = Replayer(archive, filename)
+
+    try:
+        yield replayer
+    finally:
+        with _lock:
+            _replayer = None
+
+@contextmanager
+def session(mode, archive, filename):
+    """Record, replay or just run poppler utilities within the block.
+
+    Args:
+        mode: 'record', 'replay' or None.
+        archive: The filename of the archive.
+        filename: The path of the pdf document.
+
+    """
+
+    if mode is None:
+        yield None
+    elif mode == 'record':
+        with recording(archive, filename) as recorder:
+            yield recorder
+    elif mode == 'replay':
+        with replaying(archive, filename) as replayer:
+            yield replayer
+    else:
+        raise ReplayException('Unknown mode: %s' % mode)
+
+def is_replaying():
+    """Whether outputs are served from an archive."""
+
+    return _replayer is not None
+
+def record_output(cmd, output):
+    """Record the output of a command run elsewhere, e.g. by a Reactor."""
+
+    recorder = _recorder
+    if recorder is not None:
+        recorder.record(cmd, output)
+
+
+def _get_deadlines():
+
+    if not hasattr(_local, 'deadlines'):
+        _local.deadlines = []
+
+    return _local.deadlines
+
+@contextmanager
+def _scheduled(cmd, watchdog):
+
+    slot = scheduler.get_scheduler().acquire(cmd, until=watchdog.until)
+    if slot is None:
+        raise PopplerTimeoutException(cmd, watchdog.timeout)
+
+    try:
+        yield slot
+    finally:
+        scheduler.get_scheduler().release(slot)
+
+def _child_command(cmd):
+
+    if _SETSID is None or (_memory_limit is not None and _PRLIMIT is None):
+        return cmd, _limit_child
+
+    # the wrappers would only report a missing program by their status
+    _find_program(cmd[0])
+
+    prefix = (_SETSID,)
+    if _memory_limit is not None:
+        prefix += (_PRLIMIT, '--as=%d' % _memory_limit, '--')
+
+    return prefix + tuple(cmd), None
+
+def _find_program(name):
+
+    with _lock:
+        if name in _programs:
+            return _programs[name]
+
+    # a missing program is looked up again, it may be installed later
+    path = find_executable(name)
+    if path is None:
+        raise OSError(errno.ENOENT, 'No such file or directory', name)
+
+    with _lock:
+        _programs[name] = path
+
+    return path
+
+def _limit_child():
+
+    os.setsid()
+    if _memory_limit is not None:
+        resource.setrlimit(resource.RLIMIT_AS, (_memory_limit, _memory_limit))
+
+
+class _Watchdog(object):
+    """Kill a command when its deadline passes.
+
+    The deadline is fixed when the watchdog is created, so the time a
+    command waits for a scheduler slot counts against it.
+
+    """
+
+    def __init__(self, cmd):
+
+        self.cmd = cmd
+        self.until = get_deadline()
+        self.timeout = None if self.until is None \
+                       else max(0., self.until - time.time())
+        if self.timeout == 0:
+            raise PopplerTimeoutException(cmd, self.timeout)
+
+        self._timer = None
+        self._expired = False
+
+    def start(self, proc):
+
+        if self.until is None:
+            return
+
+        remaining = max(0., self.until - time.time())
+        self._timer = threading.Timer(remaining, self._expire, (proc,))
+        self._timer.daemon = True
+        self._timer.start()
+
+    def cancel(self):
+
+        if self._timer is not None:
+            self._timer.cancel()
+
+    def check(self):
+        """Raise if the command has been killed."""
+
+        if self._expired:
+            raise PopplerTimeoutException(self.cmd, self.timeout)
+
+    def _expire(self, proc):
+
+        self._expired = True
+        kill(proc)
+
+
+class _TeeReader(object):
+
+    def __init__(self, stream):
+
+        self.stream = stream
+        self.chunks = []
+        self.eof = False
+
+    def readline(self, size=-1):
+
+        line = self.stream.readline(size)
+        self._keep(line)
+        return line
+
+    def read(self, size=-1):
+
+        data = self.stream.read(size)
+        self._keep(data)
+        return data
+
+    def _keep(self, data):
+
+        if data == '':
+            self.eof = True
+        else:
+            self.chunks.append(data)
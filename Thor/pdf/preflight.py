@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+
+# standard library imports
+
+# third party related imports
+
+# local library imports
+from Thor.pdf import poppler
+from Thor.pdf.document import PDFDocument
+
+
+__all__ = ['Preflight']
+
+
+class Preflight(object):
+    """Which pages of a document bear text, found out up front.
+
+    A preflight first looks at the page boxes, which are known without
+    extra cost, and then probes the texts of the pages by one
+    `pdftotext -raw` run bounded by a deadline. Pages without any text,
+    e.g. blank or scanned pages, are empty. If the probe does not finish
+    in time, every page is taken as text-bearing.
+
+    The probed raw texts are kept by the PDFDocument, so a
+    RawTextPreprocessor given the same document does not extract them
+    again.
+
+    Attributes:
+        num_pages: The number of pages of the document.
+        first: The first probed page number.
+        last: The last probed page number.
+        empty_pages: A sorted list of page numbers of empty pages.
+
+    """
+
+    # the seconds the text probe may run for
+    probe_timeout = 30
+
+    def __init__(self, num_pages, empty_pages=None, first=1, last=None):
+
+        self.num_pages = num_pages
+        self.first = first
+        self.last = num_pages if last is None else last
+        self.empty_pages = sorted(empty_pages or [])
+
+        self._empty_pages = set(self.empty_pages)
+
+    @classmethod
+    def run(cls, filename, first=None, last=None, timeout=None,
+            backend=None):
+        """Classify pages of a document.
+
+        Args:
+            filename: The absolute path of the pdf document, or a
+                PDFDocument instance.
+            first: The first page number to probe. Should be 1-based. If
+                omitted, all pages are probed.
+            last: The last page number to probe.
+            timeout: The seconds the text probe may run for. If omitted,
+                probe_timeout is used.
+            backend: A Backend instance or the name of a registered
+                backend. If omitted, the default backend is used.
+
+        Returns:
+            A Preflight instance.
+
+        """
+
+        document = PDFDocument.open(filename, backend)
+        num_pages = document.num_pages
+        first = 1 if first is None else first
+        last = num_pages if last is None else min(last, num_pages)
+        timeout = cls.probe_timeout if timeout is None else timeout
+
+        empty_pages = filter(
+            lambda p: _is_blank_box(document.get_page_bboxes(p)['crop']),
+            xrange(first, last + 1)
+        )
+
+        try:
+            with poppler.deadline(timeout):
+                raw_pages = document.extract_raw_texts_of_pages(first, last)
+        except poppler.PopplerTimeoutException:
+            return cls(num_pages, empty_pages, first, last)
+
+        for ix, raw_texts in enumerate(raw_pages):
+            if not any(map(lambda line: line.strip(), raw_texts)):
+                empty_pages.append(first + ix)
+
+        return cls(num_pages, set(empty_pages), first, last)
+
+    def has_text(self, page_num):
+        """Whether a page may bear text.
+
+        Pages out of the probed range are taken as text-bearing.
+
+        """
+
+        return page_num not in self._empty_pages
+
+    def __repr__(self):
+
+        return 'Preflight<num_pages=%s, empty_pages=%s>' % \
+               (self.num_pages, self.empty_pages)
+
+
+def _is_blank_box(box):
+
+    return box[2] - box[0] <= 0 or box[3] - box[1] <= 0
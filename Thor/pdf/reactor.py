@@ -0,0 +1,379 @@
+#!/usr/bin/env python
+
+# standard library imports
+from collections import deque
+import errno
+import os
+import select
+import subprocess
+import time
+
+# third party related imports
+
+# local library imports
+from Thor.pdf import poppler
+from Thor.pdf import scheduler
+
+
+__all__ = ['Future', 'Reactor', 'ReactorException']
+
+
+class ReactorException(Exception): pass
+
+
+class Future(object):
+    """The eventual result of a job driven by a Reactor.
+
+    Callbacks run in the reactor's thread as soon as the result is set,
+    so they may spawn further processes on the same reactor.
+
+    """
+
+    def __init__(self):
+
+        self._done = False
+        self._result = None
+        self._exception = None
+        self._callbacks = []
+
+    def done(self):
+        """Whether the result or the exception has been set."""
+
+        return self._done
+
+    def result(self):
+        """Get the result, or raise the exception of a failed job."""
+
+        if not self._done:
+            raise ReactorException('The result is not ready yet')
+
+        if self._exception is not None:
+            raise self._exception
+
+        return self._result
+
+    def exception(self):
+        """Get the exception of a failed job, or None."""
+
+        if not self._done:
+            raise ReactorException('The result is not ready yet')
+
+        return self._exception
+
+    def set_result(self, result):
+
+        self._resolve(result, None)
+
+    def set_exception(self, exception):
+
+        self._resolve(None, exception)
+
+    def add_done_callback(self, fn):
+        """Call fn(future) once this future is done."""
+
+        if self._done:
+            fn(self)
+        else:
+            self._callbacks.append(fn)
+
+    def then(self, fn):
+        """Chain a function on the result.
+
+        Args:
+            fn: A function taking the result of this future. If it
+                returns a Future, the chained future follows it.
+
+        Returns:
+            A Future of what fn returns.
+
+        """
+
+        ret = Future()
+
+        def on_done(future):
+            if future.exception() is not None:
+                ret.set_exception(future.exception())
+                return
+
+            try:
+                result = fn(future.result())
+            except Exception, e:
+                ret.set_exception(e)
+                return
+
+            if isinstance(result, Future):
+                result.add_done_callback(ret._follow)
+            else:
+                ret.set_result(result)
+
+        self.add_done_callback(on_done)
+
+        return ret
+
+    @classmethod
+    def completed(cls, result):
+        """Create a future whose result is already known."""
+
+        ret = cls()
+        ret.set_result(result)
+        return ret
+
+    @classmethod
+    def gather(cls, futures):
+        """Combine futures into a future of the list of their results."""
+
+        futures = list(futures)
+        ret = cls()
+        if len(futures) == 0:
+            ret.set_result([])
+            return ret
+
+        pending = [len(futures)]
+
+        def on_done(future):
+            if ret.done():
+                return
+
+            if future.exception() is not None:
+                ret.set_exception(future.exception())
+                return
+
+            pending[0] -= 1
+            if pending[0] == 0:
+                ret.set_result(map(lambda f: f.result(), futures))
+
+        for future in futures:
+            future.add_done_callback(on_done)
+
+        return ret
+
+    def _follow(self, future):
+
+        if future.exception() is not None:
+            self.set_exception(future.exception())
+        else:
+            self.set_result(future.result())
+
+    def _resolve(self, result, exception):
+
+        if self._done:
+            raise ReactorException('The future is already done')
+
+        self._done = True
+        self._result = result
+        self._exception = exception
+
+        callbacks, self._callbacks = self._callbacks, []
+        for fn in callbacks:
+            fn(self)
+
+
+class Reactor(object):
+    """Drive many external processes from a single thread.
+
+    Every spawned command writes to a pipe that is multiplexed by
+    select(), so no thread is blocked per process. Commands beyond
+    max_processes wait in FIFO order until a running one exits. Every
+    command also takes a slot of the Scheduler, so the processes of a
+    reactor count against the same limits as the rest of Thor.
+
+    The deadline of a command is taken from Thor.pdf.poppler when it is
+    spawned, so waiting in the queue counts against it. A command still
+    running at its deadline has its process group killed and its future
+    set to PopplerTimeoutException.
+
+    Attributes:
+        max_processes: The maximum number of processes running at the
+            same time, or None for no limit.
+        scheduler: The Scheduler instance slots are taken from. If
+            omitted, the one of Thor.pdf.scheduler is used.
+
+    """
+
+    CHUNK_SIZE = 65536
+
+    def __init__(self, max_processes=None, scheduler=None):
+
+        self.max_processes = max_processes
+        self.scheduler = scheduler
+        self._queue = deque()
+        self._running = {}
+
+    def spawn(self, cmd):
+        """Run a command and collect its standard output.
+
+        While poppler outputs are replayed from an archive, the future
+        is completed right away without running the command.
+
+        Args:
+            cmd: A tuple of the program and its arguments.
+
+        Returns:
+            A Future of the output string. A non-zero exit status sets
+            a subprocess.CalledProcessError instead.
+
+        """
+
+        future = Future()
+
+        if poppler.is_replaying():
+            try:
+                future.set_result(poppler.check_output(cmd))
+            except Exception, e:
+                future.set_exception(e)
+            return future
+
+        until = poppler.get_deadline()
+        timeout = None if until is None else max(0., until - time.time())
+        self._queue.append((tuple(cmd), future, until, timeout,
+                            scheduler.get_priority()))
+        self._start_queued()
+
+        return future
+
+    @property
+    def idle(self):
+        """Whether there is no running or waiting process."""
+
+        return len(self._running) == 0 and len(self._queue) == 0
+
+    def run_once(self, timeout=None):
+        """Wait for output of running processes and dispatch it.
+
+        Args:
+            timeout: The maximum seconds to wait, or None to block until
+                some process writes or exits.
+
+        """
+
+        if len(self._running) == 0:
+            # every slot is taken by others, so wait for one
+            self._start_queued(blocking=True)
+            return
+
+        deadlines = filter(lambda until: until is not None,
+                           map(lambda r: r[4], self._running.values()))
+        if len(deadlines) != 0:
+            remaining = max(0., min(deadlines) - time.time())
+            timeout = remaining if timeout is None \
+                      else min(timeout, remaining)
+
+        try:
+            readable, _, _ = select.select(self._running.keys(), [], [],
+                                           timeout)
+        except select.error, e:
+            if e.args[0] == errno.EINTR:
+                return
+            raise
+
+        for fd in readable:
+            self._read(fd)
+
+        self._kill_expired()
+        self._start_queued()
+
+    def run_until_complete(self, future):
+        """Drive processes until the future is done.
+
+        Returns:
+            The result of the future.
+
+        """
+
+        while not future.done():
+            if self.idle:
+                raise ReactorException('No process left to complete future')
+
+            self.run_once()
+
+        return future.result()
+
+    def as_completed(self, futures):
+        """Drive processes and yield futures in the order they finish."""
+
+        pending = list(futures)
+        while len(pending) != 0:
+            finished = filter(lambda f: f.done(), pending)
+            if len(finished) == 0:
+                if self.idle:
+                    raise ReactorException('No process left to complete '
+                                           'futures')
+                self.run_once()
+                continue
+
+            for future in finished:
+                pending.remove(future)
+                yield future
+
+    def _get_scheduler(self):
+
+        return self.scheduler or scheduler.get_scheduler()
+
+    def _start_queued(self, blocking=False):
+
+        while len(self._queue) != 0 and (
+                self.max_processes is None or
+                len(self._running) < self.max_processes):
+            cmd, future, until, timeout, priority = self._queue[0]
+
+            if until is not None and until <= time.time():
+                self._queue.popleft()
+                future.set_exception(
+                    poppler.PopplerTimeoutException(cmd, timeout)
+                )
+                continue
+
+            slot = self._get_scheduler().acquire(
+                cmd, priority, until,
+                blocking=blocking and len(self._running) == 0
+            )
+            if slot is None:
+                if until is not None and until <= time.time():
+                    continue
+                break
+
+            self._queue.popleft()
+            try:
+                proc = poppler.popen(cmd)
+            except OSError, e:
+                self._get_scheduler().release(slot)
+                future.set_exception(e)
+                continue
+
+            self._running[proc.stdout.fileno()] = (cmd, proc, [], future,
+                                                   until, timeout, slot)
+
+    def _kill_expired(self):
+
+        now = time.time()
+        for fd, running in self._running.items():
+            cmd, proc, chunks, future, until, timeout, slot = running
+            if until is None or until > now:
+                continue
+
+            del self._running[fd]
+            poppler.kill(proc)
+            proc.stdout.close()
+            proc.wait()
+            self._get_scheduler().release(slot)
+            future.set_exception(poppler.PopplerTimeoutException(cmd, timeout))
+
+    def _read(self, fd):
+
+        cmd, proc, chunks, future, until, timeout, slot = self._running[fd]
+        chunk = os.read(fd, self.CHUNK_SIZE)
+        if chunk != '':
+            chunks.append(chunk)
+            return
+
+        del self._running[fd]
+        proc.stdout.close()
+        retcode = proc.wait()
+        self._get_scheduler().release(slot)
+
+        if retcode != 0:
+            future.set_exception(subprocess.CalledProcessError(retcode, cmd))
+        else:
+            output = ''.join(chunks)
+            poppler.record_output(cmd, output)
+            future.set_result(output)
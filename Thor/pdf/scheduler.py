@@ -0,0 +1,275 @@
+#!/usr/bin/env python
+
+# standard library imports
+from collections import Counter
+from contextlib import contextmanager
+import os.path
+import threading
+import time
+
+# third party related imports
+
+# local library imports
+
+
+__all__ = ['Scheduler', 'get_priority', 'get_scheduler', 'priority',
+           'set_scheduler']
+
+
+class Scheduler(object):
+    """Share a limited number of process slots among external tools.
+
+    Every poppler utility, whether run by Thor.pdf.poppler or driven by
+    a Reactor, takes a slot before it starts and gives it back once it
+    exits. A command waits while the global limit or the limit of its
+    tool is reached. Waiting commands are served by priority, higher
+    first, and in FIFO order within a priority.
+
+    A thread already holding a slot, e.g. one reading the stream of
+    open_output(), waits like any other thread, except that the slots
+    it holds itself do not count against it. Such a nested slot may
+    exceed the limits, so nested calls never deadlock, but a thread
+    only gets max_nested of them at a time; the slots of other threads
+    and the limits of other tools still hold.
+
+    The limits are per process; every worker process of
+    PDFPage.extract_texts() has its own scheduler.
+
+    Attributes:
+        max_processes: The maximum number of commands running at the
+            same time, or None for no limit.
+        tool_limits: A dict mapping tool names, e.g. 'pdftohtml', to
+            the maximum number of their commands running at the same
+            time.
+        max_nested: The maximum number of slots a thread holds beyond
+            the limits at the same time.
+        calls: A Counter of started commands per tool.
+        queue_wait: A Counter of seconds commands waited per tool.
+        run_time: A Counter of seconds commands ran per tool.
+
+    """
+
+    def __init__(self, max_processes=None, tool_limits=None, max_nested=1):
+
+        self.max_processes = max_processes
+        self.tool_limits = dict(tool_limits or {})
+        self.max_nested = max_nested
+        self.calls = Counter()
+        self.queue_wait = Counter()
+        self.run_time = Counter()
+
+        self._cond = threading.Condition()
+        self._waiting = []
+        self._seq = 0
+        self._num_running = 0
+        self._running = Counter()
+        # owner tokens of threads to a Counter of held slots per tool
+        self._held = {}
+        self._nested = Counter()
+        self._local = threading.local()
+
+    @property
+    def stats(self):
+        """A dict mapping tool names to their counters."""
+
+        with self._cond:
+            return dict((tool, {'calls': self.calls[tool],
+                                'queue_wait': self.queue_wait[tool],
+                                'run_time': self.run_time[tool]})
+                        for tool in self.calls)
+
+    def acquire(self, cmd, priority=None, until=None, blocking=True):
+        """Take a slot for a command.
+
+        Args:
+            cmd: A tuple of the program and its arguments.
+            priority: A number, higher is served first. If omitted, the
+                priority of the enclosing priority() block is used.
+            until: The time to give up waiting at, or None.
+            blocking: Whether to wait for a slot.
+
+        Returns:
+            A slot to release(), or None if no slot was free in time.
+
+        """
+
+        tool = _tool_of(cmd)
+        priority = get_priority() if priority is None else priority
+        owner = self._owner()
+
+        with self._cond:
+            self._seq += 1
+            entry = ((-priority, self._seq), tool)
+            enqueued = time.time()
+
+            if not blocking:
+                if not self._is_grantable(entry):
+                    return None
+                return self._grant(tool, owner, enqueued)
+
+            nested = False
+            self._waiting.append(entry)
+            try:
+                while not self._is_grantable(entry):
+                    if self._may_nest(tool, owner):
+                        nested = True
+                        break
+
+                    if until is None:
+                        self._cond.wait()
+                        continue
+
+                    remaining = until - time.time()
+                    if remaining <= 0:
+                        return None
+                    self._cond.wait(remaining)
+            finally:
+                self._waiting.remove(entry)
+                self._cond.notify_all()
+
+            return self._grant(tool, owner, enqueued, nested)
+
+    def release(self, slot):
+        """Give back a slot once its command has exited."""
+
+        with self._cond:
+            self._num_running -= 1
+            self._running[slot.tool] -= 1
+            self.run_time[slot.tool] += time.time() - slot.started
+
+            held = self._held[slot.owner]
+            held[slot.tool] -= 1
+            if sum(held.values()) == 0:
+                del self._held[slot.owner]
+            if slot.nested:
+                self._nested[slot.owner] -= 1
+                if self._nested[slot.owner] == 0:
+                    del self._nested[slot.owner]
+
+            self._cond.notify_all()
+
+    @contextmanager
+    def running(self, cmd, priority=None):
+        """Hold a slot for a command within the block."""
+
+        slot = self.acquire(cmd, priority)
+        try:
+            yield slot
+        finally:
+            self.release(slot)
+
+    def _has_room(self, tool, own=None):
+
+        own = own or Counter()
+        if self.max_processes is not None and \
+           self._num_running - sum(own.values()) >= self.max_processes:
+            return False
+
+        limit = self.tool_limits.get(tool)
+        return limit is None or self._running[tool] - own[tool] < limit
+
+    def _may_nest(self, tool, owner):
+
+        # only the slots of the thread itself may stand in its way
+        own = self._held.get(owner)
+        return own is not None and \
+               self._nested[owner] < self.max_nested and \
+               self._has_room(tool, own)
+
+    def _is_grantable(self, entry):
+
+        key, tool = entry
+        if not self._has_room(tool):
+            return False
+
+        # a command of another tool may pass ones whose tool is full
+        for other_key, other_tool in self._waiting:
+            if other_key < key and self._has_room(other_tool):
+                return False
+
+        return True
+
+    def _owner(self):
+
+        # unlike thread idents, tokens are never reused by a new thread
+        if not hasattr(self._local, 'owner'):
+            self._local.owner = object()
+
+        return self._local.owner
+
+    def _grant(self, tool, owner, enqueued, nested=False):
+
+        now = time.time()
+        self._num_running += 1
+        self._running[tool] += 1
+        self.calls[tool] += 1
+        self.queue_wait[tool] += now - enqueued
+        self._held.setdefault(owner, Counter())[tool] += 1
+        if nested:
+            self._nested[owner] += 1
+
+        return _Slot(tool, owner, now, nested)
+
+
+class _Slot(object):
+
+    def __init__(self, tool, owner, started, nested=False):
+
+        self.tool = tool
+        self.owner = owner
+        self.started = started
+        self.nested = nested
+
+    def __repr__(self):
+
+        return '_Slot<tool=%s, nested=%s>' % (self.tool, self.nested)
+
+
+_scheduler = Scheduler()
+_priorities = threading.local()
+
+def get_scheduler():
+    """Get the scheduler every external tool is run through."""
+
+    return _scheduler
+
+def set_scheduler(scheduler):
+    """Replace the scheduler, e.g. to limit the number of processes."""
+
+    global _scheduler
+
+    _scheduler = scheduler
+
+@contextmanager
+def priority(value):
+    """Run the external tools started within the block at a priority.
+
+    Args:
+        value: A number, higher is served first. The default is 0.
+
+    """
+
+    stack = _priority_stack()
+    stack.append(value)
+    try:
+        yield
+    finally:
+        stack.pop()
+
+def get_priority():
+    """The priority of a command started now by this thread."""
+
+    stack = _priority_stack()
+    return stack[-1] if len(stack) != 0 else 0
+
+
+def _priority_stack():
+
+    if not hasattr(_priorities, 'stack'):
+        _priorities.stack = []
+
+    return _priorities.stack
+
+def _tool_of(cmd):
+
+    return os.path.basename(cmd[0])
@@ -0,0 +1,193 @@
+#!/usr/bin/env python
+
+# standard library imports
+from contextlib import closing
+from tempfile import NamedTemporaryFile
+import os
+import os.path
+import time
+
+# third party related imports
+import ujson
+
+# local library imports
+from Thor.pdf.document import PDFDocument
+from Thor.pdf.page import PDFPage
+
+
+__all__ = ['ShardException', 'load_json', 'merge_shards', 'plan_shards',
+           'run_shard', 'write_json']
+
+
+class ShardException(Exception): pass
+
+
+def plan_shards(filename, num_shards, first=1, last=None, backend=None):
+    """Split a page range of a document into shards.
+
+    A shard descriptor is a JSON serializable dict, so it can be handed
+    to a worker on another machine, e.g.
+
+        {
+            'file': '/shared/archive.pdf',
+            'page': 1200,       # the number of pages of the document
+            'shard': 0,         # 0-based index of the shard
+            'num_shards': 4,
+            'first': 1,         # the page range of the shard
+            'last': 300,
+            'range': [1, 1200], # the page range of the whole plan
+        }
+
+    Args:
+        filename: The absolute path of the pdf document, or a
+            PDFDocument instance.
+        num_shards: The number of shards. Fewer shards are planned for
+            a range with fewer pages.
+        first: The first page number of the range. Should be 1-based.
+        last: The last page number of the range. If omitted, the range
+            ends at the last page.
+        backend: A Backend instance or the name of a registered backend.
+            If omitted, the default backend is used.
+
+    Returns:
+        A list of shard descriptors in page order.
+
+    """
+
+    document = PDFDocument.open(filename, backend)
+    num_pages = document.num_pages
+    last = num_pages if last is None else min(last, num_pages)
+
+    count = last - first + 1
+    if count <= 0:
+        return []
+
+    num_shards = max(1, min(num_shards, count))
+    size, remainder = divmod(count, num_shards)
+
+    ret, start = [], first
+    for ix in xrange(num_shards):
+        end = start + size + (1 if ix < remainder else 0) - 1
+        ret.append({
+            'file': document.filename,
+            'page': num_pages,
+            'shard': ix,
+            'num_shards': num_shards,
+            'first': start,
+            'last': end,
+            'range': [first, last],
+        })
+        start = end + 1
+
+    return ret
+
+def run_shard(shard, output_filename, workers=None, cache=None,
+              backend=None):
+    """Extract the pages of a shard into a partial JSON file.
+
+    The partial is the shard descriptor with the version and the data
+    of bin/pdftext.py output added. It is written atomically, so a
+    worker dying halfway never leaves a partial behind.
+
+    Args:
+        shard: A shard descriptor of plan_shards().
+        output_filename: The filename of the partial JSON.
+        workers: See PDFPage.extract_texts().
+        cache: See PDFPage.extract_texts().
+        backend: See PDFPage.extract_texts().
+
+    Returns:
+        The partial dict.
+
+    """
+
+    pages = PDFPage.extract_texts(shard['file'],
+                                  range(shard['first'], shard['last'] + 1),
+                                  workers=workers, cache=cache,
+                                  backend=backend)
+
+    partial = dict(shard)
+    partial['version'] = int(time.time())
+    partial['data'] = map(lambda p: p.__json__(), pages)
+
+    write_json(partial, output_filename)
+
+    return partial
+
+def merge_shards(partials):
+    """Combine the partials of every shard of a document.
+
+    The result only depends on the partials, not on their order.
+
+    Args:
+        partials: A list of partial dicts of run_shard().
+
+    Returns:
+        A dict in the format of bin/pdftext.py output, i.e. with the
+        keys 'version', 'file', 'page' and 'data'. The version is the
+        latest version of the partials. The data only holds the pages
+        of the planned range.
+
+    Raises:
+        ShardException: The partials are of different documents or
+            plans, some shards are missing or duplicated, or their page
+            ranges overlap, leave gaps or do not cover the planned
+            range.
+
+    """
+
+    if len(partials) == 0:
+        raise ShardException('No partial to merge')
+
+    partials = sorted(partials, key=lambda p: p['shard'])
+    head = partials[0]
+
+    for partial in partials:
+        for key in ('file', 'page', 'num_shards', 'range'):
+            if partial[key] != head[key]:
+                raise ShardException('Partials disagree on %s: %r != %r' %
+                                     (key, partial[key], head[key]))
+
+    indices = map(lambda p: p['shard'], partials)
+    if indices != range(head['num_shards']):
+        raise ShardException('Expect shards 0-%d, got %s' %
+                             (head['num_shards'] - 1, indices))
+
+    for prev, curr in zip(partials, partials[1:]):
+        if prev['last'] >= curr['first']:
+            raise ShardException('Shards %d and %d overlap' %
+                                 (prev['shard'], curr['shard']))
+        if prev['last'] + 1 != curr['first']:
+            raise ShardException('Pages %d-%d between shards %d and %d '
+                                 'are missing' %
+                                 (prev['last'] + 1, curr['first'] - 1,
+                                  prev['shard'], curr['shard']))
+
+    first, last = head['range']
+    if partials[0]['first'] != first or partials[-1]['last'] != last:
+        raise ShardException('Expect pages %d-%d, got %d-%d' %
+                             (first, last, partials[0]['first'],
+                              partials[-1]['last']))
+
+    return {
+        'version': max(map(lambda p: p['version'], partials)),
+        'file': head['file'],
+        'page': head['page'],
+        'data': [page for partial in partials for page in partial['data']],
+    }
+
+def load_json(filename):
+    """Load a shard descriptor, a list of them or a partial."""
+
+    with closing(open(filename, 'rb')) as f:
+        return ujson.loads(f.read().decode('utf8'))
+
+def write_json(obj, filename):
+    """Write a shard descriptor, a list of them or a partial atomically."""
+
+    directory = os.path.dirname(os.path.abspath(filename))
+    with NamedTemporaryFile(dir=directory, suffix='.tmp',
+                            delete=False) as f:
+        f.write(ujson.dumps(obj, ensure_ascii=False))
+
+    os.rename(f.name, filename)
@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+
+# standard library imports
+import time
+
+# third party related imports
+
+# local library imports
+from Thor.pdf.backend import Backend
+from Thor.pdf.info import PDFInfo
+
+
+__all__ = ['FakeBackend', 'numbered_pages', 'word']
+
+
+FULL_BOX = [0, 0, 100, 100]
+
+
+def word(t, x=20., y=20., w=10., h=5.):
+    """Get a word dict in the format of Backend.extract_word_bboxes()."""
+
+    return {'x': x, 'y': y, 'w': w, 'h': h, 't': t}
+
+def numbered_pages(num_pages):
+    """Get pages holding a single word u'page<number>' each."""
+
+    return map(lambda p: [word(u'page%d' % p)], xrange(1, num_pages + 1))
+
+
+class FakeBackend(Backend):
+    """An in-memory backend of 100x100 pages recording its calls.
+
+    Specs subclass it where a backend behaves differently, e.g. hangs.
+
+    Attributes:
+        pages: A list of word dict lists, one per page.
+        crop_boxes: A dict mapping page numbers to crop boxes. Pages
+            not in it are cropped to the whole media box.
+        raw_texts: A dict mapping page numbers to raw text lines. Pages
+            not in it get the texts of their words.
+        font_pages: A list of page dicts of parse_font_xml(), one per
+            page, or None for pages without texts.
+        delay: The seconds every page takes to extract.
+        calls: A list of tuples, e.g. ('words', first, last),
+            ('info',), ('raw', page_num) or ('fonts', first, last).
+
+    """
+
+    name = 'fake'
+
+    def __init__(self, pages, crop_boxes=None, raw_texts=None,
+                 font_pages=None, delay=0):
+
+        self.pages = pages
+        self.crop_boxes = crop_boxes or {}
+        self.raw_texts = raw_texts or {}
+        self.font_pages = font_pages
+        self.delay = delay
+        self.calls = []
+
+    def calls_of(self, kind):
+        """Get the arguments of the recorded calls of a kind."""
+
+        return [call[1:] for call in self.calls if call[0] == kind]
+
+    def extract_word_bboxes(self, filename, first=None, last=None,
+                            layout=False):
+
+        self.calls.append(('words', first, last))
+        first, last = first or 1, last or len(self.pages)
+        for page_num in xrange(first, last + 1):
+            time.sleep(self.delay)
+            yield {
+                'page': page_num - first + 1,
+                'width': 100., 'height': 100.,
+                'data': [dict(w) for w in self.pages[page_num - 1]],
+            }
+
+    def extract_fonts(self, filename, first=None, last=None):
+
+        self.calls.append(('fonts', first, last))
+        first, last = first or 1, last or len(self.pages)
+        if self.font_pages is not None:
+            return self.font_pages[first - 1:last]
+
+        return [{'page': p, 'width': 100., 'height': 100., 'fonts': [],
+                 'texts': []}
+                for p in xrange(first, last + 1)]
+
+    def get_page_bboxes(self, filename):
+
+        self.calls.append(('info',))
+        boxes = dict((p, {'media': FULL_BOX,
+                          'crop': self.crop_boxes.get(p, FULL_BOX)})
+                     for p in xrange(1, len(self.pages) + 1))
+
+        return PDFInfo(filename, len(self.pages), boxes)
+
+    def extract_raw_texts(self, filename, page_num):
+
+        self.calls.append(('raw', page_num))
+        if page_num in self.raw_texts:
+            return self.raw_texts[page_num]
+
+        return map(lambda w: w['t'], self.pages[page_num - 1])
@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+
+# standard library imports
+
+# third party related imports
+from pyspecs import and_, given, the, then, when
+
+# local library imports
+from Thor.pdf.backend import (BackendException, PopplerBackend,
+                              get_backend, register_backend,
+                              set_default_backend, split_raw_pages)
+from Thor.pdf.page import PDFPage
+from Thor.pdf.tests.fakes import FakeBackend, word
+
+
+with given.the_registered_backends:
+
+    with when.no_backend_is_specified:
+
+        with then.poppler_should_be_used:
+            the(get_backend()).should.be_a(PopplerBackend)
+            the(get_backend('poppler')).should.be(get_backend())
+
+    with when.an_unknown_backend_is_requested:
+        try:
+            get_backend('carrier-pigeon')
+        except BackendException:
+            rejected = True
+        else:
+            rejected = False
+
+        with then.it_should_be_rejected:
+            the(rejected).should.be(True)
+
+with given.a_custom_backend:
+
+    box = [10, 10, 90, 90]
+    backend = FakeBackend([
+        [word(u'Thor')],
+        [word(u'Odin'), word(u'outside', x=0., y=0., w=5.)],
+        [],
+    ], crop_boxes={1: box, 2: box, 3: box})
+    register_backend(backend)
+
+    with when.extract_texts_with_it:
+        pages = PDFPage.extract_texts('any.pdf', backend='fake')
+
+        with then.every_page_should_be_extracted:
+            the(map(lambda p: p.page_num, pages)).should.equal([1, 2, 3])
+
+        with and_.words_should_be_in_crop_box_space:
+            the(pages[0].width).should.equal(80)
+            the(pages[0].words[0].x).should.equal(10)
+            the(pages[0].words[0].t).should.equal(u'Thor')
+
+        with and_.words_outside_crop_box_should_be_dropped:
+            the(map(lambda w: w.t, pages[1].words)).should.equal([u'Odin'])
+
+    with when.it_becomes_the_default:
+        set_default_backend('fake')
+        pages = PDFPage.extract_texts('any.pdf', [2, 3])
+        raw_texts = PDFPage.extract_raw_texts('any.pdf', 2)
+        set_default_backend('poppler')
+
+        with then.extraction_should_route_through_it:
+            the(map(lambda p: p.page_num, pages)).should.equal([2, 3])
+            the(raw_texts).should.equal([u'Odin', u'outside'])
+
+    with when.raw_texts_of_many_pages_are_extracted:
+        raw_texts = PDFPage.extract_raw_texts_of_pages('any.pdf', 1, 2,
+                                                       backend='fake')
+
+        with then.pages_should_be_extracted_one_by_one:
+            the(raw_texts).should.equal([[u'Thor'], [u'Odin', u'outside']])
+
+with given.the_raw_text_output_of_many_pages:
+
+    raw_output = u'Thor\nOdin\n\fLoki\n\f\f'
+
+    with when.it_is_split_page_by_page:
+        raw_texts = split_raw_pages(raw_output)
+
+        with then.every_page_should_equal_a_single_page_run:
+            the(raw_texts).should.equal([
+                u'Thor\nOdin\n\f'.splitlines(),
+                u'Loki\n\f'.splitlines(),
+                u'\f'.splitlines(),
+            ])
+
+with given.a_backend_grouping_words_into_lines:
+
+    class LayoutBackend(FakeBackend):
+
+        name = 'fake-layout'
+
+        def extract_word_bboxes(self, filename, first=None, last=None,
+                                layout=False):
+
+            for page_data in FakeBackend.extract_word_bboxes(
+                self, filename, first, last
+            ):
+                if layout:
+                    for ix, word in enumerate(page_data['data']):
+                        word['block'], word['line'] = 0, ix / 2
+                yield page_data
+
+    backend = LayoutBackend([
+        [word(u'Thor'), word(u'outside', x=0., y=0., w=5.),
+         word(u'Odin', x=40.)],
+    ], crop_boxes={1: [10, 10, 90, 90]})
+
+    with when.pages_are_extracted_with_layout:
+        page = PDFPage.extract_texts('any.pdf', backend=backend,
+                                     layout=True)[0]
+
+        with then.words_should_keep_their_lines:
+            the(map(lambda w: w.t, page.words)).\
+                should.equal([u'Thor', u'Odin'])
+            the(page.layout).should.equal([(0, 0), (0, 1)])
+
+        with and_.the_layout_should_be_serialized:
+            the(PDFPage.loads(PDFPage.dumps(page)).layout).\
+                should.equal(page.layout)
+
+    with when.pages_are_extracted_without_layout:
+        page = PDFPage.extract_texts('any.pdf', backend=backend)[0]
+
+        with then.they_should_have_no_layout:
+            the(page.layout).should.be(None)
+
+    with when.poppler_is_asked_for_layout:
+        cmd = PopplerBackend.word_bbox_command('a.pdf', 1, 2, layout=True)
+
+        with then.pdftotext_should_group_words:
+            the(cmd).should.equal(('pdftotext', '-bbox-layout', '-f', '1',
+                                   '-l', '2', 'a.pdf', '-'))
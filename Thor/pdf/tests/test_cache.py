@@ -0,0 +1,153 @@
+#!/usr/bin/env python
+
+# standard library imports
+from contextlib import closing
+from tempfile import mkdtemp
+import os.path
+import shutil
+import threading
+
+# third party related imports
+from pyspecs import and_, given, the, then, when
+
+# local library imports
+from Thor.pdf import cache as cache_module
+from Thor.pdf import poppler
+from Thor.pdf.cache import PageCache, get_poppler_version
+from Thor.pdf.page import PDFPage
+from Thor.pdf.text import PDFText
+
+
+with given.a_page_cache:
+
+    directory = mkdtemp()
+    document = os.path.join(directory, 'document.pdf')
+    with closing(open(document, 'wb')) as f:
+        f.write('%PDF-1.4 not really a document')
+
+    cache = PageCache(os.path.join(directory, 'cache'),
+                      poppler_version='pdftotext version 0.24.0')
+    page = PDFPage(page_num=3, width=100, height=200, words=[
+        PDFText(x=1, y=2, w=3, h=4, t=u'Thor'),
+    ])
+
+    with when.a_page_is_not_cached:
+
+        with then.nothing_should_be_returned:
+            the(cache.get(document, 3)).should.be(None)
+            the(cache.misses).should.equal(1)
+
+    with when.a_page_is_stored:
+        cache.put(document, 3, PDFPage.dumps(page))
+
+        with then.it_should_be_returned_later:
+            the(cache.get(document, 3)).should.equal(PDFPage.dumps(page))
+            the(cache.hits).should.equal(1)
+
+        with and_.other_pages_should_not_be_affected:
+            the(cache.get(document, 4)).should.be(None)
+
+    with when.a_page_of_non_ascii_text_is_stored:
+        serialized = PDFPage.dumps(PDFPage(page_num=5, words=[
+            PDFText(x=1, y=2, w=3, h=4, t=u'\u96f7\u795e'),
+        ]))
+        unicode_cache = PageCache(os.path.join(directory, 'unicode'),
+                                  poppler_version='pdftotext version 0.24.0')
+        unicode_cache.put(document, 5, serialized)
+
+        with then.it_should_be_returned_as_unicode:
+            the(unicode_cache.get(document, 5)).should.equal(
+                serialized.decode('utf8')
+            )
+
+    with when.the_document_changes:
+        with closing(open(document, 'ab')) as f:
+            f.write(' anymore')
+
+        with then.the_stale_page_should_not_be_returned:
+            the(cache.get(document, 3)).should.be(None)
+
+    with when.the_poppler_version_differs:
+        other = PageCache(cache.directory, poppler_version='pdftotext 0.86')
+
+        with then.keys_should_differ:
+            the(other.key(document, 3)).should_NOT.equal(
+                cache.key(document, 3))
+
+    with when.cached_pages_exceed_the_size_limit:
+        cache.max_bytes = 2 * len(PDFPage.dumps(page))
+        for page_num in xrange(1, 6):
+            cache.put(document, page_num, PDFPage.dumps(page))
+
+        with then.least_recently_used_pages_should_be_evicted:
+            # the page stored before the document changed is evicted too
+            the(cache.size).should.be_less_than(cache.max_bytes + 1)
+            the(cache.evictions).should.equal(4)
+            the(cache.get(document, 5)).should_NOT.be(None)
+
+    with when.a_full_cache_keeps_taking_pages:
+        full = PageCache(os.path.join(directory, 'full'),
+                         poppler_version='pdftotext version 0.24.0')
+        full.max_bytes = 10 * len(PDFPage.dumps(page))
+        for page_num in xrange(1, 11):
+            full.put(document, page_num, PDFPage.dumps(page))
+
+        def scan():
+            raise AssertionError('the directory is scanned again')
+
+        full._entries = scan
+        full.put(document, 11, PDFPage.dumps(page))
+        full.put(document, 12, PDFPage.dumps(page))
+
+        with then.it_should_evict_down_to_the_low_water_mark_at_once:
+            the(full.evictions).should.equal(2)
+            the(full.size).should.equal(10 * len(PDFPage.dumps(page)))
+
+        with and_.its_index_should_survive_a_restart:
+            the(PageCache(full.directory, poppler_version='pdftotext 0.24.0')
+                .size).should.equal(full.size)
+
+    with when.threads_share_the_cache:
+        shared = PageCache(os.path.join(directory, 'shared'),
+                           poppler_version='pdftotext version 0.24.0')
+        shared.put(document, 1, PDFPage.dumps(page))
+
+        def look_up():
+            for page_num in xrange(1, 201):
+                shared.get(document, page_num % 2 + 1)
+
+        threads = [threading.Thread(target=look_up) for _ in xrange(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        with then.every_look_up_should_be_counted:
+            the(shared.hits).should.equal(800)
+            the(shared.misses).should.equal(800)
+
+    shutil.rmtree(directory)
+
+
+with given.an_archive_holding_the_poppler_version:
+
+    directory = mkdtemp()
+    archive = os.path.join(directory, 'document.zip')
+    document = os.path.join(directory, 'document.pdf')
+    with poppler.recording(archive, document):
+        poppler.record_output(('pdftotext', '-v'),
+                              'pdftotext version 0.24.0\nCopyright\n')
+
+    with when.the_version_is_asked_for_while_replaying:
+        known_version = cache_module._poppler_version
+        cache_module._poppler_version = None
+        try:
+            with poppler.replaying(archive, document):
+                version = get_poppler_version()
+        finally:
+            cache_module._poppler_version = known_version
+
+        with then.the_recorded_version_should_be_served:
+            the(version).should.equal('pdftotext version 0.24.0')
+
+    shutil.rmtree(directory)
@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# standard library imports
+import random
+
+# third party related imports
+from pyspecs import and_, given, the, then, when
+
+# local library imports
+from Thor.pdf.columnar import ColumnarPage
+from Thor.pdf.page import (PDFPage, _filter_invisible_words,
+                           _transform_to_crop_box_space)
+from Thor.pdf.text import PDFText
+from Thor.utils.FontSpec import FontSpec
+
+
+with given.a_page:
+
+    body, title = FontSpec(10, '000000'), FontSpec(24, 'FF0000')
+    words = [
+        PDFText(10.5, 20., 30., 10., u'Thor', body),
+        PDFText(50., 20.25, 40., 10., u'麗寶生活家', title),
+        PDFText(90., 95., 25., 10., u'R&D', None),
+        PDFText(-30., 40., 30., 10., u'outside', body),
+        PDFText(20., 60., 5., 10., u' ', body),
+    ]
+    page = PDFPage(page_num=3, width=100., height=100., words=words,
+                   fonts=[body], tier='standard',
+                   layout=[(0, 0), (0, 0), (None, 1), None, (1, 2)])
+
+    with when.it_is_stored_in_columns:
+        columns = ColumnarPage.from_page(page)
+
+        with then.it_should_convert_back_losslessly:
+            the(PDFPage.dumps(columns.to_page())).\
+                should.equal(PDFPage.dumps(page))
+
+        with and_.words_should_be_built_one_at_a_time:
+            the(len(columns)).should.equal(5)
+            the(columns[1]).should.equal(words[1])
+            the(columns[2].font).should.be(None)
+
+        with and_.its_bounds_should_cover_every_word:
+            the(columns.bounds()).should.equal((-30., 20., 115., 105.))
+
+    with when.it_is_cropped:
+        cropped = ColumnarPage.from_page(page).crop(0., 0., 50., 50.)
+
+        with then.only_words_overlapping_the_rectangle_should_be_kept:
+            the(map(lambda w: w.t, cropped.words)).should.equal([u'Thor'])
+            the(cropped.layout).should.equal([(0, 0)])
+
+    with when.invisible_words_are_filtered:
+        visible = ColumnarPage.from_page(page).filter_invisible()
+        expected = _filter_invisible_words(
+            page.width, page.height, map(lambda w: w.__json__(), words)
+        )
+
+        with then.they_should_be_the_words_PDFPage_keeps:
+            the(map(lambda w: w.__json__(), visible.words)).\
+                should.equal(expected)
+
+
+with given.a_page_with_integer_coordinates:
+
+    words = [
+        PDFText(10, 20, 30, 10, u'Thor', None),
+        PDFText(50.5, 20, 40, 10.25, u'Odin', None),
+    ]
+    page = PDFPage(page_num=1, width=100, height=100, words=words)
+
+    with when.it_is_stored_in_columns:
+        columns = ColumnarPage.from_page(page)
+
+        with then.it_should_dump_the_same_as_the_page:
+            the(PDFPage.dumps(columns.to_page())).\
+                should.equal(PDFPage.dumps(page))
+
+        with and_.every_word_should_keep_its_integers:
+            the(map(type, (columns[0].x, columns[0].y, columns[1].x,
+                           columns[1].y))).should.equal([int, int, float, int])
+            the(type(columns.words[1].h)).should.be(float)
+
+    with when.it_is_moved_by_integer_and_float_origins:
+        moved = ColumnarPage.from_page(page).to_crop_box_space([5, 2.5, 95, 95])
+
+        with then.only_coordinates_moved_by_floats_should_become_floats:
+            the(map(lambda w: (type(w.x), type(w.y)), moved.words)).\
+                should.equal([(int, float), (float, float)])
+
+    random.seed(7)
+    dicts = map(lambda _: {
+        'x': random.uniform(-50., 650.), 'y': random.uniform(-50., 850.),
+        'w': random.choice([0., 5., random.uniform(0., 80.)]),
+        'h': random.uniform(0., 20.), 't': random.choice([u'a', u' ', u'b']),
+    }, xrange(2000))
+    crop_box = [36.85, 36.85, 646.30, 816.38]
+
+    with when.they_are_moved_and_filtered_in_columns:
+        page = PDFPage(page_num=1, width=683.15, height=853.23,
+                       words=map(PDFText.create_from_dict, dicts))
+        columns = ColumnarPage.from_page(page).to_crop_box_space(crop_box)
+        columns = columns.filter_invisible()
+
+        data = {'width': page.width, 'height': page.height,
+                'data': map(dict, dicts)}
+        _transform_to_crop_box_space(data, None, crop_box)
+        expected = _filter_invisible_words(data['width'], data['height'],
+                                           data['data'])
+
+        with then.the_result_should_equal_that_of_PDFPage:
+            the(columns.width).should.equal(data['width'])
+            the(map(lambda w: (w.x, w.y, w.w, w.h, w.t), columns.words)).\
+                should.equal(map(lambda d: (d['x'], d['y'], d['w'], d['h'],
+                                            d['t']), expected))
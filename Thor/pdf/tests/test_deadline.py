@@ -0,0 +1,169 @@
+#!/usr/bin/env python
+
+# standard library imports
+import cPickle
+import subprocess
+import sys
+import threading
+import time
+
+# third party related imports
+from pyspecs import and_, given, the, then, when
+
+# local library imports
+from Thor.pdf import poppler
+from Thor.pdf.page import PDFPage, _extract_texts_of_chunk
+from Thor.pdf.reactor import Reactor
+from Thor.pdf.tests.fakes import FakeBackend, word
+
+
+class HangingBackend(FakeBackend):
+    """A backend of two pages which hangs after the first page."""
+
+    def __init__(self):
+
+        FakeBackend.__init__(self, [[word(u'Thor')], [word(u'Odin')]])
+
+    def extract_word_bboxes(self, filename, first=None, last=None,
+                            layout=False):
+
+        pages = FakeBackend.extract_word_bboxes(self, filename, first, last)
+        yield next(pages)
+        poppler.check_output(('sleep', '5'))
+
+
+def run_timed(fn):
+
+    start = time.time()
+    try:
+        fn()
+    except Exception, e:
+        return e, time.time() - start
+
+    return None, time.time() - start
+
+
+with given.a_call_timeout:
+
+    poppler.set_limits(call_timeout=0.2)
+
+    with when.a_command_hangs:
+        error, elapsed = run_timed(
+            lambda: poppler.check_output(('sh', '-c', 'sleep 5 & wait'))
+        )
+
+        with then.a_typed_error_should_be_raised:
+            the(error).should.be_a(poppler.PopplerTimeoutException)
+
+        with and_.the_whole_process_group_should_be_killed:
+            the(elapsed).should.be_less_than(2)
+
+    with when.a_streamed_command_hangs:
+
+        def read_all():
+            with poppler.open_output(('sh', '-c', 'echo a; sleep 5')) as f:
+                f.read()
+
+        error, elapsed = run_timed(read_all)
+
+        with then.a_typed_error_should_be_raised_as_well:
+            the(error).should.be_a(poppler.PopplerTimeoutException)
+            the(elapsed).should.be_less_than(2)
+
+    with when.a_command_hangs_on_a_reactor:
+        reactor = Reactor()
+        future = reactor.spawn(('sleep', '5'))
+        error, elapsed = run_timed(lambda: reactor.run_until_complete(future))
+
+        with then.its_future_should_fail_in_time:
+            the(error).should.be_a(poppler.PopplerTimeoutException)
+            the(elapsed).should.be_less_than(2)
+
+    with when.a_command_finishes_in_time:
+
+        with then.its_output_should_be_returned:
+            the(poppler.check_output(('echo', '-n', 'ok'))).should.equal('ok')
+
+    poppler.set_limits()
+
+with given.a_document_deadline:
+
+    with when.commands_run_past_it:
+
+        def run_twice():
+            with poppler.deadline(0.3):
+                poppler.check_output(('sleep', '0.2'))
+                poppler.check_output(('sleep', '0.2'))
+
+        error, elapsed = run_timed(run_twice)
+
+        with then.the_command_crossing_it_should_be_killed:
+            the(error).should.be_a(poppler.PopplerTimeoutException)
+            the(elapsed).should.be_less_than(1)
+
+    with when.pages_are_extracted_past_it:
+
+        def extract():
+            with poppler.deadline(0.3):
+                PDFPage.extract_texts('any.pdf', [1, 2],
+                                      backend=HangingBackend())
+
+        error, elapsed = run_timed(extract)
+
+        with then.finished_pages_should_come_back_with_the_error:
+            the(error).should.be_a(poppler.PopplerTimeoutException)
+            the(map(lambda p: p.page_num, error.pages)).should.equal([1])
+
+    with when.a_worker_process_extracts_pages_past_it:
+
+        def extract_chunk():
+            with poppler.deadline(0.3):
+                _extract_texts_of_chunk(('any.pdf', [1, 2], HangingBackend(),
+                                         False, False, None))
+
+        error, elapsed = run_timed(extract_chunk)
+        # the pool hands the error of a worker back as a pickle
+        unpickled = cPickle.loads(cPickle.dumps(error, 2))
+
+        with then.finished_pages_should_come_back_with_the_error_too:
+            the(unpickled).should.be_a(poppler.PopplerTimeoutException)
+            the(map(lambda p: p.page_num, unpickled.pages)).should.equal([1])
+            the(unpickled.pages[0].words[0].t).should.equal(u'Thor')
+
+with given.a_deadline_of_a_thread:
+
+    def get_deadline_elsewhere(until=None):
+        ret = []
+        def run():
+            with poppler.deadline_at(until):
+                ret.append(poppler.get_deadline())
+        thread = threading.Thread(target=run)
+        thread.start()
+        thread.join()
+        return ret[0]
+
+    with when.another_thread_runs_poppler:
+        with poppler.deadline(10):
+            until = poppler.get_block_deadline()
+            elsewhere = get_deadline_elsewhere()
+            handed_on = get_deadline_elsewhere(until)
+
+        with then.the_deadline_should_not_apply_there:
+            the(elsewhere).should.be(None)
+
+        with and_.it_should_apply_once_handed_on:
+            the(handed_on).should.equal(until)
+            the(poppler.get_block_deadline()).should.be(None)
+
+with given.a_memory_limit:
+
+    poppler.set_limits(memory_limit=256 * 1024 * 1024)
+
+    with when.a_command_uses_more_memory:
+        cmd = (sys.executable, '-c', 'x = " " * (1024 ** 3)')
+        error, elapsed = run_timed(lambda: poppler.check_output(cmd))
+
+        with then.it_should_fail:
+            the(error).should.be_a(subprocess.CalledProcessError)
+
+    poppler.set_limits()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+
+# standard library imports
+
+# third party related imports
+from pyspecs import and_, given, the, then, when
+
+# local library imports
+from Thor.pdf.document import PDFDocument
+from Thor.pdf.page import PDFPage
+from Thor.pdf.tests.fakes import FakeBackend, numbered_pages
+
+
+with given.a_document:
+
+    backend = FakeBackend(numbered_pages(5))
+    document = PDFDocument('any.pdf', backend, page_cache_size=3)
+
+    with when.nothing_is_requested:
+
+        with then.the_document_should_not_be_inspected:
+            the(backend.calls).should.equal([])
+
+    with when.its_metadata_is_requested_many_times:
+        num_pages = len(document)
+        bboxes = document.get_page_bboxes(2)
+        bboxes = PDFPage.get_page_bboxes(document, 3)
+
+        with then.the_document_should_be_inspected_once:
+            the(num_pages).should.equal(5)
+            the(backend.calls).should.equal([('info',)])
+
+    with when.pages_are_indexed:
+        backend.calls = []
+        first_page = document[0]
+        last_pages = document[-2:]
+
+        with then.pages_should_be_extracted_on_demand:
+            the(first_page.page_num).should.equal(1)
+            the(map(lambda p: p.page_num, last_pages)).should.equal([4, 5])
+            the(backend.calls).should.equal([('words', 1, 1),
+                                              ('words', 4, 5)])
+
+        with and_.recently_used_pages_should_be_reused:
+            the(document[0]).should.be(first_page)
+            the(len(backend.calls)).should.equal(2)
+
+        with and_.an_index_out_of_range_should_be_rejected:
+            try:
+                document[5]
+            except IndexError:
+                rejected = True
+            else:
+                rejected = False
+            the(rejected).should.be(True)
+
+    with when.more_pages_than_the_cache_holds_are_indexed:
+        backend.calls = []
+        pages = document[:]
+        page = document[0]
+
+        with then.the_least_recently_used_pages_should_be_dropped:
+            the(len(pages)).should.equal(5)
+            the(backend.calls).should.equal([('words', 2, 3),
+                                              ('words', 1, 1)])
+
+    with when.raw_texts_are_requested_twice:
+        backend.calls = []
+        raw_texts = PDFPage.extract_raw_texts(document, 2)
+        raw_texts = PDFPage.extract_raw_texts(document, 2)
+
+        with then.they_should_be_extracted_once:
+            the(raw_texts).should.equal([u'page2'])
+            the(backend.calls).should.equal([('raw', 2)])
+
+    with when.it_is_given_to_extract_texts:
+        backend.calls = []
+        pages = PDFPage.extract_texts(document, [2, 3])
+
+        with then.its_backend_and_metadata_should_be_used:
+            the(map(lambda p: p.words[0].t, pages)).should.equal([u'page2',
+                                                                   u'page3'])
+            the(backend.calls).should.equal([('words', 2, 3)])
@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# standard library imports
+
+# third party related imports
+from pyspecs import and_, given, the, then, when
+
+# local library imports
+from Thor.pdf.fonts import crop_texts, dominant_font, parse_font_xml
+from Thor.pdf.page import PDFPage
+from Thor.pdf.tests.fakes import FakeBackend, word
+from Thor.utils.FontSpec import FontSpec
+
+
+SAMPLE_XML = u'''<?xml version="1.0" encoding="UTF-8"?>
+<!DOCTYPE pdf2xml SYSTEM "pdf2xml.dtd">
+
+<pdf2xml producer="poppler" version="0.26.5">
+<page number="3" position="absolute" top="0" left="0" height="100" width="100">
+	<fontspec id="0" size="6" family="Times" color="#221714"/>
+	<fontspec id="1" size="38" family="Times" color="#000000"/>
+<text top="20" left="20" width="10" height="5" font="0">Thor</text>
+<text top="30" left="20" width="0" height="8" font="1">Odin</text>
+<text top="120" left="20" width="10" height="5" font="1">outside</text>
+</page>
+<page number="4" position="absolute" top="0" left="0" height="100" width="100">
+<text top="20" left="20" width="10" height="5" font="1">Loki</text>
+</page>
+</pdf2xml>
+'''
+
+
+with given.the_output_of_pdftohtml:
+
+    font_specs, font_pages = parse_font_xml(SAMPLE_XML)
+
+    with then.font_specs_of_the_whole_output_should_be_parsed:
+        the(font_specs.values()).should.equal([
+            FontSpec(size=6, color='221714'),
+            FontSpec(size=38, color='000000'),
+        ])
+
+    with and_.every_page_should_be_parsed:
+        the(map(lambda p: p['page'], font_pages)).should.equal([3, 4])
+
+    with and_.a_page_should_list_the_fonts_it_uses:
+        the(font_pages[1]['fonts']).should.equal([
+            FontSpec(size=38, color='000000'),
+        ])
+
+    with and_.zero_width_texts_should_be_fixed:
+        the(font_pages[0]['texts'][1]['width']).should.equal(8.)
+
+    with when.texts_are_cropped:
+        texts = crop_texts(font_pages[0], [10, 10, 90, 90])
+
+        with then.texts_outside_the_page_should_be_dropped:
+            the(map(lambda t: t['text'], texts)).should.equal([u'Thor',
+                                                               u'Odin'])
+
+        with and_.texts_should_be_in_crop_box_space:
+            the(texts[0]['left']).should.equal(10.)
+            the(texts[0]['top']).should.equal(10.)
+
+with given.merged_words_with_fonts:
+
+    small = FontSpec(size=6, color='221714').__json__()
+    large = FontSpec(size=38, color='000000').__json__()
+
+    with then.the_font_covering_most_characters_should_win:
+        the(dominant_font([{'t': u'a', 'font': large},
+                           {'t': u'bcd', 'font': small}])).should.equal(small)
+
+    with and_.words_without_font_should_give_none:
+        the(dominant_font([{'t': u'a', 'font': None}])).should.be(None)
+
+with given.a_backend_extracting_fonts:
+
+    backend = FakeBackend(
+        [[word(u'Thor'), word(u'Odin', x=20., y=30., w=8., h=8.)]],
+        font_pages=parse_font_xml(SAMPLE_XML)[1][:1]
+    )
+
+    with when.extract_texts_with_fonts:
+        page = PDFPage.extract_texts('any.pdf', backend=backend,
+                                     fonts=True)[0]
+
+        with then.words_should_have_their_font_specs:
+            the(map(lambda w: w.font, page.words)).should.equal([
+                FontSpec(size=6, color='221714'),
+                FontSpec(size=38, color='000000'),
+            ])
+
+        with and_.the_page_should_list_its_fonts:
+            the(len(page.fonts)).should.equal(2)
+
+    with when.extract_texts_without_fonts:
+        page = PDFPage.extract_texts('any.pdf', backend=backend)[0]
+
+        with then.words_should_have_no_font_specs:
+            the(map(lambda w: w.font, page.words)).should.equal([None, None])
@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+
+# standard library imports
+import threading
+
+# third party related imports
+from pyspecs import and_, given, the, then, when
+
+# local library imports
+from Thor.pdf.memo import PageMemo
+from Thor.pdf.page import PDFPage
+from Thor.pdf.text import PDFText
+from Thor.preprocess.naive import NaivePreprocessor
+from Thor.utils.FontSpec import FontSpec
+
+
+def create_page(page_num, x=10., font=None):
+
+    return PDFPage(page_num=page_num, width=100, height=100, words=[
+        PDFText(x=x, y=10., w=10., h=5., t=u'Thor', font=font),
+        PDFText(x=x + 11., y=10., w=10., h=5., t=u'Odin', font=font),
+    ])
+
+
+with given.a_job_with_repeated_pages:
+
+    memo = PageMemo()
+    naive = lambda p: NaivePreprocessor(None, p).run()
+
+    with when.the_same_page_appears_twice:
+        first = memo.run('naive', create_page(1), naive)
+        second = memo.run('naive', create_page(7), naive)
+
+        with then.the_stage_should_run_once:
+            the(memo.stats).should.equal({'naive': {'hits': 1, 'misses': 1}})
+
+        with and_.the_reused_output_should_be_renumbered:
+            the(second.page_num).should.equal(7)
+            the(map(lambda w: w.t, second.words))\
+                .should.equal(map(lambda w: w.t, first.words))
+
+        with and_.the_reused_output_should_be_a_copy:
+            the(second.words[0]).should_NOT.be(first.words[0])
+
+    with when.boxes_differ_below_the_precision:
+
+        with then.pages_should_share_the_fingerprint:
+            the(memo.fingerprint(create_page(1, x=10.01)))\
+                .should.equal(memo.fingerprint(create_page(1)))
+
+    with when.boxes_or_fonts_differ:
+
+        with then.pages_should_not_share_the_fingerprint:
+            the(memo.fingerprint(create_page(1, x=20.)))\
+                .should_NOT.equal(memo.fingerprint(create_page(1)))
+            the(memo.fingerprint(create_page(1, font=FontSpec(8, '000000'))))\
+                .should_NOT.equal(memo.fingerprint(create_page(1)))
+
+    with when.stage_inputs_besides_the_page_differ:
+        raw = lambda texts: lambda p: texts
+        plain = memo.run('raw', create_page(4), raw([u'Thor Odin']),
+                         [u'Thor Odin'])
+        other = memo.run('raw', create_page(5), raw([u'Thor', u'Odin']),
+                         [u'Thor', u'Odin'])
+        same = memo.run('raw', create_page(6), raw(None), [u'Thor Odin'])
+
+        with then.outputs_should_be_kept_per_input:
+            the(plain).should.equal([u'Thor Odin'])
+            the(other).should.equal([u'Thor', u'Odin'])
+            the(same).should.equal([u'Thor Odin'])
+            the(memo.stats['raw']).should.equal({'hits': 1, 'misses': 2})
+
+    with when.other_stages_meet_the_page:
+        blocks = memo.run('xycut', create_page(2), lambda p: [u'Thor Odin'])
+        blocks = memo.run('xycut', create_page(3), lambda p: [u'Loki'])
+
+        with then.outputs_should_be_kept_per_stage:
+            the(blocks).should.equal([u'Thor Odin'])
+            the(memo.hits['xycut']).should.equal(1)
+
+    with when.threads_share_the_memo:
+        shared = PageMemo()
+        shared.run('shared', create_page(1), lambda p: [u'Thor'])
+
+        def look_up():
+            for page_num in xrange(1, 201):
+                shared.run('shared', create_page(page_num, x=page_num % 2),
+                           lambda p: [u'Thor'])
+
+        threads = [threading.Thread(target=look_up) for _ in xrange(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        with then.every_run_should_be_counted:
+            stats = shared.stats['shared']
+            the(stats['hits'] + stats['misses']).should.equal(1601)
@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# standard library imports
+import copy
+import os
+import tempfile
+
+# third party related imports
+from pyspecs import and_, given, the, then, when
+
+# local library imports
+from Thor.pdf.packed import (LazyPage, PackedPage, SharedPages, _map_chunk,
+                             load_pages, pack_page)
+from Thor.pdf.page import PDFPage
+from Thor.pdf.text import PDFText
+from Thor.utils.FontSpec import FontSpec
+
+
+def create_page(page_num):
+
+    body, title = FontSpec(10, '000000'), FontSpec(24, 'FF0000')
+    words = [
+        PDFText(10.5, 20., 30., 10., u'Thor', body),
+        PDFText(50., 20.25, 40., 10., u'麗寶生活家', title),
+        PDFText(10., 40., 25., 10., u'R&D', None),
+    ]
+    return PDFPage(page_num=page_num, width=595.28, height=841.89,
+                   words=words, fonts=[body])
+
+
+with given.a_page:
+
+    page = create_page(3)
+
+    with when.it_is_packed:
+        packed = PackedPage(pack_page(page))
+
+        with then.it_should_be_read_without_building_words:
+            the(packed.num_words).should.equal(3)
+            the(packed.get('y', 1)).should.equal(20.25)
+            the(list(packed.column('x'))).should.equal([10.5, 50., 10.])
+            the(packed.text(1)).should.equal(u'麗寶生活家')
+            the(packed.font(1)).should.equal(FontSpec(24, 'FF0000'))
+            the(packed.font(2)).should.be(None)
+
+        with and_.it_should_be_unpacked_losslessly:
+            the(PDFPage.dumps(packed.to_page())).\
+                should.equal(PDFPage.dumps(page))
+            the(packed.to_page().tier).should.be(None)
+
+    with when.a_page_with_layout_is_packed:
+        laid_out = create_page(4)
+        laid_out.layout = [(0, 0), (None, 1), None]
+        unpacked = PackedPage(pack_page(laid_out)).to_page()
+
+        with then.the_layout_should_survive:
+            the(unpacked.layout).should.equal(laid_out.layout)
+
+    with when.a_page_of_integer_coordinates_is_packed:
+        integral = PDFPage(page_num=5, width=600, height=800.5, words=[
+            PDFText(10, 20.5, 30, 10, u'Thor'),
+        ])
+        packed_integral = PackedPage(pack_page(integral))
+        unpacked = packed_integral.to_page()
+
+        with then.integers_should_come_back_as_integers:
+            the(type(unpacked.width)).should.be(int)
+            the(type(unpacked.height)).should.be(float)
+            the(map(type, (unpacked.words[0].x, unpacked.words[0].y)))\
+                .should.equal([int, float])
+            the(type(packed_integral.get('w', 0))).should.be(int)
+            the(PDFPage.dumps(unpacked)).should.equal(PDFPage.dumps(integral))
+
+    with when.an_empty_page_is_packed:
+        empty = PDFPage(page_num=7, width=100., height=100., tier='standard')
+        unpacked = PackedPage(pack_page(empty)).to_page()
+
+        with then.its_attributes_should_survive:
+            the(unpacked.page_num).should.equal(7)
+            the(unpacked.words).should.equal([])
+            the(unpacked.tier).should.equal(u'standard')
+
+
+with given.pages_in_shared_memory:
+
+    directory = tempfile.mkdtemp()
+    pages = map(create_page, xrange(1, 4))
+
+    with when.another_process_attaches_to_them:
+        with SharedPages.create(pages, directory) as shared:
+            name = shared.name
+            with SharedPages.attach(name) as attached:
+                num_pages = len(attached)
+                second = attached[1]
+                page_num, text = second.page_num, second.text(0)
+                unpacked = map(PDFPage.dumps, attached.pages())
+            shared.unlink()
+
+        with then.every_page_should_be_read_from_the_file:
+            the(num_pages).should.equal(3)
+            the(page_num).should.equal(2)
+            the(text).should.equal(u'Thor')
+            the(unpacked).should.equal(map(PDFPage.dumps, pages))
+
+        with and_.the_file_should_be_removable:
+            the(os.path.exists(name)).should.be(False)
+
+    # pools deadlock on the import lock held while pyspecs loads specs, so
+    # a chunk of map_pages() is run in this process
+    with when.a_chunk_of_pages_is_mapped:
+        with SharedPages.create(pages, directory) as shared:
+            name = _map_chunk((copy.deepcopy, shared.name, 1, 3, directory))
+            shared.unlink()
+        results = load_pages(name)
+
+        with then.pages_should_not_be_built_up_front:
+            the(map(lambda p: p.page_num, results)).should.equal([2, 3])
+            the(results[0]).should.be_a(LazyPage)
+            the(results[0].packed is None).should.be(False)
+
+        with and_.the_results_should_come_back_in_order:
+            the(map(PDFPage.dumps, results)).\
+                should.equal(map(PDFPage.dumps, pages[1:]))
+            the(results[0].packed).should.be(None)
+
+        with and_.copies_should_be_plain_pages:
+            the(type(copy.deepcopy(results[1]))).should.be(PDFPage)
+            the(PDFPage.dumps(copy.deepcopy(results[1])))\
+                .should.equal(PDFPage.dumps(pages[2]))
+
+        with and_.no_shared_memory_should_be_left:
+            the(os.listdir(directory)).should.equal([])
+
+    os.rmdir(directory)
@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+
+# standard library imports
+import os.path
+
+# third party related imports
+from pyspecs import and_, given, the, then, when
+
+# local library imports
+from Thor.pdf.info import PDFInfo, PDFInfoException
+
+
+curr_dir = os.path.dirname(os.path.abspath(__file__))
+
+with given.the_output_of_pdfinfo:
+
+    pdf_info = '\n'.join((
+        'Producer:       Adobe PDF Library 9.9',
+        'Pages:          2',
+        'Page    1 size: 683.15 x 853.23 pts',
+        'Page    1 rot:  0',
+        'Page    1 MediaBox:     0.00     0.00   683.15   853.23',
+        'Page    1 CropBox:     36.85    36.85   646.30   816.38',
+        'Page    1 BleedBox:    36.85    36.85   646.30   816.38',
+        'Page    1 TrimBox:     36.85    36.85   646.30   816.38',
+        'Page    1 ArtBox:      36.85    36.85   646.30   816.38',
+        'Page    2 size: 500.00 x 400.00 pts',
+        'Page    2 rot:  0',
+        'Page    2 MediaBox:     0.00     0.00   500.00   400.00',
+        'Page    2 CropBox:      0.00     0.00   500.00   400.00',
+        'Page    2 BleedBox:     0.00     0.00   500.00   400.00',
+        'Page    2 TrimBox:      0.00     0.00   500.00   400.00',
+        'Page    2 ArtBox:       0.00     0.00   500.00   400.00',
+        'File size:      176943 bytes',
+    ))
+
+    with when.parse_it:
+        info = PDFInfo.parse('sample.pdf', pdf_info)
+
+        with then.the_number_of_pages_should_be_correct:
+            the(info.num_pages).should.equal(2)
+
+        with and_.every_page_should_have_its_boxes:
+            the(sorted(info.boxes.keys())).should.equal([1, 2])
+            the(info.get_page_bboxes(1)['media']).\
+                should.equal([0, 0, 683.15, 853.23])
+            the(info.get_page_bboxes(1)['crop']).\
+                should.equal([36.85, 36.85, 646.30, 816.38])
+            the(info.get_page_bboxes(2)['art']).\
+                should.equal([0, 0, 500, 400])
+
+        with and_.the_boxes_should_not_be_shared_with_callers:
+            info.get_page_bboxes(1)['crop'][0] = -1
+            the(info.get_page_bboxes(1)['crop'][0]).should.equal(36.85)
+
+        with and_.unknown_page_should_be_rejected:
+            try:
+                info.get_page_bboxes(3)
+            except PDFInfoException:
+                rejected = True
+            else:
+                rejected = False
+
+            the(rejected).should.be(True)
+
+with given.a_pdf:
+
+    sample_pdf = os.path.join(curr_dir, 'fixture', 'test2.pdf')
+
+    with when.load_its_information:
+        info = PDFInfo.load(sample_pdf)
+
+        with then.the_number_of_pages_should_be_correct:
+            the(info.num_pages).should.equal(4)
+
+        with and_.it_should_be_memoized:
+            the(PDFInfo.load(sample_pdf)).should.be(info)
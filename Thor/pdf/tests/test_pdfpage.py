@@ -8,7 +8,7 @@ from pyspecs import and_, given, it, the, then, this, when
 import ujson
 
 # local library imports
-from Thor.pdf.page import PDFPage
+from Thor.pdf.page import PDFPage, _plan_page_runs, _split_pages
 from Thor.pdf.text import PDFText
 from Thor.utils.FontSpec import FontSpec
 from Thor.utils.Rectangle import Rectangle
@@ -79,6 +79,17 @@ with given.a_pdf:
                     word_box = Rectangle(word.x, word.y, word.w, word.h)
                     the(crop_box.intersect(word_box)).should_NOT.be(None)
 
+        with and_.it_can_stream_pages_one_by_one:
+            expected = map(PDFPage.dumps, PDFPage.extract_texts(sample_pdf))
+            streamed = PDFPage.iter_texts(sample_pdf, (2, 3, 4))
+            the(PDFPage.dumps(next(streamed))).should.equal(expected[1])
+            the(map(PDFPage.dumps, streamed)).should.equal(expected[2:])
+
+        with and_.it_can_extract_pages_in_parallel:
+            expected = map(PDFPage.dumps, PDFPage.extract_texts(sample_pdf))
+            pages = PDFPage.extract_texts(sample_pdf, workers=2)
+            the(map(PDFPage.dumps, pages)).should.equal(expected)
+
         with and_.it_can_keep_text_in_content_stream_order:
             for i in xrange(1, 4 + 1):
                 raw_textual_objects = PDFPage.extract_raw_texts(sample_pdf, i)
@@ -174,3 +185,35 @@ with given.a_pdf:
         with and_.fonts_shoule_be_correct:
             the(len(p.fonts)).should.equal(1)
             the(p.fonts[0]).should.equal(FontSpec(size=10, color='000000'))
+
+
+with given.some_page_numbers_to_extract:
+
+    with when.they_are_consecutive:
+
+        with then.they_should_be_extracted_in_one_run:
+            the(_plan_page_runs([1, 2, 3, 4])).should.equal([(1, 4)])
+
+    with when.they_have_gaps:
+
+        with then.every_consecutive_part_should_be_a_run:
+            the(_plan_page_runs([1, 2, 5, 7, 8])).\
+                should.equal([(1, 2), (5, 5), (7, 8)])
+
+    with when.they_are_not_in_ascending_order:
+
+        with then.the_requested_order_should_be_kept:
+            the(_plan_page_runs([3, 4, 1, 2, 2])).\
+                should.equal([(3, 4), (1, 2), (2, 2)])
+
+
+with given.some_page_numbers_to_distribute_over_workers:
+
+    with when.split_them_into_chunks:
+
+        with then.chunks_should_be_balanced_and_in_order:
+            the(_split_pages(range(1, 8), 3)).\
+                should.equal([[1, 2, 3], [4, 5], [6, 7]])
+
+        with and_.no_chunk_should_be_empty:
+            the(_split_pages([1, 2], 8)).should.equal([[1], [2]])
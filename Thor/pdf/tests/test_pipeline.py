@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+
+# standard library imports
+import time
+
+# third party related imports
+from pyspecs import and_, given, the, then, when
+
+# local library imports
+from Thor.pdf.document import PDFDocument
+from Thor.pdf.pipeline import PagePipeline
+from Thor.pdf.tests.fakes import FakeBackend, numbered_pages
+from Thor.preprocess.fontspec import FontSpecPreprocessor
+from Thor.utils.FontSpec import FontSpec
+
+
+def run_pages(pipeline, page_nums, delay):
+
+    start, ret = time.time(), []
+    for inputs in pipeline.run(page_nums):
+        time.sleep(delay)
+        ret.append(inputs)
+
+    return ret, time.time() - start
+
+
+with given.a_pipeline_prefetching_pages:
+
+    # pages take a while to extract and the last one is blank
+    backend = FakeBackend(numbered_pages(4) + [[]], delay=0.2)
+    document = PDFDocument('any.pdf', backend)
+    pipeline = PagePipeline(document, prefetch=2)
+
+    with when.pages_are_processed:
+        inputs, elapsed = run_pages(pipeline, [4, 2, 3, 1, 5], 0.2)
+
+        with then.they_should_come_in_the_given_order:
+            the(map(lambda i: i.page.page_num, inputs)).\
+                should.equal([4, 2, 3, 1, 5])
+            the(inputs[0].page.words[0].t).should.equal(u'page4')
+            the(inputs[0].raw_texts).should.equal([u'page4'])
+
+        with and_.fetching_should_overlap_processing:
+            # fetching and processing one after another takes 2 seconds
+            the(elapsed).should.be_less_than(1.6)
+
+        with and_.blank_pages_should_get_no_raw_texts:
+            the(inputs[-1].raw_texts).should.be(None)
+            the((5,) in backend.calls_of('raw')).should.be(False)
+
+    with when.nothing_is_prefetched:
+        serial = PagePipeline(document, prefetch=0, raw_texts=False)
+        inputs = list(serial.run([1, 2]))
+
+        with then.pages_should_be_fetched_one_by_one:
+            the(map(lambda i: i.page.page_num, inputs)).should.equal([1, 2])
+            the(inputs[0].raw_texts).should.be(None)
+
+    with when.consecutive_pages_are_prefetched:
+        backend.calls = []
+        batched = PagePipeline(document, prefetch=2, font_pages=True)
+        inputs = list(batched.run([1, 2, 3, 4, 5]))
+
+        with then.every_batch_should_be_extracted_at_once:
+            the(backend.calls_of('words')).should.equal([(1, 2), (3, 4),
+                                                         (5, 5)])
+
+        with and_.fonts_should_come_from_the_backend_per_batch:
+            the(backend.calls_of('fonts')).should.equal([(1, 2), (3, 4)])
+            the(inputs[0].font_page['page']).should.equal(1)
+            the(inputs[-1].font_page).should.be(None)
+
+    with when.a_fetched_font_page_is_handed_to_FontSpecPreprocessor:
+        font = FontSpec(9, '000000')
+        font_page = {'page': 1, 'width': 100., 'height': 100.,
+                     'fonts': [font],
+                     'texts': [{'top': 20., 'left': 20., 'width': 10.,
+                                'height': 5., 'text': u'page1',
+                                'font': font}]}
+        page = FontSpecPreprocessor(document, inputs[0].page,
+                                    font_page=font_page).run()
+
+        with then.words_should_get_its_fonts:
+            the(page.fonts).should.equal([font])
+            the(page.words[0].font).should.equal(font)
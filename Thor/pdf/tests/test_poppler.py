@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+
+# standard library imports
+from tempfile import mkdtemp
+import os.path
+import shutil
+
+# third party related imports
+from pyspecs import and_, given, the, then, when
+
+# local library imports
+from Thor.pdf import poppler
+
+
+with given.an_archive_of_a_document:
+
+    directory = mkdtemp()
+    archive = os.path.join(directory, 'document.zip')
+    recorded_pdf = os.path.join(directory, 'recorded.pdf')
+    replayed_pdf = os.path.join(directory, 'elsewhere', 'replayed.pdf')
+
+    with when.outputs_are_recorded:
+        with poppler.recording(archive, recorded_pdf):
+            output = poppler.check_output(('echo', '-n', recorded_pdf))
+            with poppler.open_output(('printf', 'a\\nb\\n')) as stream:
+                lines = list(iter(stream.readline, ''))
+
+        with then.commands_should_run_as_usual:
+            the(output).should.equal(recorded_pdf)
+            the(lines).should.equal(['a\n', 'b\n'])
+
+        with and_.the_archive_should_be_written:
+            the(os.path.exists(archive)).should.be(True)
+
+    with when.outputs_are_replayed_for_the_document_elsewhere:
+        with poppler.replaying(archive, replayed_pdf):
+            output = poppler.check_output(('echo', '-n', replayed_pdf))
+            with poppler.open_output(('printf', 'a\\nb\\n')) as stream:
+                data = stream.read()
+
+            try:
+                poppler.check_output(('echo', 'never recorded'))
+            except poppler.ReplayException:
+                rejected = True
+            else:
+                rejected = False
+
+        with then.recorded_outputs_should_be_served:
+            the(output).should.equal(recorded_pdf)
+            the(data).should.equal('a\nb\n')
+
+        with and_.unrecorded_commands_should_be_rejected:
+            the(rejected).should.be(True)
+
+    shutil.rmtree(directory)
+
+with given.programs_started_through_the_wrappers:
+
+    with when.a_program_is_started_twice:
+        first = poppler.check_output(('echo', '-n', 'a'))
+        second = poppler.check_output(('echo', '-n', 'b'))
+
+        with then.it_should_be_looked_up_once:
+            the(first + second).should.equal('ab')
+            the(poppler._programs).should.contain('echo')
+
+    with when.a_missing_program_is_started:
+        try:
+            poppler.check_output(('no-such-poppler-utility',))
+        except OSError:
+            missing = True
+        else:
+            missing = False
+
+        with then.it_should_raise_os_error:
+            the(missing).should.be(True)
+
+        with and_.it_should_not_be_remembered:
+            the(poppler._programs).should_NOT.contain(
+                'no-such-poppler-utility')
@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+
+# standard library imports
+
+# third party related imports
+from pyspecs import and_, given, the, then, when
+
+# local library imports
+from Thor.pdf.document import PDFDocument
+from Thor.pdf.page import PDFPage
+from Thor.pdf.preflight import Preflight
+from Thor.pdf.tests.fakes import FakeBackend, word
+
+
+with given.a_partly_scanned_document:
+
+    # page 2 is scanned, page 3 has a blank crop box
+    box = [0, 0, 80, 90]
+    backend = FakeBackend(
+        [[word(u'Thor')], [], [], [word(u'Odin')]],
+        crop_boxes={1: box, 2: box, 3: [0, 0, 0, 0], 4: box},
+        raw_texts={1: [u'Thor'], 2: [u''], 3: [u''], 4: [u'Odin', u'']}
+    )
+    document = PDFDocument('any.pdf', backend)
+
+    with when.it_is_preflighted:
+        preflight = Preflight.run(document)
+
+        with then.pages_without_text_should_be_empty:
+            the(preflight.empty_pages).should.equal([2, 3])
+            the(preflight.has_text(1)).should.be(True)
+            the(preflight.has_text(4)).should.be(True)
+
+    with when.pages_are_extracted_with_the_preflight:
+        backend.calls = []
+        pages = PDFPage.extract_texts(document, preflight=preflight)
+
+        with then.only_text_pages_should_be_extracted:
+            the(backend.calls).should.equal([('words', 1, 1),
+                                              ('words', 4, 4)])
+
+        with and_.empty_pages_should_be_returned_in_place:
+            the(map(lambda p: p.page_num, pages)).should.equal([1, 2, 3, 4])
+            the(map(lambda p: len(p.words), pages)).should.equal([1, 0, 0, 1])
+            the(pages[1].width).should.equal(80)
+            the(pages[1].height).should.equal(90)
+
+    with when.only_a_page_range_is_preflighted:
+        preflight = Preflight.run(document, 1, 2)
+
+        with then.pages_out_of_range_should_be_taken_as_text_bearing:
+            the(preflight.empty_pages).should.equal([2])
+            the(preflight.has_text(3)).should.be(True)
@@ -0,0 +1,45 @@
+#!/usr/bin/env python
+
+# standard library imports
+import subprocess
+
+# third party related imports
+from pyspecs import and_, given, the, then, when
+
+# local library imports
+from Thor.pdf.reactor import Future, Reactor
+
+
+with given.a_reactor:
+
+    reactor = Reactor(max_processes=2)
+
+    with when.run_several_processes:
+        futures = [reactor.spawn(('echo', str(i))) for i in xrange(5)]
+        finished = list(reactor.as_completed(futures))
+
+        with then.every_process_should_finish:
+            the(len(finished)).should.equal(5)
+            the(reactor.idle).should.be(True)
+
+        with and_.each_future_should_keep_its_own_output:
+            the(map(lambda f: f.result(), futures)).\
+                should.equal(['0\n', '1\n', '2\n', '3\n', '4\n'])
+
+    with when.a_process_fails:
+        future = reactor.spawn(('sh', '-c', 'exit 3'))
+        try:
+            reactor.run_until_complete(future)
+        except subprocess.CalledProcessError, e:
+            error = e
+
+        with then.the_exit_status_should_be_reported:
+            the(error.returncode).should.equal(3)
+
+    with when.chain_results:
+        future = reactor.spawn(('echo', 'thor')).then(lambda o: o.strip())
+        gathered = Future.gather((future, Future.completed('odin')))
+
+        with then.the_chained_result_should_be_computed:
+            the(reactor.run_until_complete(gathered)).\
+                should.equal(['thor', 'odin'])
@@ -0,0 +1,173 @@
+#!/usr/bin/env python
+
+# standard library imports
+import threading
+import time
+
+# third party related imports
+from pyspecs import and_, given, the, then, when
+
+# local library imports
+from Thor.pdf import poppler
+from Thor.pdf import scheduler
+from Thor.pdf.reactor import Reactor
+from Thor.pdf.scheduler import Scheduler
+
+
+def wait_until(predicate):
+
+    while not predicate():
+        time.sleep(0.01)
+
+
+with given.a_scheduler_with_limits:
+
+    limited = Scheduler(max_processes=2, tool_limits={'pdftohtml': 1})
+
+    with when.commands_take_slots_without_waiting:
+        first = limited.acquire(('pdftohtml', 'a.pdf'), blocking=False)
+        second = limited.acquire(('pdftohtml', 'b.pdf'), blocking=False)
+        other = limited.acquire(('pdftotext', 'a.pdf'), blocking=False)
+        third = limited.acquire(('pdftotext', 'b.pdf'), blocking=False)
+
+        with then.the_limit_of_each_tool_should_hold:
+            the(first is None).should.be(False)
+            the(second).should.be(None)
+
+        with and_.the_global_limit_should_hold:
+            the(other is None).should.be(False)
+            the(third).should.be(None)
+
+        limited.release(first)
+        limited.release(other)
+
+        with and_.calls_should_be_counted_per_tool:
+            the(limited.stats['pdftohtml']['calls']).should.equal(1)
+            the(limited.stats['pdftotext']['calls']).should.equal(1)
+
+    with when.a_command_waits_past_its_deadline:
+        done = threading.Event()
+
+        def hold():
+            with limited.running(('pdftohtml', 'a.pdf')):
+                done.wait()
+
+        holder = threading.Thread(target=hold)
+        holder.start()
+        wait_until(lambda: limited.stats['pdftohtml']['calls'] == 2)
+
+        start = time.time()
+        slot = limited.acquire(('pdftohtml', 'b.pdf'), until=start + 0.1)
+        elapsed = time.time() - start
+
+        done.set()
+        holder.join()
+
+        with then.it_should_give_up:
+            the(slot).should.be(None)
+            the(elapsed).should.be_less_than(1.)
+
+
+with given.a_scheduler_while_a_stream_is_open:
+
+    streaming = Scheduler(max_processes=2, tool_limits={'pdftohtml': 1})
+
+    with when.other_commands_ask_for_slots:
+        scheduler.set_scheduler(streaming)
+        taken = []
+
+        def take(cmd, **kwargs):
+            taken.append(streaming.acquire(cmd, **kwargs))
+
+        try:
+            with poppler.open_output(('printf', 'a\\n')) as stream:
+                for cmd, kwargs in ((('pdftohtml', 'b.pdf'),
+                                     {'blocking': False}),
+                                    (('pdftotext', 'c.pdf'),
+                                     {'until': time.time() + 0.1})):
+                    other = threading.Thread(target=take, args=(cmd,),
+                                             kwargs=kwargs)
+                    other.start()
+                    other.join()
+
+                nested = streaming.acquire(('pdftohtml', 'a.pdf'),
+                                           until=time.time() + 0.1)
+                lines = list(iter(stream.readline, ''))
+        finally:
+            scheduler.set_scheduler(Scheduler())
+            if taken[0] is not None:
+                streaming.release(taken[0])
+
+        with then.the_global_limit_should_hold_for_other_threads:
+            the(taken[0] is None).should.be(False)
+            the(taken[1]).should.be(None)
+
+        with and_.a_nested_command_should_respect_the_limit_of_its_tool:
+            the(nested).should.be(None)
+            the(lines).should.equal(['a\n'])
+
+
+with given.a_scheduler_with_a_single_slot:
+
+    single = Scheduler(max_processes=1)
+
+    with when.commands_of_different_priorities_wait:
+        held = single.acquire(('pdftotext', 'held.pdf'))
+        order = []
+
+        def take(name, value):
+            slot = single.acquire(('pdftotext', name), value)
+            order.append(name)
+            single.release(slot)
+
+        threads = []
+        for ix, (name, value) in enumerate((('low', 0), ('first', 1),
+                                            ('second', 1))):
+            thread = threading.Thread(target=take, args=(name, value))
+            thread.start()
+            threads.append(thread)
+            wait_until(lambda: len(single._waiting) == ix + 1)
+
+        single.release(held)
+        for thread in threads:
+            thread.join()
+
+        with then.higher_priorities_should_go_first_in_fifo_order:
+            the(order).should.equal(['first', 'second', 'low'])
+
+        with and_.the_queue_wait_should_be_counted:
+            the(single.stats['pdftotext']['queue_wait']).\
+                should.be_greater_than(0.)
+
+    with when.a_thread_holding_a_slot_runs_another_command:
+        with single.running(('pdftotext', 'outer.pdf')):
+            nested = single.acquire(('pdfinfo', 'inner.pdf'))
+            single.release(nested)
+
+        with then.it_should_not_deadlock:
+            the(nested is None).should.be(False)
+
+    with when.a_thread_nests_deeper_than_allowed:
+        with single.running(('pdftotext', 'outer.pdf')):
+            with single.running(('pdfinfo', 'inner.pdf')):
+                deeper = single.acquire(('pdffonts', 'inner.pdf'),
+                                        until=time.time() + 0.1)
+
+        with then.it_should_wait_for_a_slot:
+            the(deeper).should.be(None)
+
+    with when.poppler_utilities_run_through_it:
+        scheduler.set_scheduler(single)
+        try:
+            output = poppler.check_output(('echo', 'thor'))
+            reactor = Reactor()
+            futures = [reactor.spawn(('echo', str(i))) for i in xrange(3)]
+            finished = list(reactor.as_completed(futures))
+        finally:
+            scheduler.set_scheduler(Scheduler())
+
+        with then.every_command_should_be_counted:
+            the(output).should.equal('thor\n')
+            the(len(finished)).should.equal(3)
+            the(single.stats['echo']['calls']).should.equal(4)
+            the(single.stats['echo']['run_time']).should.be_greater_than(0.)
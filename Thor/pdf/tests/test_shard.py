@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+
+# standard library imports
+from tempfile import mkdtemp
+import os.path
+import shutil
+
+# third party related imports
+from pyspecs import and_, given, the, then, when
+
+# local library imports
+from Thor.pdf.shard import (ShardException, load_json, merge_shards,
+                            plan_shards, run_shard)
+from Thor.pdf.tests.fakes import FakeBackend, numbered_pages
+
+
+with given.a_document_of_5_pages:
+
+    backend = FakeBackend(numbered_pages(5))
+    directory = mkdtemp()
+
+    with when.it_is_planned_into_2_shards:
+        shards = plan_shards('any.pdf', 2, backend=backend)
+
+        with then.page_ranges_should_cover_the_document_in_order:
+            the(map(lambda s: (s['first'], s['last']), shards))\
+                .should.equal([(1, 3), (4, 5)])
+            the(map(lambda s: s['page'], shards)).should.equal([5, 5])
+
+    with when.a_page_range_is_planned_and_merged:
+        sub_shards = plan_shards('any.pdf', 2, first=2, last=4,
+                                 backend=backend)
+        sub_partials = []
+        for shard in sub_shards:
+            sub_partials.append(run_shard(
+                shard, os.path.join(directory, 'sub%d.json' % shard['shard']),
+                backend=backend
+            ))
+
+        sub_merged = merge_shards(sub_partials)
+
+        with then.only_pages_of_the_range_should_be_merged:
+            the(map(lambda p: p['page'], sub_merged['data']))\
+                .should.equal([2, 3, 4])
+
+        with and_.the_range_should_be_recorded_in_every_shard:
+            the(map(lambda s: s['range'], sub_shards))\
+                .should.equal([[2, 4], [2, 4]])
+
+    with when.more_shards_than_pages_are_planned:
+
+        with then.every_shard_should_have_a_page:
+            the(len(plan_shards('any.pdf', 9, backend=backend)))\
+                .should.equal(5)
+
+    with when.every_shard_runs_on_its_own:
+        partial_files = []
+        for shard in reversed(shards):
+            partial_files.append(os.path.join(directory,
+                                              '%d.json' % shard['shard']))
+            run_shard(shard, partial_files[-1], backend=backend)
+
+        merged = merge_shards(map(load_json, partial_files))
+
+        with then.the_merged_document_should_be_in_pdftext_format:
+            the(sorted(merged.keys())).should.equal(['data', 'file', 'page',
+                                                     'version'])
+            the(merged['page']).should.equal(5)
+
+        with and_.pages_should_be_in_order:
+            the(map(lambda p: p['page'], merged['data']))\
+                .should.equal([1, 2, 3, 4, 5])
+
+        with and_.the_merge_should_not_depend_on_partial_order:
+            the(merge_shards(map(load_json, reversed(partial_files))))\
+                .should.equal(merged)
+
+    with when.a_shard_is_missing:
+        try:
+            merge_shards([load_json(partial_files[0])])
+        except ShardException:
+            rejected = True
+        else:
+            rejected = False
+
+        with then.the_merge_should_be_rejected:
+            the(rejected).should.be(True)
+
+    with when.shards_leave_a_gap:
+        partials = map(load_json, partial_files)
+        for partial in partials:
+            if partial['shard'] == 1:
+                partial['first'] += 1
+                partial['data'] = partial['data'][1:]
+
+        try:
+            merge_shards(partials)
+        except ShardException:
+            gap_rejected = True
+        else:
+            gap_rejected = False
+
+        with then.the_merge_should_be_rejected:
+            the(gap_rejected).should.be(True)
+
+    with when.shards_do_not_reach_the_last_page:
+        partials = map(load_json, partial_files)
+        for partial in partials:
+            if partial['shard'] == 1:
+                partial['last'] -= 1
+                partial['data'] = partial['data'][:-1]
+
+        try:
+            merge_shards(partials)
+        except ShardException:
+            short_rejected = True
+        else:
+            short_rejected = False
+
+        with then.the_merge_should_be_rejected:
+            the(short_rejected).should.be(True)
+
+    shutil.rmtree(directory)
@@ -1,38 +1,77 @@
 #!/usr/bin/env python
 
 # standard library imports
-from collections import Counter, defaultdict
-from contextlib import closing
-from tempfile import NamedTemporaryFile
-import subprocess
+from collections import OrderedDict
 
 # third party related imports
-from pyquery import PyQuery
 
 # local library imports
-from Thor.pdf.page import PDFPage
-from Thor.utils.FontSpec import FontSpec
+from Thor.pdf import poppler
+from Thor.pdf.document import PDFDocument
+from Thor.pdf.fonts import (assign_fonts, crop_texts, match_word,
+                            parse_font_xml, pdftohtml_command)
+from Thor.pdf.info import PDFInfo
+from Thor.pdf.reactor import Future
 
 
 class FontSpecPreprocessor(object):
     """Preprocessor which gives word its font spec, e.g. color, font size.
 
     Attributes:
+        document: The PDFDocument instance of the PDF document.
         pdf_filename: The filename of the PDF document.
         page: A PDFPage instance.
         font_specs: A list of FontSpec instances.
 
     """
 
-    def __init__(self, pdf_filename, page):
+    def __init__(self, pdf_filename, page, xml=None, font_page=None):
 
-        self.pdf_filename = pdf_filename
+        self.document = PDFDocument.open(pdf_filename)
+        self.pdf_filename = self.document.filename
         self.page = page
 
-        self._fontspecs = {}
+        self._fontspecs = OrderedDict()
         self._words = []
 
-        self.convert_to_xml()
+        # a page without words has nothing to give font specs to
+        if len(page.words) == 0:
+            return
+
+        if font_page is not None:
+            self.use_font_page(font_page)
+        elif xml is None:
+            self.convert_to_xml()
+        else:
+            self.parse_xml(xml)
+
+    @classmethod
+    def create_async(cls, reactor, pdf_filename, page):
+        """Create a preprocessor without blocking on `pdftohtml`.
+
+        Args:
+            reactor: A Reactor instance to run poppler utilities on.
+            pdf_filename: The filename of the PDF document, or a
+                PDFDocument instance.
+            page: A PDFPage instance.
+
+        Returns:
+            A Future of a FontSpecPreprocessor instance.
+
+        """
+
+        if len(page.words) == 0:
+            return Future.completed(cls(pdf_filename, page))
+
+        filename = PDFDocument.open(pdf_filename).filename
+        cmd = pdftohtml_command(filename, page.page_num, page.page_num)
+
+        return Future.gather((
+            reactor.spawn(cmd),
+            PDFInfo.load_async(reactor, filename),
+        )).then(
+            lambda (xml, info): cls(pdf_filename, page, xml.decode('utf8'))
+        )
 
     @property
     def font_specs(self):
@@ -54,16 +93,7 @@ class FontSpecPreprocessor(object):
 
         """
 
-        x, y = word['left'], word['top']
-        w, h = word['width'], word['height']
-        center_x, center_y = x + w / 2., y + h / 2.
-
-        for word in self.page.words:
-            if  (word.x <= center_x <= word.x + word.w) and \
-                (word.y <= center_y <= word.y + word.h):
-                return word
-
-        return None
+        return match_word(self.page.words, word)
 
     def run(self):
         """Main function.
@@ -75,29 +105,7 @@ class FontSpecPreprocessor(object):
 
         """
 
-        self.page.fonts = self.font_specs
-
-        votes = defaultdict(Counter)
-        for word in self._words:
-            match_word = self.match(word)
-            if match_word is not None:
-                votes[id(match_word)][word['font']] += 1
-
-        for match_word_id in votes:
-            for word in self.page.words:
-                if id(word) == match_word_id:
-                    counter = votes[match_word_id]
-                    most_fontspec = counter.most_common(1)[0]
-
-                    fontspec_found = False
-                    for fontspec in self.page.fonts:
-                        if fontspec == most_fontspec[0]:
-                            word._font = fontspec
-                            fontspec_found = True
-                            break
-
-                    if fontspec_found:
-                        break
+        assign_fonts(self.page, self._words, self.font_specs)
 
         return self.page
 
@@ -108,13 +116,9 @@ class FontSpecPreprocessor(object):
 
         """
 
-        cmd = ('pdftohtml', '-i', '-xml', '-zoom', '1',
-               '-f', str(self.page.page_num),
-               '-l', str(self.page.page_num),
-               '-stdout',
-               '-nodrm',
-               self.pdf_filename)
-        xml = subprocess.check_output(cmd)
+        cmd = pdftohtml_command(self.pdf_filename, self.page.page_num,
+                                self.page.page_num)
+        xml = poppler.check_output(cmd)
         self.parse_xml(xml.decode('utf8'))
 
     def parse_xml(self, xml_stream):
@@ -125,39 +129,21 @@ class FontSpecPreprocessor(object):
 
         """
 
-        start = xml_stream.find('<pdf2xml')
-        end = xml_stream.find('</pdf2xml>') + 10
-        jq = PyQuery(xml_stream[start:end])
-
-        boxes = PDFPage.get_page_bboxes(self.pdf_filename, self.page.page_num)
-        crop_box = boxes['crop']
-
-        page_element = jq('page')[0]
-        page_width = float(page_element.attrib['width'])
-        page_height = float(page_element.attrib['height'])
-
-        fontspec_elements = jq('fontspec')
-        for fs in fontspec_elements:
-            attr = fs.attrib
-            fid, fsize, fcolor = attr['id'], attr['size'], attr['color']
-            self._fontspecs[fid] = FontSpec(size=int(fsize), color=fcolor[1:])
-
-        text_elements = jq('text')
-        for ix, text in enumerate(text_elements):
-            attr = text.attrib
-            top, left = float(attr['top']), float(attr['left'])
-            width, height = float(attr['width']), float(attr['height'])
-            # it is pdftohtml bug
-            width = height if width == 0 else width
-
-            if  (top >= page_height or top + height <= 0) or \
-                (left + width <= 0 or left > page_width):
-                continue
-
-            self._words.append({
-                'top': top - crop_box[1], 'left': left - crop_box[0],
-                'width': width, 'height': height,
-                'text': text.text,
-                'font': self._fontspecs[attr['font']],
-            })
+        self._fontspecs, font_pages = parse_font_xml(xml_stream)
+
+        boxes = self.document.get_page_bboxes(self.page.page_num)
+        self._words = crop_texts(font_pages[0], boxes['crop'])
+
+    def use_font_page(self, font_page):
+        """Get the font spec of every word from extracted fonts.
+
+        Args:
+            font_page: A page dict of Backend.extract_fonts(), e.g. from
+                PagePipeline.
+
+        """
+
+        self._fontspecs = OrderedDict(enumerate(font_page['fonts']))
 
+        boxes = self.document.get_page_bboxes(self.page.page_num)
+        self._words = crop_texts(font_page, boxes['crop'])
@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+
+# standard library imports
+from collections import OrderedDict
+
+# third party related imports
+
+# local library imports
+from Thor.pdf.fonts import dominant_font
+from Thor.pdf.page import PDFPage
+from Thor.pdf.text import PDFText
+
+
+__all__ = ['LayoutPreprocessor']
+
+
+class LayoutPreprocessor(object):
+    """Preprocessor which merges words along the lines found by poppler.
+
+    Pages extracted with layout, see PDFPage.extract_texts(), know the
+    line every word belongs to. The words of a line are merged into one
+    word right away, without the searches of RawTextPreprocessor or the
+    rounds of NaivePreprocessor. Only words in no line, or every word
+    of a page without layout, are handed to another preprocessor, e.g.
+
+        page = PDFPage.extract_texts(filename, [1], layout=True)[0]
+        page = LayoutPreprocessor(
+            filename, page,
+            ungrouped=lambda p: NaivePreprocessor(filename, p).run()
+        ).run()
+
+    Attributes:
+        page: A PDFPage instance.
+        separator: The text put between the words of a line.
+        ungrouped: A function preprocessing a PDFPage of the words in no
+            line, or None to keep those words as they are.
+
+    """
+
+    def __init__(self, pdf_filename, page, separator=u' ', ungrouped=None):
+
+        self.page = page
+        self.separator = separator
+        self.ungrouped = ungrouped
+
+    def run(self):
+        """Merge the words of every line of the page.
+
+        Returns:
+            A PDFPage instance, with a word per line in the order of
+            the first word of every line. Unless ungrouped is None, the
+            words it gives for the words in no line follow the lines,
+            and the page takes its tier.
+
+        """
+
+        layout = self.page.layout
+        if layout is None:
+            layout = [None] * len(self.page.words)
+
+        # words in no line make a group of their own
+        groups = OrderedDict()
+        for word_ix, pair in enumerate(layout):
+            key = ('line', pair[1]) if pair is not None else ('word', word_ix)
+            groups.setdefault(key, []).append(word_ix)
+
+        words, merged_layout, rest = [], [], []
+        for (kind, _), word_ixs in groups.iteritems():
+            if kind == 'word' and self.ungrouped is not None:
+                rest.append(word_ixs[0])
+                continue
+
+            words.append(self._merge_words(word_ixs))
+            merged_layout.append(layout[word_ixs[0]])
+
+        tier = self.page.tier
+        if self.ungrouped is not None:
+            # lines are final, only the other words are merged further
+            preprocessed = self.ungrouped(PDFPage(
+                page_num=self.page.page_num,
+                width=self.page.width,
+                height=self.page.height,
+                words=map(lambda ix: self.page.words[ix], rest),
+                fonts=self.page.fonts,
+                tier=self.page.tier,
+            ))
+            words.extend(preprocessed.words)
+            merged_layout.extend([None] * len(preprocessed.words))
+            tier = preprocessed.tier
+
+        return PDFPage(page_num=self.page.page_num,
+                       width=self.page.width,
+                       height=self.page.height,
+                       words=words,
+                       fonts=self.page.fonts,
+                       tier=tier,
+                       layout=merged_layout if self.page.layout is not None
+                              else None)
+
+    def _merge_words(self, word_ixs):
+
+        words = map(lambda ix: self.page.words[ix], word_ixs)
+        if len(words) == 1:
+            return words[0]
+
+        union = words[0].rect
+        for word in words[1:]:
+            union |= word.rect
+
+        return PDFText.create_from_dict({
+            'x': union.x, 'y': union.y,
+            'w': union.w, 'h': union.h,
+            't': self.separator.join(map(lambda w: w.t, words)),
+            'font': dominant_font(map(lambda w: w.__json__(), words)),
+        })
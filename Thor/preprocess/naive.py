@@ -5,8 +5,10 @@
 # third party related imports
 
 # local library imports
+from Thor.pdf.fonts import dominant_font
 from Thor.pdf.page import PDFPage
 from Thor.pdf.text import PDFText
+from Thor.preprocess.tier import default_cost_model, get_tier
 from Thor.utils.Point import Point
 from Thor.utils.Rectangle import Rectangle
 
@@ -22,22 +24,37 @@ class NaivePreprocessor(object):
 
     The preprocessor merge close words based on some conditions.
 
+    Words are merged round by round until nothing changes, or until the
+    rounds of the Tier are used up. Unless a tier is given, the cost
+    model picks one from the number of words of the page; the tier a
+    page was recorded with, e.g. by RawTextPreprocessor, is not reused,
+    as it was chosen for another estimate. With the default cost model,
+    pages of more than 1000 words are merged in a limited number of
+    rounds.
+
     Attributes:
         page: A PDFPage instance.
         words: A list of Word instance.
         factory: An instance of WordFactory.
+        tier: The Tier instance the page is preprocessed in.
 
     """
 
     def __init__(self, pdf_filename, page,
                  normalize_width=1000,
                  min_dist=3,
-                 font_ratio=0.9):
+                 font_ratio=0.9,
+                 tier=None,
+                 cost_model=None):
 
         self.page = page
         self.words = map(Word.create_from_pdftext, page.words)
         self.factory = WordFactory(min_dist, font_ratio)
 
+        if tier is None:
+            tier = (cost_model or default_cost_model).choose(len(self.words))
+        self.tier = get_tier(tier)
+
         self._normalize_width = normalize_width
 
     def run(self):
@@ -45,14 +62,17 @@ class NaivePreprocessor(object):
         ret = PDFPage(page_num=self.page.page_num,
                       width=self.page.width,
                       height=self.page.height,
-                      words=None)
+                      words=None,
+                      fonts=self.page.fonts,
+                      tier=self.tier.name)
 
         scale_factor = 1.0 * self._normalize_width / self.page.width
         self._scale_words(scale_factor)
 
-        next_round = []
+        next_round, rounds = [], 0
         while True:
             ismerged = [False] * len(self.words)
+            rounds += 1
 
             for i, word1 in enumerate(self.words):
                 if ismerged[i]:
@@ -76,6 +96,10 @@ class NaivePreprocessor(object):
             if not any(ismerged):
                 break
 
+            if self.tier.max_naive_rounds is not None and \
+               rounds >= self.tier.max_naive_rounds:
+                break
+
         self._scale_words(1.0 / scale_factor)
         ret.words = map(lambda w: PDFText.create_from_dict(w._word_obj),
                         self.words)
@@ -267,6 +291,7 @@ class WordFactory(object):
             'x': rectangle.x, 'y': rectangle.y,
             'w': rectangle.w, 'h': rectangle.h,
             't': None,
+            'font': dominant_font((word1._word_obj, word2._word_obj)),
         }
 
         if word1['x'] <= word2['x']:
@@ -287,6 +312,7 @@ class WordFactory(object):
             'x': rectangle.x, 'y': rectangle.y,
             'w': rectangle.w, 'h': rectangle.h,
             't': None,
+            'font': dominant_font((word1._word_obj, word2._word_obj)),
         }
 
         if word1['y'] <= word2['y']:
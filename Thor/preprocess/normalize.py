@@ -0,0 +1,145 @@
+#!/usr/bin/env python
+
+# standard library imports
+import unicodedata
+
+# third party related imports
+
+# local library imports
+from Thor.pdf.page import PDFPage
+from Thor.pdf.text import PDFText
+from Thor.utils.PdfXmlParser import CONTROL_CODEPOINTS
+
+
+__all__ = ['Normalizer']
+
+
+# no-break, en, em, thin, ideographic and other fixed width spaces
+_SPACES = [0x00A0, 0x1680, 0x202F, 0x205F, 0x3000] + range(0x2000, 0x200B)
+
+# ff, fi, fl, ffi, ffl, long st, st, IJ and ij
+_LIGATURES = range(0xFB00, 0xFB07) + [0x0132, 0x0133]
+
+# control and format characters of the BMP
+_CONTROLS = [c for c, category in CONTROL_CODEPOINTS.iteritems()
+             if category in ('Cc', 'Cf')]
+
+
+class Normalizer(object):
+    """Normalize the texts of words and raw streams before matching.
+
+    The texts of a page are normalized together by a translation table
+    built once per normalizer, so RawTextPreprocessor finds words in raw
+    streams whatever forms of spaces or ligatures either side uses, e.g.
+
+        normalizer = Normalizer(ligatures=True)
+        page = RawTextPreprocessor(filename, page, raw_texts,
+                                   normalizer=normalizer).run()
+
+    Attributes:
+        spaces: Whether special spaces become a plain space.
+        controls: Whether control and format characters are removed. A
+            tab becomes a plain space; newlines are kept.
+        ligatures: Whether ligatures are expanded, e.g. u'\\ufb01' to
+            u'fi'.
+        nfkc: Whether texts are put in NFKC form after the other
+            options, which folds further compatibility characters, e.g.
+            full width forms, but is slower. It neither removes control
+            characters nor replaces every special space by itself.
+
+    """
+
+    def __init__(self, spaces=True, controls=True, ligatures=False,
+                 nfkc=False):
+
+        self.spaces = spaces
+        self.controls = controls
+        self.ligatures = ligatures
+        self.nfkc = nfkc
+
+        self._table = self._build_table()
+
+    def __repr__(self):
+
+        return 'Normalizer<spaces=%s, controls=%s, ligatures=%s, nfkc=%s>' % \
+               (self.spaces, self.controls, self.ligatures, self.nfkc)
+
+    def normalize(self, text):
+        """Normalize a unicode string."""
+
+        text = text.translate(self._table)
+        if self.nfkc:
+            text = unicodedata.normalize('NFKC', text)
+
+        return text
+
+    def normalize_texts(self, texts):
+        """Normalize a list of unicode strings at once.
+
+        Args:
+            texts: A list of unicode strings, e.g. the lines of a raw
+                content stream.
+
+        Returns:
+            A list of unicode strings in the same order.
+
+        """
+
+        if len(texts) == 0:
+            return []
+
+        blob = u'\n'.join(texts)
+        if blob.count(u'\n') != len(texts) - 1:
+            return map(self.normalize, texts)
+
+        return self.normalize(blob).split(u'\n')
+
+    def run(self, page):
+        """Normalize the texts of the words of a page.
+
+        Words whose text ends up empty are dropped, along with their
+        entries of the page layout.
+
+        Args:
+            page: A PDFPage instance.
+
+        Returns:
+            A PDFPage instance.
+
+        """
+
+        texts = self.normalize_texts(map(lambda w: w.t, page.words))
+        kept = filter(lambda ix: texts[ix], xrange(len(texts)))
+        words = map(lambda ix: PDFText(page.words[ix].x, page.words[ix].y,
+                                       page.words[ix].w, page.words[ix].h,
+                                       texts[ix], page.words[ix].font),
+                    kept)
+
+        layout = None
+        if page.layout is not None:
+            layout = map(page.layout.__getitem__, kept)
+
+        return PDFPage(page_num=page.page_num, width=page.width,
+                       height=page.height, words=words, fonts=page.fonts,
+                       tier=page.tier, layout=layout)
+
+    def _build_table(self):
+
+        table = {}
+
+        if self.controls:
+            table = dict.fromkeys(_CONTROLS)
+            table[0x09] = u' '
+            del table[0x0A]
+
+        if self.spaces:
+            for codepoint in _SPACES:
+                table[codepoint] = u' '
+
+        if self.ligatures:
+            for codepoint in _LIGATURES:
+                table[codepoint] = unicodedata.normalize('NFKC',
+                                                         unichr(codepoint))
+
+        return table
+
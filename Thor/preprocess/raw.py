@@ -2,12 +2,15 @@
 
 # standard library imports
 from itertools import combinations, permutations
+import logging
 
 # third party related imports
 
 # local library imports
+from Thor.pdf.fonts import dominant_font
 from Thor.pdf.page import PDFPage
 from Thor.pdf.text import PDFText
+from Thor.preprocess.tier import default_cost_model, get_tier
 from Thor.utils.Point import Point
 from Thor.utils.Rectangle import Rectangle
 
@@ -18,28 +21,61 @@ __all__ = ['RawTextPreprocessor', 'RawTextPreprocessorException']
 class RawTextPreprocessorException(Exception): pass
 
 
+_logger = logging.getLogger(__name__)
+
+
 class RawTextPreprocessor(object):
     """Preprocessor which helps to reconstruct words to line segment.
 
     The preprocessor extracts raw content stream from pdf and
     reconstructs words to line segment by taking advantage of raw
-    content stream.
+    content stream. When many pages are preprocessed, the raw texts can
+    be extracted at once by PDFPage.extract_raw_texts_of_pages() and
+    handed to every preprocessor. If a PDFDocument is given instead of
+    a filename, the raw texts it already holds are reused.
+
+    The search for outlier words is bounded by a Tier. Unless a tier is
+    given, the cost model picks one from the number of words and the
+    matches of every raw stream.
+
+    If a Normalizer is given, the texts of the words and raw streams are
+    normalized before words are looked up in the streams.
 
     Attributes:
         page: A PDFPage instance.
         raw_streams: A list of Stream instance.
         words: A list of Word instance.
+        tier: The Tier instance the page is preprocessed in.
 
     """
 
-    def __init__(self, pdf_filename, page):
+    def __init__(self, pdf_filename, page, raw_texts=None, tier=None,
+                 cost_model=None, normalizer=None):
+
+        # a page without words has nothing to merge
+        if raw_texts is None and len(page.words) == 0:
+            raw_texts = []
+        elif raw_texts is None:
+            raw_texts = page.extract_raw_texts(pdf_filename, page.page_num)
+
+        if normalizer is not None:
+            page = normalizer.run(page)
+            raw_texts = normalizer.normalize_texts(raw_texts)
 
         self.page = page
         self.words = map(Word.create_from_pdftext, page.words)
-        self.raw_streams = map(Stream, page.extract_raw_texts(pdf_filename,
-                                                              page.page_num))
+        # outliers are only memoized within a run, so pages can be
+        # preprocessed by many threads at once
+        discard_cache = {}
+        self.raw_streams = map(lambda s: Stream(s, discard_cache), raw_texts)
         self._associate_word_with_stream()
 
+        if tier is None:
+            tier = (cost_model or default_cost_model).choose(
+                len(self.words), map(lambda s: len(s.matches), self.raw_streams)
+            )
+        self.tier = get_tier(tier)
+
     def _associate_word_with_stream(self):
 
         for word_ix, word in enumerate(self.words):
@@ -83,6 +119,8 @@ class RawTextPreprocessor(object):
             'x': union.x, 'y': union.y,
             'w': union.w, 'h': union.h,
             't': raw_stream._stream,
+            'font': dominant_font(map(lambda ix: self.words[ix]._word_obj,
+                                      word_indices)),
         }
 
     def run(self):
@@ -99,7 +137,9 @@ class RawTextPreprocessor(object):
         ret = PDFPage(page_num=self.page.page_num,
                       width=self.page.width,
                       height=self.page.height,
-                      words=[])
+                      words=[],
+                      fonts=self.page.fonts,
+                      tier=self.tier.name)
 
         can_merge_streams = set()
         keep_merging = True
@@ -115,7 +155,10 @@ class RawTextPreprocessor(object):
                 if stream_ix not in can_merge_streams:
                     if not stream.may_merge():
                         num_matches = len(stream.matches)
-                        stream.discard_outliers()
+                        stream.discard_outliers(
+                            self.tier.max_outlier_matches,
+                            self.tier.max_combinations
+                        )
 
                     if stream.may_merge():
                         can_merge_streams.add(stream_ix)
@@ -176,16 +219,17 @@ class Stream(object):
 
     Attributes:
         matches: A list of Match instances.
+        discard_cache: A dict memoizing discard_outliers(), which may be
+            shared by the streams of a page.
 
     """
 
-    discard_cache = {}
-
-    def __init__(self, stream):
+    def __init__(self, stream, discard_cache=None):
 
         self._stream = stream
         self._may_merge = False
         self.matches = []
+        self.discard_cache = {} if discard_cache is None else discard_cache
 
     def find_word(self, word):
         """Locate all the substrings composed of word.
@@ -203,7 +247,7 @@ class Stream(object):
 
         while start_pos < stream_size:
             if word['t'] is None:
-                print word.__dict__
+                _logger.warning('Word without text: %s', word)
             ix = self._stream.find(word['t'], start_pos)
             if ix == -1:
                 break
@@ -253,25 +297,31 @@ class Stream(object):
 
         return ret
 
-    def discard_outliers(self):
+    def discard_outliers(self, max_matches=30, max_combinations=None):
         """Try to discard words that would not fit to a horizontal line.
 
+        Args:
+            max_matches: Streams with more matches are not searched.
+            max_combinations: The maximum number of word combinations
+                to try, or None for no limit.
+
         Returns:
             A bool.
 
         """
 
-        cache_key = '[%s][%s]' % \
+        cache_key = '[%s][%s][%s,%s]' % \
                     (self._stream,
-                     ','.join(map(lambda m: str(m.index), self.matches)))
-        if cache_key in Stream.discard_cache:
-            return Stream.discard_cache[cache_key]
+                     ','.join(map(lambda m: str(m.index), self.matches)),
+                     max_matches, max_combinations)
+        if cache_key in self.discard_cache:
+            return self.discard_cache[cache_key]
 
         num_matches = len(self.matches)
 
         # too many matches will spend a lot of computing time
-        if num_matches < 3 or num_matches > 30:
-            Stream.discard_cache[cache_key] = False
+        if num_matches < 3 or num_matches > max_matches:
+            self.discard_cache[cache_key] = False
             return False
 
         centroids = map(
@@ -283,7 +333,8 @@ class Stream(object):
         best_cost = float('inf')
         best_matches = None
 
-        for match_indices in self._enumerate_word_combinations():
+        for match_indices in self._enumerate_word_combinations(
+                max_combinations):
             if len(match_indices) <= 1:
                 continue
 
@@ -307,20 +358,24 @@ class Stream(object):
                 best_matches = match_indices
 
         if best_matches is None:
-            Stream.discard_cache[cache_key] = False
+            self.discard_cache[cache_key] = False
             return False
 
         self.matches = map(lambda i: self.matches[i], best_matches)
-        Stream.discard_cache[cache_key] = True
+        self.discard_cache[cache_key] = True
 
         return True
 
-    def _enumerate_word_combinations(self):
+    def _enumerate_word_combinations(self, max_combinations=None):
 
         ret = []
         self._target_mask = map(lambda ch: 0 if ch == ' ' else 1, self._stream)
+        self._max_combinations = max_combinations
 
         for match_ix in xrange(len(self.matches)):
+            if self._is_enumeration_exhausted(ret):
+                break
+
             mask = [0] * len(self._target_mask)
             match = self.matches[match_ix]
             for i in xrange(match.start, match.end):
@@ -339,6 +394,9 @@ class Stream(object):
             return
 
         for match_ix in xrange(next_match_ix, len(self.matches)):
+            if self._is_enumeration_exhausted(result):
+                return
+
             maybe_match = self.matches[match_ix]
             mask = curr_mask[:]
             maybe = True
@@ -356,6 +414,11 @@ class Stream(object):
                     mask, match_ix + 1, result
                 )
 
+    def _is_enumeration_exhausted(self, result):
+
+        return self._max_combinations is not None and \
+               len(result) >= self._max_combinations
+
     def _has_duplicate_word(self, match_indices):
 
         word_indices = map(lambda i: self.matches[i].index, match_indices)
@@ -155,3 +155,13 @@ with given.a_FontSpecPreprocessor:
         the(page.words[0].font).should.equal(FontSpec(38, "221714"))
         the(page.words[1].font).should.equal(FontSpec(27, "221714"))
         the(page.words[2].font).should.equal(FontSpec(8, "221714"))
+
+with given.a_page_without_words:
+
+    preprocessor = FontSpecPreprocessor(
+        'not-converted.pdf', PDFPage(page_num=2, width=100, height=100)
+    )
+
+    with then.the_page_should_not_be_converted:
+        the(preprocessor.font_specs).should.equal([])
+        the(len(preprocessor.run().words)).should.equal(0)
@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+
+# standard library imports
+
+# third party related imports
+from pyspecs import and_, given, the, then, when
+
+# local library imports
+from Thor.pdf.page import PDFPage
+from Thor.pdf.text import PDFText
+from Thor.preprocess.layout import LayoutPreprocessor
+from Thor.preprocess.naive import NaivePreprocessor
+from Thor.utils.FontSpec import FontSpec
+
+
+with given.a_page_extracted_with_layout:
+
+    body, title = FontSpec(10, '000000'), FontSpec(24, 'FF0000')
+    words = [
+        PDFText(10., 20., 30., 10., u'Thor', title),
+        PDFText(50., 30., 40., 10., u'Odin', body),
+        PDFText(42., 20., 18., 12., u'and', body),
+        PDFText(10., 60., 25., 10., u'Loki', body),
+        PDFText(90., 90., 5., 5., u'9', None),
+    ]
+    page = PDFPage(page_num=2, width=100., height=100., words=words,
+                   fonts=[body, title], tier='standard',
+                   layout=[(0, 0), (1, 2), (0, 0), (1, 2), None])
+
+    with when.it_is_preprocessed:
+        result = LayoutPreprocessor('test.pdf', page).run()
+
+        with then.words_of_a_line_should_be_merged:
+            the(map(lambda w: w.t, result.words)).\
+                should.equal([u'Thor and', u'Odin Loki', u'9'])
+
+        with and_.merged_words_should_cover_their_words:
+            first = result.words[0]
+            the((first.x, first.y, first.w, first.h)).\
+                should.equal((10., 20., 50., 12.))
+
+        with and_.the_dominant_font_should_be_kept:
+            the(result.words[0].font).should.equal(title)
+            the(result.words[1].font).should.equal(body)
+
+        with and_.the_layout_should_follow_the_words:
+            the(result.layout).should.equal([(0, 0), (1, 2), None])
+            the(result.tier).should.equal('standard')
+
+    with when.a_page_has_no_layout:
+        plain = PDFPage(page_num=2, width=100., height=100., words=words)
+        result = LayoutPreprocessor('test.pdf', plain).run()
+
+        with then.its_words_should_be_kept:
+            the(result.words).should.equal(words)
+            the(result.layout).should.be(None)
+
+    with when.words_in_no_line_are_handed_on:
+        rested = []
+
+        def naive(p):
+            rested.append(map(lambda w: w.t, p.words))
+            return NaivePreprocessor('test.pdf', p).run()
+
+        touching = [
+            PDFText(10., 20., 20., 10., u'Thor', body),
+            PDFText(30.1, 20., 20., 10., u'and', body),
+            PDFText(50.2, 20., 10., 10., u'Lo', body),
+            PDFText(60.3, 20., 10., 10., u'ki', body),
+        ]
+        result = LayoutPreprocessor('test.pdf', PDFPage(
+            page_num=2, width=100., height=100., words=touching,
+            fonts=[body], layout=[(0, 0), (0, 0), None, None]
+        ), ungrouped=naive).run()
+
+        with then.only_those_words_should_be_preprocessed:
+            the(rested).should.equal([[u'Lo', u'ki']])
+
+        with and_.lines_should_not_be_merged_again:
+            the(map(lambda w: w.t, result.words)).\
+                should.equal([u'Thor and', u'Loki'])
+            the(result.layout).should.equal([(0, 0), None])
@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# standard library imports
+
+# third party related imports
+from pyspecs import given, the, then, when
+
+# local library imports
+from Thor.pdf.page import PDFPage
+from Thor.pdf.text import PDFText
+from Thor.preprocess.normalize import Normalizer
+from Thor.preprocess.raw import RawTextPreprocessor
+
+
+with given.a_default_Normalizer:
+
+    normalizer = Normalizer()
+
+    with when.texts_are_normalized:
+        texts = normalizer.normalize_texts(
+            [u'a\u3000b', u'soft\u00adhyphen\u200b', u'tab\tbed',
+             u'\ufb01ne']
+        )
+
+        with then.spaces_and_control_characters_should_be_normalized:
+            the(texts).should.equal([u'a b', u'softhyphen', u'tab bed',
+                                     u'\ufb01ne'])
+
+    with when.texts_hold_newlines:
+        texts = normalizer.normalize_texts([u'a\nb', u'c '])
+
+        with then.they_should_be_normalized_one_by_one:
+            the(texts).should.equal([u'a\nb', u'c '])
+
+
+with given.a_Normalizer_expanding_ligatures:
+
+    with when.texts_are_normalized:
+        texts = Normalizer(ligatures=True).normalize_texts(
+            [u'\ufb01ne', u'e\ufb00ect', u'\uff21']
+        )
+
+        with then.ligatures_should_be_expanded:
+            the(texts).should.equal([u'fine', u'effect', u'\uff21'])
+
+    with when.NFKC_is_asked_for_as_well:
+        texts = Normalizer(ligatures=True, nfkc=True).normalize_texts(
+            [u'\uff21\u2460', u'\ufb01']
+        )
+
+        with then.compatibility_forms_should_be_folded:
+            the(texts).should.equal([u'A1', u'fi'])
+
+
+with given.a_page_with_ligatures:
+
+    words = [
+        PDFText(0., 0., 10., 10., u'\ufb01rst'),
+        PDFText(12., 0., 10., 10., u'o\ufb00er'),
+        PDFText(30., 0., 10., 10., u'\u200b'),
+    ]
+    page = PDFPage(page_num=1, width=100., height=100., words=words)
+    raw_texts = [u'first offer']
+
+    with when.it_is_normalized:
+        normalized = Normalizer(ligatures=True).run(page)
+
+        with then.words_should_keep_their_boxes:
+            the(map(lambda w: w.t, normalized.words)).\
+                should.equal([u'first', u'offer'])
+            the(normalized.words[1].x).should.equal(12.)
+
+    with when.it_is_normalized_with_a_layout:
+        laid_out = PDFPage(page_num=1, width=100., height=100., words=words,
+                           layout=[(0, 0), (0, 0), (0, 1)])
+        normalized = Normalizer(ligatures=True).run(laid_out)
+
+        with then.the_layout_of_kept_words_should_be_kept:
+            the(normalized.layout).should.equal([(0, 0), (0, 0)])
+
+    with when.it_is_preprocessed_with_raw_streams:
+        plain = RawTextPreprocessor('test.pdf', page, raw_texts).run()
+        merged = RawTextPreprocessor(
+            'test.pdf', page, raw_texts,
+            normalizer=Normalizer(ligatures=True)
+        ).run()
+
+        with then.words_should_only_match_once_normalized:
+            the(len(plain.words)).should.equal(3)
+            the(map(lambda w: w.t, merged.words)).\
+                should.equal([u'first offer'])
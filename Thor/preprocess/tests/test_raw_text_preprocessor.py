@@ -3,6 +3,7 @@
 
 # standard library imports
 from contextlib import closing
+from multiprocessing.pool import ThreadPool
 import os.path
 
 # third party related imports
@@ -266,3 +267,67 @@ with given.a_RawTextPreprocessor:
 
                 the(match).should.be(True)
 
+
+with given.raw_texts_extracted_beforehand:
+
+    with closing(open(sample_raw)) as f:
+        raw_texts = f.read().decode('utf8').splitlines()
+
+    with closing(open(sample_json)) as f:
+        preprocessor = RawTextPreprocessor(
+            sample_pdf,
+            PDFPage.loads(f.read().decode('utf8')),
+            raw_texts
+        )
+
+    with then.it_should_use_them_as_raw_streams:
+        the(map(lambda s: s._stream, preprocessor.raw_streams))\
+            .should.equal(raw_texts)
+
+    with and_.it_should_merge_words_just_the_same:
+        the(len(preprocessor.run().words)).should.equal(22)
+
+with given.a_page_without_words:
+
+    preprocessor = RawTextPreprocessor(
+        'not-extracted.pdf', PDFPage(page_num=2, width=100, height=100)
+    )
+
+    with then.raw_texts_should_not_be_extracted:
+        the(preprocessor.raw_streams).should.equal([])
+
+    with and_.an_empty_page_should_come_out:
+        the(len(preprocessor.run().words)).should.equal(0)
+
+with given.pages_preprocessed_by_many_threads:
+
+    with closing(open(sample_raw)) as f:
+        raw_texts = f.read().decode('utf8').splitlines()
+
+    with closing(open(sample_json)) as f:
+        serialized = f.read().decode('utf8')
+
+    def preprocess(_):
+        page = PDFPage.loads(serialized)
+        return PDFPage.dumps(
+            RawTextPreprocessor(sample_pdf, page, raw_texts).run()
+        )
+
+    expected = preprocess(None)
+    pool = ThreadPool(4)
+    results = pool.map(preprocess, xrange(16))
+    pool.close()
+    pool.join()
+
+    with then.every_page_should_come_out_as_if_preprocessed_alone:
+        the(set(results)).should.equal(set([expected]))
+
+    with and_.outliers_should_not_be_memoized_across_pages:
+        first = RawTextPreprocessor(sample_pdf, PDFPage.loads(serialized),
+                                    raw_texts)
+        second = RawTextPreprocessor(sample_pdf, PDFPage.loads(serialized),
+                                     raw_texts)
+        the(first.raw_streams[0].discard_cache).\
+            should.be(first.raw_streams[1].discard_cache)
+        the(first.raw_streams[0].discard_cache is
+            second.raw_streams[0].discard_cache).should.be(False)
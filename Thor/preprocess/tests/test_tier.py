@@ -0,0 +1,146 @@
+#!/usr/bin/env python
+
+# standard library imports
+
+# third party related imports
+from pyspecs import and_, given, the, then, when
+
+# local library imports
+from Thor.pdf.page import PDFPage
+from Thor.pdf.text import PDFText
+from Thor.preprocess.naive import NaivePreprocessor
+from Thor.preprocess.raw import Match, Stream
+from Thor.preprocess.tier import (CostModel, EXHAUSTIVE, PREVIEW, STANDARD,
+                                  TierException, get_tier)
+
+
+with given.a_cost_model:
+
+    cost_model = CostModel(budget=10 ** 5)
+
+    with when.a_page_is_small:
+        tier = cost_model.choose(50, [3, 4, 5])
+
+        with then.the_exhaustive_tier_should_be_chosen:
+            the(tier).should.be(EXHAUSTIVE)
+
+    with when.a_stream_has_many_matches:
+        tier = cost_model.choose(50, [3, 28])
+
+        with then.a_tier_bounding_the_outlier_search_should_be_chosen:
+            the(tier).should.be(STANDARD)
+
+    with when.a_page_has_too_many_words:
+        tier = cost_model.choose(1000)
+
+        with then.the_preview_tier_should_be_chosen:
+            the(tier).should.be(PREVIEW)
+
+        with and_.costs_should_drop_from_tier_to_tier:
+            costs = map(lambda t: cost_model.estimate(t, 1000, [28]),
+                        (EXHAUSTIVE, STANDARD, PREVIEW))
+            the(costs).should.equal(sorted(costs, reverse=True))
+
+    with when.a_tier_is_looked_up:
+
+        with then.it_should_be_found_by_name_or_by_itself:
+            the(get_tier('standard')).should.be(STANDARD)
+            the(get_tier(PREVIEW)).should.be(PREVIEW)
+
+        with and_.an_unknown_name_should_be_rejected:
+            try:
+                get_tier('quick')
+            except TierException:
+                rejected = True
+            else:
+                rejected = False
+            the(rejected).should.be(True)
+
+
+with given.a_stream_with_an_outlier:
+
+    def create_stream():
+
+        words = [
+            {'x': 0., 'y': 0., 'w': 10., 'h': 10., 't': u'ab'},
+            {'x': 20., 'y': 0., 'w': 10., 'h': 10., 't': u'cd'},
+            {'x': 40., 'y': 0., 'w': 10., 'h': 10., 't': u'ef'},
+            {'x': 20., 'y': 300., 'w': 10., 'h': 10., 't': u'cd'},
+        ]
+        stream = Stream(u'ab cd ef')
+        stream.matches = [Match(0, words[0], 0, 2), Match(1, words[1], 3, 5),
+                          Match(2, words[2], 6, 8), Match(3, words[3], 3, 5)]
+        return stream
+
+    with when.its_outliers_are_searched_without_limits:
+        stream = create_stream()
+        discarded = stream.discard_outliers()
+
+        with then.the_outlier_should_be_discarded:
+            the(discarded).should.be(True)
+            the(map(lambda m: m.index, stream.matches)).should.equal([0, 1, 2])
+
+    with when.it_has_more_matches_than_allowed:
+        stream = create_stream()
+        discarded = stream.discard_outliers(max_matches=3)
+
+        with then.the_search_should_be_skipped:
+            the(discarded).should.be(False)
+            the(len(stream.matches)).should.equal(4)
+
+    with when.its_combinations_are_capped:
+        stream = create_stream()
+        combinations = stream._enumerate_word_combinations(1)
+
+        with then.the_enumeration_should_stop_early:
+            the(combinations).should.equal([[0, 1, 2]])
+
+
+with given.a_NaivePreprocessor:
+
+    words = map(lambda i: {'x': 10. * i, 'y': 0., 'w': 9., 'h': 10.,
+                           't': unicode(i)},
+                xrange(5))
+
+    with when.it_is_pinned_to_a_tier:
+        page = PDFPage(page_num=1, width=1000, height=1000,
+                       words=map(PDFText.create_from_dict, words))
+        result = NaivePreprocessor('test.pdf', page, tier='preview').run()
+
+        with then.the_tier_should_be_recorded_on_the_result:
+            the(result.tier).should.equal('preview')
+            loaded = PDFPage.loads(PDFPage.dumps(result))
+            the(loaded.tier).should.equal('preview')
+
+    with when.the_page_is_already_preprocessed_in_a_tier:
+        page = PDFPage(page_num=1, width=1000, height=1000,
+                       words=map(PDFText.create_from_dict, words),
+                       tier='standard')
+        result = NaivePreprocessor('test.pdf', page).run()
+
+        with then.its_own_cost_model_should_choose_the_tier:
+            the(result.tier).should.equal('exhaustive')
+
+    with when.no_tier_is_given:
+        page = PDFPage(page_num=1, width=1000, height=1000,
+                       words=map(PDFText.create_from_dict, words))
+        result = NaivePreprocessor('test.pdf', page).run()
+
+        with then.the_cost_model_should_choose_one:
+            the(result.tier).should.equal('exhaustive')
+            the(len(result.words)).should.be_less_than(len(words))
+
+    with when.the_page_has_more_than_1000_words:
+        many_words = map(lambda i: PDFText(10. * (i % 100), 20. * (i / 100),
+                                           9., 10., u'w'),
+                         xrange(1001))
+        page = PDFPage(page_num=1, width=1000, height=1000, words=many_words)
+        many = NaivePreprocessor('test.pdf', page)
+        pinned = NaivePreprocessor('test.pdf', page, tier='exhaustive')
+
+        with then.merging_should_be_limited_to_a_few_rounds:
+            the(many.tier.name).should.equal('standard')
+            the(many.tier.max_naive_rounds).should.equal(4)
+
+        with and_.a_pinned_tier_should_still_win:
+            the(pinned.tier.name).should.equal('exhaustive')
@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+
+# standard library imports
+
+# third party related imports
+
+# local library imports
+
+
+__all__ = ['CostModel', 'EXHAUSTIVE', 'PREVIEW', 'STANDARD', 'TIERS',
+           'Tier', 'TierException', 'get_tier']
+
+
+class TierException(Exception): pass
+
+
+class Tier(object):
+    """Limits of the superlinear steps of the preprocessors.
+
+    Attributes:
+        name: The name recorded on preprocessed pages.
+        max_outlier_matches: Streams with more matching words are not
+            searched for outliers by Stream.discard_outliers(). 0 skips
+            the search.
+        max_combinations: The maximum number of word combinations tried
+            per stream, or None for no limit.
+        max_naive_rounds: The maximum number of merging rounds of
+            NaivePreprocessor, or None to merge until nothing changes.
+
+    """
+
+    def __init__(self, name, max_outlier_matches, max_combinations,
+                 max_naive_rounds):
+
+        self.name = name
+        self.max_outlier_matches = max_outlier_matches
+        self.max_combinations = max_combinations
+        self.max_naive_rounds = max_naive_rounds
+
+    def __repr__(self):
+
+        return 'Tier<name=%s>' % self.name
+
+
+PREVIEW = Tier('preview', max_outlier_matches=0, max_combinations=0,
+               max_naive_rounds=1)
+STANDARD = Tier('standard', max_outlier_matches=16, max_combinations=1000,
+                max_naive_rounds=4)
+EXHAUSTIVE = Tier('exhaustive', max_outlier_matches=30,
+                  max_combinations=None, max_naive_rounds=None)
+
+# from the most thorough to the cheapest
+TIERS = (EXHAUSTIVE, STANDARD, PREVIEW)
+
+
+def get_tier(tier):
+    """Get a Tier by itself or by its name."""
+
+    if isinstance(tier, Tier):
+        return tier
+
+    for t in TIERS:
+        if t.name == tier:
+            return t
+
+    raise TierException('Unknown tier: %s' % tier)
+
+
+class CostModel(object):
+    """Pick the most thorough tier whose estimated cost fits a budget.
+
+    The cost is counted in elementary comparisons:
+
+    - associating words with raw streams: words * streams
+    - merging words naively: words ** 2 per round
+    - discarding outliers of a stream: 2 ** matches combinations
+
+    Attributes:
+        budget: The maximum estimated cost of a page.
+        fixpoint_rounds: The rounds assumed for merging until nothing
+            changes.
+
+    """
+
+    def __init__(self, budget=10 ** 7, fixpoint_rounds=10):
+
+        self.budget = budget
+        self.fixpoint_rounds = fixpoint_rounds
+
+    def estimate(self, tier, num_words, match_counts=()):
+        """Estimate the cost of preprocessing a page in a tier.
+
+        Args:
+            tier: A Tier instance.
+            num_words: The number of words of the page.
+            match_counts: A list of the number of matching words of every
+                raw stream.
+
+        Returns:
+            A number.
+
+        """
+
+        rounds = tier.max_naive_rounds or self.fixpoint_rounds
+        cost = num_words * len(match_counts) + num_words ** 2 * rounds
+
+        for num_matches in match_counts:
+            if 3 <= num_matches <= tier.max_outlier_matches:
+                combinations = 2 ** num_matches
+                if tier.max_combinations is not None:
+                    combinations = min(combinations, tier.max_combinations)
+                cost += combinations
+
+        return cost
+
+    def choose(self, num_words, match_counts=()):
+        """Get the most thorough Tier affordable for a page."""
+
+        for tier in TIERS[:-1]:
+            if self.estimate(tier, num_words, match_counts) <= self.budget:
+                return tier
+
+        return TIERS[-1]
+
+
+default_cost_model = CostModel()
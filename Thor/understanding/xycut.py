@@ -2,6 +2,7 @@
 
 # standard library imports
 from collections import Counter
+import logging
 
 # third party related imports
 import ujson
@@ -12,7 +13,17 @@ from Thor.understanding.docspace import DocumentSpace, DocumentSpaceException
 from Thor.utils.Rectangle import TextRectangle
 
 
+_logger = logging.getLogger(__name__)
+
+
 class XYCut(object):
+    """Cut a page recursively into blocks of words.
+
+    How the page is cut is logged at the DEBUG level of this module's
+    logger instead of being printed, so pages can be cut by many threads
+    at once.
+
+    """
 
     def run(self, page):
 
@@ -33,10 +44,10 @@ class XYCut(object):
             return
 
         if space.reading_direction == DocumentSpace.LEFT_TO_RIGHT:
-            print prefix, 'may be read from left to right'
+            _logger.debug('%s may be read from left to right', prefix)
             self._cut_left_to_right_doc(space, prefix)
         else:
-            print prefix, 'may be read from top to bottom'
+            _logger.debug('%s may be read from top to bottom', prefix)
             self._cut_top_to_bottom_doc(space, prefix)
 
     def _cut_left_to_right_doc(self, space, prefix):
@@ -44,20 +55,21 @@ class XYCut(object):
         vertical_cut = space.get_widest_vertical_cut(scale=0.9)
 
         if vertical_cut is None:
-            print prefix, 'no vertical cut available'
+            _logger.debug('%s no vertical cut available', prefix)
             min_size = 2. * space.word_stat.median_height
             horizontal_cut = space.get_widest_horizontal_cut(min_size)
 
             if horizontal_cut is None:
-                print prefix, 'no horizontal cut > %s' % min_size
+                _logger.debug('%s no horizontal cut > %s', prefix, min_size)
                 clusters = space.segment_words_horizontally()
                 if len(clusters) == 1:
-                    print prefix, 'there is only on ecluster, stop'
+                    _logger.debug('%s there is only on ecluster, stop', prefix)
                     return
 
                 termination = any(map(lambda c: len(c) == 1, clusters))
                 if termination:
-                    print prefix, 'every cluster has only one word, stop'
+                    _logger.debug('%s every cluster has only one word, stop',
+                                  prefix)
                     return
 
                 subspaces = [clusters[0][:]]
@@ -71,14 +83,11 @@ class XYCut(object):
                         subspaces.append(curr[:])
 
                 if len(subspaces) == 1:
-                    print prefix, 'cannot divide itself, stop'
+                    _logger.debug('%s cannot divide itself, stop', prefix)
                     return
 
                 space.subspaces = map(DocumentSpace, subspaces)
-                for ix, subspace in enumerate(space.subspaces):
-                    p = prefix + '[%s]' % ix
-                    print '%s ************************************' % p
-                    print ujson.dumps(map(lambda w: w.t, subspace.words), ensure_ascii=False)
+                self._log_subspaces(space, prefix)
 
                 for ix, subspace in enumerate(space.subspaces):
                     p = prefix + '[%s]' % ix
@@ -88,10 +97,7 @@ class XYCut(object):
 
             else:
                 space.cut_horizontally(horizontal_cut.y)
-                for ix, subspace in enumerate(space.subspaces):
-                    p = prefix + '[%s]' % ix
-                    print '%s ************************************' % p
-                    print ujson.dumps(map(lambda w: w.t, subspace.words), ensure_ascii=False)
+                self._log_subspaces(space, prefix)
 
                 for ix, subspace in enumerate(space.subspaces):
                     p = prefix + '[%s]' % ix
@@ -101,12 +107,9 @@ class XYCut(object):
 
 
         else:
-            print 'cut vertically'
+            _logger.debug('%s cut vertically', prefix)
             space.cut_vertically(vertical_cut.x)
-            for ix, subspace in enumerate(space.subspaces):
-                p = prefix + '[%s]' % ix
-                print '%s ************************************' % p
-                print ujson.dumps(map(lambda w: w.t, subspace.words), ensure_ascii=False)
+            self._log_subspaces(space, prefix)
 
             for ix, subspace in enumerate(space.subspaces):
                 p = prefix + '[%s]' % ix
@@ -118,17 +121,18 @@ class XYCut(object):
         horizontal_cut = space.get_widest_horizontal_cut(scale=0.9)
 
         if horizontal_cut is None:
-            print prefix, 'no horizontal cut available'
+            _logger.debug('%s no horizontal cut available', prefix)
             min_size = 2. * space.word_stat.median_width
             vertical_cut = space.get_widest_vertical_cut(min_size)
 
             if vertical_cut is None:
-                print prefix, 'no vertical cut > %s' % min_size
+                _logger.debug('%s no vertical cut > %s', prefix, min_size)
                 clusters = space.segment_words_vertically()
 
                 termination = any(map(lambda c: len(c) == 1, clusters))
                 if termination:
-                    print prefix, 'every cluster has only one word, stop'
+                    _logger.debug('%s every cluster has only one word, stop',
+                                  prefix)
                     return
 
                 subspaces = [clusters[0][:]]
@@ -142,14 +146,11 @@ class XYCut(object):
                         subspaces.append(curr[:])
 
                 if len(subspaces) == 1:
-                    print prefix, 'cannot divide itself, stop'
+                    _logger.debug('%s cannot divide itself, stop', prefix)
                     return
 
                 space.subspaces = map(DocumentSpace, subspaces)
-                for ix, subspace in enumerate(space.subspaces):
-                    p = prefix + '[%s]' % ix
-                    print '%s ************************************' % p
-                    print ujson.dumps(map(lambda w: w.t, subspace.words), ensure_ascii=False)
+                self._log_subspaces(space, prefix)
 
                 for ix, subspace in enumerate(space.subspaces):
                     p = prefix + '[%s]' % ix
@@ -159,10 +160,7 @@ class XYCut(object):
 
             else:
                 space.cut_vertically(vertical_cut.x, left_first=False)
-                for ix, subspace in enumerate(space.subspaces):
-                    p = prefix + '[%s]' % ix
-                    print '%s ************************************' % p
-                    print ujson.dumps(map(lambda w: w.t, subspace.words), ensure_ascii=False)
+                self._log_subspaces(space, prefix)
 
                 for ix, subspace in enumerate(space.subspaces):
                     p = prefix + '[%s]' % ix
@@ -171,13 +169,20 @@ class XYCut(object):
 
         else:
             space.cut_horizontally(horizontal_cut.y)
-            for ix, subspace in enumerate(space.subspaces):
-                    p = prefix + '[%s]' % ix
-                    print '%s ************************************' % p
-                    print ujson.dumps(map(lambda w: w.t, subspace.words), ensure_ascii=False)
+            self._log_subspaces(space, prefix)
 
             for ix, subspace in enumerate(space.subspaces):
                 p = prefix + '[%s]' % ix
                 self.cut(subspace, p)
             #map(self.cut, space.subspaces)
 
+    def _log_subspaces(self, space, prefix):
+
+        if not _logger.isEnabledFor(logging.DEBUG):
+            return
+
+        for ix, subspace in enumerate(space.subspaces):
+            _logger.debug('%s[%s] ************************************',
+                          prefix, ix)
+            _logger.debug('%s', ujson.dumps(map(lambda w: w.t, subspace.words),
+                                            ensure_ascii=False))
@@ -1,8 +1,9 @@
 #!/usr/bin/env python
 
 # standard library imports
+from array import array
 from contextlib import closing
-from HTMLParser import HTMLParser
+import htmlentitydefs
 import json
 import re
 import sys
@@ -13,7 +14,182 @@ import unicodedata
 # local libary imports
 
 
-__all__ = ['PDFXMLParser', 'PageError', 'WordError']
+__all__ = ['CONTROL_CODEPOINTS', 'PDFXMLParser', 'PageError', 'WordColumns',
+           'WordError', 'iter_pages', 'scan_words', 'unescape']
+
+
+# HTMLParser supports apos, which is not part of HTML 4
+_ENTITIES = dict((name, unichr(codepoint)) for name, codepoint
+                 in htmlentitydefs.name2codepoint.iteritems())
+_ENTITIES['apos'] = u"'"
+
+_RE_ENTITY = re.compile(r'&(#?[xX]?(?:[0-9a-fA-F]+|\w{1,8}));')
+
+def unescape(text):
+    """Replace character references, same as HTMLParser.unescape().
+
+    Unlike HTMLParser, it keeps no state, so it is safe to call from
+    many threads at once.
+
+    """
+
+    if '&' not in text:
+        return text
+
+    return _RE_ENTITY.sub(_replace_entity, text)
+
+def _replace_entity(match_obj):
+
+    ref = match_obj.group(1)
+    if ref[0] == '#':
+        ref = ref[1:]
+        try:
+            if ref[0] in 'xX':
+                return unichr(int(ref[1:], 16))
+            return unichr(int(ref))
+        except ValueError:
+            return '&#' + ref + ';'
+
+    return _ENTITIES.get(ref, '&' + ref + ';')
+
+# a word, or anything else that is not whitespace
+_RE_WORD = re.compile(r'\s*(?:<word xMin="([^"]*)" yMin="([^"]*)" '
+                      r'xMax="([^"]*)" yMax="([^"]*)">(.*?)</word>|(\S))',
+                      re.S)
+
+# the categories of the control, format, surrogate, private use and
+# unassigned characters of the BMP, by codepoint
+CONTROL_CODEPOINTS = dict(
+    (codepoint, category) for codepoint, category
+    in ((c, unicodedata.category(unichr(c))) for c in xrange(0x10000))
+    if category[0] == 'C'
+)
+
+def _compile_control_pattern(codepoints):
+
+    ranges, start, end = [], None, None
+    for codepoint in sorted(codepoints) + [None]:
+        if start is not None and codepoint == end + 1:
+            end = codepoint
+            continue
+
+        if start is not None:
+            ranges.append(u'%s-%s' % (unichr(start), unichr(end)))
+        start = end = codepoint
+
+    return re.compile(u'[%s]' % u''.join(ranges))
+
+# compiled up front since compiling imports modules, which deadlocks
+# threads started while importing
+_RE_CONTROL = _compile_control_pattern(CONTROL_CODEPOINTS)
+_RE_CONTROL_BUT_NEWLINE = _compile_control_pattern(
+    set(CONTROL_CODEPOINTS) - set([0x0A]))
+
+def _remove_control_characters(texts):
+
+    blob = u'\n'.join(texts)
+    if blob == u'' or max(blob) > u'\uffff':
+        # characters beyond the BMP are checked one by one
+        return map(lambda t: u''.join(filter(
+            lambda c: unicodedata.category(c)[0] != 'C', t
+        )), texts)
+
+    if blob.count(u'\n') == len(texts) - 1:
+        return _RE_CONTROL_BUT_NEWLINE.sub(u'', blob).split(u'\n')
+
+    return map(lambda t: _RE_CONTROL.sub(u'', t), texts)
+
+
+class WordColumns(object):
+    """The words of a page in columns.
+
+    Attributes:
+        x_min: An array of the minimum x of every word.
+        y_min: An array of the minimum y of every word.
+        x_max: An array of the maximum x of every word.
+        y_max: An array of the maximum y of every word.
+        texts: A list of the text of every word.
+
+    """
+
+    def __init__(self, x_min, y_min, x_max, y_max, texts):
+
+        self.x_min = x_min
+        self.y_min = y_min
+        self.x_max = x_max
+        self.y_max = y_max
+        self.texts = texts
+
+    def __len__(self):
+
+        return len(self.texts)
+
+    @property
+    def __json__(self):
+        """A list of word dicts, the same as the words of a Page."""
+
+        return map(lambda x_min, y_min, x_max, y_max, t: {
+            'x': x_min,
+            'y': y_min,
+            'w': x_max - x_min,
+            'h': y_max - y_min,
+            't': t
+        }, self.x_min, self.y_min, self.x_max, self.y_max, self.texts)
+
+
+def scan_words(xml):
+    """Parse the words of a page in bulk.
+
+    The words are matched by a single regular expression over the page,
+    and their texts are unescaped and stripped of control characters
+    together, instead of word by word as Word does. Words whose text
+    ends up empty are dropped, like Page does.
+
+    Args:
+        xml: A unicode string of the `<word>` elements of a page.
+
+    Returns:
+        A WordColumns instance.
+
+    Raises:
+        WordError: The markup is not made of `<word>` elements only, as
+            written by `pdftotext -bbox`.
+
+    """
+
+    matches = _RE_WORD.findall(xml)
+    if len(matches) == 0:
+        return WordColumns(array('d'), array('d'), array('d'), array('d'), [])
+
+    x_min, y_min, x_max, y_max, texts, others = zip(*matches)
+    if any(others):
+        raise WordError('Not a valid word markup')
+
+    texts = list(texts)
+    if u'\n' in u''.join(texts):
+        texts = map(_rstrip_lines, texts)
+    if u'&' in xml:
+        texts = map(unescape, texts)
+    texts = _remove_control_characters(texts)
+
+    columns = map(lambda c: array('d', map(float, c)),
+                  (x_min, y_min, x_max, y_max))
+    if not all(texts):
+        kept = filter(lambda ix: texts[ix], xrange(len(texts)))
+        columns = map(lambda c: array('d', map(c.__getitem__, kept)),
+                      columns)
+        texts = map(texts.__getitem__, kept)
+
+    return WordColumns(*(columns + [texts]))
+
+def _rstrip_lines(text):
+
+    # Word strips the end of every line but the last one of its text
+    if u'\n' not in text:
+        return text
+
+    lines = text.split(u'\n')
+    return u'\n'.join(map(lambda l: l.rstrip(), lines[:-1]) + lines[-1:])
 
 
 class WordError(Exception): pass
@@ -32,8 +208,6 @@ class Word(object):
 
     """
 
-    html_parser = HTMLParser()
-
     def __init__(self, lines, line_ix):
 
         self.x_min = self.y_min = self.x_max = self.y_max = 0
@@ -62,7 +236,7 @@ class Word(object):
             raise WordError('Not a valid beginning tag for word object')
 
         # between '>' and '</word>'
-        self.text = self.html_parser.unescape(line[ix + 1:-7])
+        self.text = unescape(line[ix + 1:-7])
         self.text = self._remove_control_charaters(self.text)
         self._extract_word_attributes(line[5:ix])
 
@@ -112,7 +286,7 @@ class Word(object):
 
     def _remove_control_charaters(self, t):
 
-        return ''.join(filter(lambda c: unicodedata.category(c)[0] != 'C', t))
+        return _remove_control_characters([t])[0]
 
 
 class PageError(Exception): pass
@@ -121,12 +295,19 @@ class PageError(Exception): pass
 class Page(object):
     """A data structure representing a page.
 
+    The output of `pdftotext -bbox-layout`, which groups words into
+    flows, blocks and lines, is parsed as well. Its words get the
+    indices of their block and line within the page, under 'block' and
+    'line'.
+
     Attributes:
         width: A float that is the page's width.
         height: A float that is the page's height.
         page_num: An int that is the page number.
         xml_lines: A list of xml string splited by newline.
         line_ix: An int that is the index of xml_lines.
+        num_blocks: The number of blocks of the page.
+        num_lines: The number of lines of the page.
 
     """
 
@@ -136,6 +317,7 @@ class Page(object):
         self.page_num = page_num
         self.xml_lines = xml_lines
         self.line_ix = line_ix
+        self.num_blocks = self.num_lines = 0
 
     def run(self):
         """Parse page object from xml.
@@ -151,12 +333,32 @@ class Page(object):
         self._extract_width_height(line)
         self.line_ix += 1
 
+        end_ix = self._find_end()
+        is_layout = self.line_ix < len(self.xml_lines) and \
+                    self.xml_lines[self.line_ix].strip() == '<flow>'
+        if end_ix is not None and not is_layout:
+            try:
+                xml = u'\n'.join(self.xml_lines[self.line_ix:end_ix])
+                self.words = scan_words(xml).__json__
+                return end_ix + 1
+            except WordError:
+                # parse word by word, which reports where the markup fails
+                pass
+
         while self.line_ix < len(self.xml_lines):
             line = self.xml_lines[self.line_ix].strip()
             if line == '</page>':
                 return self.line_ix + 1
 
-            self.line_ix = self._extract_word()
+            if line in ('<flow>', '</flow>', '</block>'):
+                self.line_ix += 1
+            elif line.startswith('<block'):
+                self.num_blocks += 1
+                self.line_ix += 1
+            elif line.startswith('<line'):
+                self.line_ix = self._extract_line()
+            else:
+                self.line_ix = self._extract_word()
 
         raise PageError('Do not find </page>')
 
@@ -192,6 +394,14 @@ class Page(object):
         if not (is_width_extracted and is_height_extracted):
             raise PageError('Do not have width or height information')
 
+    def _find_end(self):
+
+        for line_ix in xrange(self.line_ix, len(self.xml_lines)):
+            if self.xml_lines[line_ix].strip() == '</page>':
+                return line_ix
+
+        return None
+
     def _extract_word(self):
 
         word = Word(self.xml_lines, self.line_ix)
@@ -202,6 +412,31 @@ class Page(object):
 
         return self.line_ix
 
+    def _extract_line(self):
+
+        start_ix = end_ix = self.line_ix + 1
+        while self.xml_lines[end_ix].strip() != '</line>':
+            end_ix += 1
+            if end_ix == len(self.xml_lines):
+                raise PageError('Do not find </line>')
+
+        num_words = len(self.words)
+        try:
+            xml = u'\n'.join(self.xml_lines[start_ix:end_ix])
+            self.words.extend(scan_words(xml).__json__)
+        except WordError:
+            self.line_ix = start_ix
+            while self.line_ix < end_ix:
+                self.line_ix = self._extract_word()
+
+        block = self.num_blocks - 1 if self.num_blocks != 0 else None
+        for word in self.words[num_words:]:
+            word['block'] = block
+            word['line'] = self.num_lines
+        self.num_lines += 1
+
+        return end_ix + 1
+
 
 class PDFXMLParser(object):
     """A XML parser to parse the xml output of `pdftotext -bbox`
@@ -248,6 +483,49 @@ class PDFXMLParser(object):
         return xml_string[start:end]
 
 
+def iter_pages(stream):
+    """Parse `pdftotext -bbox` output page by page.
+
+    Unlike PDFXMLParser, the output is read a line at a time and only
+    the lines of the page being parsed are kept, so memory scales with
+    the largest page rather than the document, e.g.
+
+        with poppler.open_output(cmd) as stream:
+            for page_data in iter_pages(stream):
+                ...
+
+    A page cut off by the end of the stream is dropped.
+
+    Args:
+        stream: A file object of the xml output, in UTF-8 bytes or
+            unicode.
+
+    Yields:
+        Page dicts in the format of PDFXMLParser.run().
+
+    """
+
+    page_num, page_lines = 0, None
+    for line in iter(stream.readline, ''):
+        if isinstance(line, str):
+            line = line.decode('utf8')
+        line = line.rstrip('\n')
+        stripped = line.strip()
+
+        if page_lines is None:
+            if stripped.startswith('<page'):
+                page_lines = [line]
+            continue
+
+        page_lines.append(line)
+        if stripped == '</page>':
+            page_num += 1
+            page = Page(page_num, page_lines, 0)
+            page.run()
+            yield page.__json__
+            page_lines = None
+
+
 def main(argv):
 
     if len(argv) != 2:
@@ -255,9 +533,7 @@ def main(argv):
         exit(1)
 
     with closing(open(argv[1], 'rb')) as f:
-        data = f.read().decode('utf8')
-
-    parsed = PDFXMLParser(data).run()
+        parsed = list(iter_pages(f))
 
     print json.dumps(parsed, ensure_ascii=False, indent=4).encode('utf8')
 
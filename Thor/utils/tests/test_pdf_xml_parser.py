@@ -0,0 +1,199 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# standard library imports
+from cStringIO import StringIO
+from HTMLParser import HTMLParser
+from multiprocessing.pool import ThreadPool
+
+# third party related imports
+from pyspecs import and_, given, the, then, when
+
+# local library imports
+from Thor.utils.PdfXmlParser import (PDFXMLParser, Page, WordError,
+                                     iter_pages, scan_words, unescape)
+
+
+with given.character_references:
+
+    texts = [u'plain', u'A&amp;B', u'&lt;&gt;&quot;&apos;', u'&#65;&#x42;',
+             u'&eacute;&nbsp;', u'&unknown; &#xZZ; &#;']
+
+    with when.they_are_unescaped:
+        unescaped = map(unescape, texts)
+
+        with then.they_should_be_replaced_like_HTMLParser_does:
+            parser = HTMLParser()
+            the(unescaped).should.equal(map(parser.unescape, texts))
+
+
+with given.a_pdftotext_bbox_output:
+
+    xml = u'\n'.join([
+        u'<doc>',
+        u'  <page width="100.000000" height="200.000000">',
+        u'    <word xMin="1.000000" yMin="2.000000" xMax="11.000000" '
+        u'yMax="12.000000">R&amp;D</word>',
+        u'  </page>',
+        u'</doc>',
+    ])
+
+    with when.it_is_parsed_by_many_threads:
+        pool = ThreadPool(4)
+        results = pool.map(lambda _: PDFXMLParser(xml).run(), xrange(16))
+        pool.close()
+        pool.join()
+
+        with then.every_result_should_be_the_same:
+            the(results[0][0]['data'][0]['t']).should.equal(u'R&D')
+            the(all(map(lambda r: r == results[0], results))).\
+                should.be(True)
+
+
+with given.a_pdftotext_bbox_output_of_many_pages:
+
+    xml = u'\n'.join([
+        u'<!DOCTYPE html PUBLIC "-//W3C//DTD XHTML 1.0 Transitional//EN">',
+        u'<html><head><title></title></head>',
+        u'<body>',
+        u'<doc>',
+        u'  <page width="100.000000" height="200.000000">',
+        u'    <word xMin="1.000000" yMin="2.000000" xMax="11.000000" '
+        u'yMax="12.000000">R&amp;D</word>',
+        u'    <word xMin="20.000000" yMin="2.000000" xMax="30.000000" '
+        u'yMax="12.000000">麗寶\x07',
+        u'生活家</word>',
+        u'  </page>',
+        u'  <page width="100.000000" height="200.000000">',
+        u'  </page>',
+        u'  <page width="300.000000" height="400.000000">',
+        u'    <word xMin="5.500000" yMin="6.000000" xMax="7.000000" '
+        u'yMax="8.000000">&#65;</word>',
+        u'  </page>',
+        u'</doc>',
+        u'</body>',
+        u'</html>',
+    ]) + u'\n'
+
+    with when.it_is_parsed_incrementally:
+        pages = list(iter_pages(StringIO(xml.encode('utf8'))))
+
+        with then.the_pages_should_equal_those_of_PDFXMLParser:
+            the(len(pages)).should.equal(3)
+            the(pages).should.equal(PDFXMLParser(xml).run())
+
+    with when.only_the_first_page_is_asked_for:
+        lines = xml.encode('utf8').splitlines(True)
+        consumed = []
+
+        class Stream(object):
+
+            def readline(self):
+
+                if len(lines) == 0:
+                    return ''
+                consumed.append(lines.pop(0))
+                return consumed[-1]
+
+        first = next(iter_pages(Stream()))
+
+        with then.the_stream_should_be_read_up_to_the_end_of_the_page:
+            the(first['data'][0]['t']).should.equal(u'R&D')
+            the(consumed[-1].strip()).should.equal('</page>')
+            the(len(lines)).should.equal(8)
+
+
+with given.the_word_markup_of_a_page:
+
+    lines = [
+        u'<page width="100.000000" height="200.000000">',
+        u'    <word xMin="1.000000" yMin="2.000000" xMax="11.000000" '
+        u'yMax="12.500000">R&amp;D\x07</word>',
+        u'    <word xMin="20.000000" yMin="2.000000" xMax="30.000000" '
+        u'yMax="12.000000">\x0b</word>',
+        u'    <word xMin="40.000000" yMin="2.000000" xMax="50.000000" '
+        u'yMax="12.000000">麗寶  ',
+        u'  生活家&#x1D11E;</word>',
+        u'</page>',
+    ]
+
+    with when.it_is_scanned_in_bulk:
+        columns = scan_words(u'\n'.join(lines[1:-1]))
+
+        with then.words_should_be_read_into_columns:
+            the(list(columns.x_min)).should.equal([1., 40.])
+            the(list(columns.y_max)).should.equal([12.5, 12.])
+            the(columns.texts).should.equal([u'R&D', u'麗寶  生活家\U0001D11E'])
+
+        with and_.they_should_equal_the_words_parsed_one_by_one:
+            page = Page(1, lines, 0)
+            page.line_ix = 1
+            while lines[page.line_ix] != u'</page>':
+                page._extract_word()
+            the(columns.__json__).should.equal(page.words)
+
+    with when.it_holds_other_markup:
+        try:
+            scan_words(u'<word xMin="1" yMin="2" xMax="3" yMax="4">a</word>'
+                       u'<line>')
+        except WordError:
+            rejected = True
+        else:
+            rejected = False
+
+        with then.it_should_be_rejected:
+            the(rejected).should.be(True)
+
+
+with given.a_pdftotext_bbox_layout_output:
+
+    def word(x, t):
+        return u'          <word xMin="%s" yMin="2.000000" xMax="%s" ' \
+               u'yMax="12.000000">%s</word>' % (x, x + 5, t)
+
+    xml = u'\n'.join([
+        u'<doc>',
+        u'  <page width="100.000000" height="200.000000">',
+        u'    <flow>',
+        u'      <block xMin="1.000000" yMin="2.000000" xMax="50.000000" '
+        u'yMax="30.000000">',
+        u'        <line xMin="1.000000" yMin="2.000000" xMax="50.000000" '
+        u'yMax="12.000000">',
+        word(1., u'Thor'),
+        word(10., u'&amp;'),
+        u'        </line>',
+        u'        <line xMin="1.000000" yMin="20.000000" xMax="50.000000" '
+        u'yMax="30.000000">',
+        word(1., u'Odin\x07'),
+        u'        </line>',
+        u'      </block>',
+        u'    </flow>',
+        u'    <flow>',
+        u'      <block xMin="60.000000" yMin="2.000000" xMax="90.000000" '
+        u'yMax="12.000000">',
+        u'        <line xMin="60.000000" yMin="2.000000" xMax="90.000000" '
+        u'yMax="12.000000">',
+        word(60., u'\x07'),
+        word(70., u'Loki'),
+        u'        </line>',
+        u'      </block>',
+        u'    </flow>',
+        u'  </page>',
+        u'</doc>',
+    ])
+
+    with when.it_is_parsed:
+        page = PDFXMLParser(xml).run()[0]
+
+        with then.words_should_know_their_blocks_and_lines:
+            the(map(lambda w: (w['t'], w['block'], w['line']),
+                    page['data'])).should.equal([
+                (u'Thor', 0, 0), (u'&', 0, 0), (u'Odin', 0, 1),
+                (u'Loki', 1, 2),
+            ])
+            the(page['data'][1]['x']).should.equal(10.)
+            the(page['data'][1]['w']).should.equal(5.)
+
+        with and_.it_should_be_parsed_incrementally_alike:
+            the(list(iter_pages(StringIO(xml.encode('utf8'))))).\
+                should.equal([page])
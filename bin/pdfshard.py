@@ -0,0 +1,46 @@
+#!/usr/bin/env python
+"""
+pdfshard.py v1.0
+Program to convert one PDF across many machines sharing a filesystem.
+
+Usage:
+    pdfshard.py plan <PDF-File> <num-shards> <manifest>
+        Splits the document into page ranges and writes the manifest.
+    pdfshard.py run <manifest> <shard> <partial>
+        Extracts the pages of a shard, 0-based, into a partial JSON.
+    pdfshard.py merge <output> <partial>...
+        Combines the partials into the output of pdftext.py.
+
+"""
+
+# standard library imports
+import os.path
+import sys
+
+# third party related imports
+
+# local library imports
+from Thor.pdf.shard import (load_json, merge_shards, plan_shards, run_shard,
+                            write_json)
+
+
+def main(argv):
+
+    command, args = (argv[1], argv[2:]) if len(argv) > 1 else (None, [])
+
+    if command == 'plan' and len(args) == 3:
+        pdf_filename = os.path.abspath(args[0].decode('utf8'))
+        write_json(plan_shards(pdf_filename, int(args[1])), args[2])
+    elif command == 'run' and len(args) == 3:
+        shards = load_json(args[0])
+        run_shard(shards[int(args[1])], args[2])
+    elif command == 'merge' and len(args) >= 2:
+        write_json(merge_shards(map(load_json, args[1:])), args[0])
+    else:
+        print __doc__
+        exit(1)
+
+
+if __name__ == '__main__':
+
+    main(sys.argv)
@@ -13,6 +13,14 @@ Options:
         Specifies the directory to contain text json page by page.
     -o, --output
         Specifies the output filename.
+    -t, --timeout
+        Specifies the seconds to extract the document in. Pages finished
+        in time are still written out.
+    -m, --memory
+        Specifies the megabytes of memory a poppler utility may use.
+    -j, --jobs
+        Specifies the maximum number of poppler utilities running at the
+        same time.
 
 """
 
@@ -22,13 +30,16 @@ from contextlib import closing
 import os
 import os.path
 import re
-import subprocess
+import sys
 import time
 
 # third party related imports
 import ujson
 
 # local library imports
+from Thor.pdf import poppler
+from Thor.pdf import scheduler
+from Thor.pdf.document import PDFDocument
 from Thor.pdf.page import PDFPage
 
 
@@ -93,16 +104,19 @@ def create_folder(folder_name):
     return folder_name
 
 def count_pages(pdf_file):
-    """Returns number of pages of the specified pdf file."""
+    """Returns number of pages of the specified pdf file or PDFDocument."""
 
-    RE_PAGES = re.compile(r'Pages:\s*(\d+)')
-    pdfinfo = subprocess.check_output(('pdfinfo', pdf_file))
-    match_obj = RE_PAGES.search(pdfinfo)
-    return int(match_obj.group(1))
+    return PDFDocument.open(pdf_file).num_pages
 
-def run(input_filename, page_nums, page_dir, output_filename):
+def run(input_filename, page_nums, page_dir, output_filename, timeout=None):
 
-    pages = PDFPage.extract_texts(input_filename, page_nums)
+    document = PDFDocument.open(input_filename)
+    try:
+        with poppler.deadline(timeout):
+            pages = PDFPage.extract_texts(document, page_nums)
+    except poppler.PopplerTimeoutException, e:
+        print >> sys.stderr, '%s, %d pages extracted' % (e, len(e.pages))
+        pages = e.pages
 
     if page_dir is not None:
         for p in pages:
@@ -112,8 +126,8 @@ def run(input_filename, page_nums, page_dir, output_filename):
 
     output = {
         'version': int(time.time()),
-        'file': input_filename,
-        'page': len(pages) if page_nums is None else count_pages(input_filename),
+        'file': document.filename,
+        'page': count_pages(document),
         'data': map(lambda p: p.__json__(), pages),
     }
 
@@ -145,7 +159,20 @@ def main():
         base, ext = os.path.splitext(basename)
         output_filename = '%s.json' % base
 
-    run(pdf_filename, page_nums, page_dir, output_filename)
+    # determine the limits of poppler utilities
+    timeout = arg_dict['timeout']
+    if timeout is not None:
+        timeout = float(timeout)
+
+    memory = arg_dict['memory']
+    if memory is not None:
+        poppler.set_limits(memory_limit=int(memory) * 1024 * 1024)
+
+    jobs = arg_dict['jobs']
+    if jobs is not None:
+        scheduler.set_scheduler(scheduler.Scheduler(max_processes=int(jobs)))
+
+    run(pdf_filename, page_nums, page_dir, output_filename, timeout)
 
 
 if __name__ == "__main__":
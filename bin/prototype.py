@@ -2,42 +2,61 @@
 
 # standard library imports
 from contextlib import closing
-import subprocess
+from multiprocessing.pool import ThreadPool
 import sys
 
 # third party related imports
 
 # local library imports
+from Thor.pdf import poppler
+from Thor.pdf.document import PDFDocument
 from Thor.pdf.page import PDFPage
-from Thor.preprocess.fontspec import FontSpecPreprocessor
+from Thor.pdf.preflight import Preflight
 from Thor.preprocess.raw import RawTextPreprocessor
 from Thor.preprocess.naive import NaivePreprocessor
 from Thor.understanding.xycut import XYCut
 
 def main(argv):
 
-    if len(argv) != 3:
-        print 'usage: python %s <PDF-File> <page-num>' % argv[0]
+    if len(argv) not in (3, 5) or \
+       (len(argv) == 5 and argv[3] not in ('--record', '--replay')):
+        print 'usage: python %s <PDF-File> <page-num> ' \
+              '[--record | --replay <archive>]' % argv[0]
         exit(1)
 
     filename = argv[1]
     page_num = int(argv[2])
+    mode, archive = (argv[3][2:], argv[4]) if len(argv) == 5 else (None, None)
 
-    page = PDFPage.extract_texts(filename, [page_num])[0]
-    preprocessor = RawTextPreprocessor(filename, page)
-    page = preprocessor.run()
+    with poppler.session(mode, archive, filename):
+        run(filename, page_num)
 
-    preprocessor = NaivePreprocessor(filename, page)
-    page = preprocessor.run()
+def run(filename, page_num):
 
-    preprocessor = FontSpecPreprocessor(filename, page)
-    page = preprocessor.run()
+    # the probed raw texts are reused by RawTextPreprocessor
+    document = PDFDocument(filename)
+    preflight = Preflight.run(document, page_num, page_num)
 
+    page = PDFPage.extract_texts(document, [page_num], fonts=True,
+                                 preflight=preflight)[0]
+
+    # the page is rendered while it is preprocessed
     cmd = ('pdftocairo', '-f', str(page_num), '-l', str(page_num),
            '-jpeg', '-singlefile', '-cropbox',
            '-scale-to-x', str(int(page.width)), '-scale-to-y', '-1',
-           filename, 'output')
-    subprocess.check_call(cmd)
+           filename, '-')
+    pool = ThreadPool(1)
+    image = pool.apply_async(poppler.check_output, (cmd,))
+    pool.close()
+
+    preprocessor = RawTextPreprocessor(document, page)
+    page = preprocessor.run()
+
+    preprocessor = NaivePreprocessor(document, page)
+    page = preprocessor.run()
+
+    with closing(open('output.jpg', 'wb')) as f:
+        f.write(image.get())
 
     with closing(open('output.js', 'wb')) as f:
         f.write('window.pdfdata=')
@@ -6,7 +6,10 @@ import sys
 # third party related imports
 
 # local library imports
-from Thor.pdf.page import PDFPage
+from Thor.pdf import poppler
+from Thor.pdf.document import PDFDocument
+from Thor.pdf.memo import PageMemo
+from Thor.pdf.pipeline import PagePipeline
 from Thor.preprocess.fontspec import FontSpecPreprocessor
 from Thor.preprocess.raw import RawTextPreprocessor
 from Thor.preprocess.naive import NaivePreprocessor
@@ -14,32 +17,60 @@ from Thor.understanding.xycut import XYCut
 
 def main(argv):
 
-    if len(argv) != 3:
-        print 'usage: python %s <PDF-File> <page-num>' % argv[0]
+    if len(argv) not in (3, 5) or \
+       (len(argv) == 5 and argv[3] not in ('--record', '--replay')):
+        print 'usage: python %s <PDF-File> <page-num>[-<last-page-num>] ' \
+              '[--record | --replay <archive>]' % argv[0]
         exit(1)
 
     filename = argv[1]
-    page_num = int(argv[2])
-
-    page = PDFPage.extract_texts(filename, [page_num])[0]
-    preprocessor = RawTextPreprocessor(filename, page)
-    page = preprocessor.run()
-    #with open('raw.txt', 'wb') as f:
-    #    f.write(page.serialize())
-
-    preprocessor = NaivePreprocessor(filename, page)
-    page = preprocessor.run()
-    #with open('naive.txt', 'wb') as f:
-    #    f.write(page.serialize())
-
-    preprocessor = FontSpecPreprocessor(filename, page)
-    page = preprocessor.run()
-
-    worker = XYCut()
-    result = worker.run(page)
-    out = '\n-----------------------------------------------\n'.join(result)
-    print '\n\n\n'
-    print out.encode('utf8')
+    first, _, last = argv[2].partition('-')
+    page_nums = range(int(first), int(last or first) + 1)
+    mode, archive = (argv[3][2:], argv[4]) if len(argv) == 5 else (None, None)
+
+    with poppler.session(mode, archive, filename):
+        run(filename, page_nums)
+
+def run(filename, page_nums):
+
+    # poppler outputs of the next pages are fetched while a page is cut
+    document = PDFDocument(filename)
+    pipeline = PagePipeline(document, font_pages=True)
+
+    # repeated pages, e.g. of forms, are only preprocessed and cut once
+    memo = PageMemo()
+
+    for inputs in pipeline.run(page_nums):
+        page = memo.run('raw', inputs.page,
+                        lambda p: RawTextPreprocessor(
+                            document, p, inputs.raw_texts).run(),
+                        inputs.raw_texts)
+        #with open('raw.txt', 'wb') as f:
+        #    f.write(page.serialize())
+
+        page = memo.run('naive', page,
+                        lambda p: NaivePreprocessor(document, p).run())
+        #with open('naive.txt', 'wb') as f:
+        #    f.write(page.serialize())
+
+        page = memo.run('fontspec', page,
+                        lambda p: FontSpecPreprocessor(
+                            document, p, font_page=inputs.font_page).run(),
+                        font_texts(inputs.font_page))
+
+        result = memo.run('xycut', page, XYCut().run)
+        separator = '\n-----------------------------------------------\n'
+        out = separator.join(result)
+        print '\n\n\n'
+        print out.encode('utf8')
+
+def font_texts(font_page):
+    """Get the fonts and texts of a font page, without its number."""
+
+    if font_page is None:
+        return None
+
+    return font_page['fonts'], font_page['texts']
 
 if __name__ == '__main__':
     main(sys.argv)
\ No newline at end of file